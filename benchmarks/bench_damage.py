@@ -0,0 +1,53 @@
+### benchmarks/bench_damage.py (Scalar vs vectorized damage)
+# Run from the project root: python -m benchmarks.bench_damage
+# Checks that src/damage.py gives exactly the same numbers as
+# Battle._calculate_damage for the same rolls, and times both.
+import json
+import time
+import numpy as np
+
+from src.pokemon import Pokemon
+from src.battle import Battle
+from src import damage
+
+
+def main(n_hits=200000, seed=1):
+    with open("data/pokemon_stats.json", 'r', encoding='utf-8') as f:
+        pokemon_stats = json.load(f)
+    roster = [Pokemon(**data) for data in pokemon_stats]
+
+    # Every move of every species against every other species, repeated
+    hits = [(a, d, m) for a in roster for d in roster if a is not d for m in a.moves]
+    hits = (hits * (n_hits // len(hits) + 1))[:n_hits]
+    rng = np.random.default_rng(seed)
+    rolls = damage.roll_multipliers(rng, n_hits)
+
+    # --- Scalar: the Battle formula, one hit at a time ---
+    battle = Battle(roster[0], roster[1])
+    start = time.perf_counter()
+    scalar = []
+    for (attacker, defender, move), roll in zip(hits, rolls.tolist()):
+        if move.power is None:
+            scalar.append(0)
+            continue
+        base, _ = battle._base_damage(attacker, defender, move)
+        scalar.append(int(base * roll))
+    scalar_time = time.perf_counter() - start
+
+    # --- Vectorized: one NumPy call ---
+    inputs = damage.damage_inputs(hits)
+    start = time.perf_counter()
+    batched = damage.batch_damage(rolls=rolls, **inputs)
+    batch_time = time.perf_counter() - start
+
+    mismatches = int(np.count_nonzero(batched != np.array(scalar)))
+    print(f"hits:       {n_hits}")
+    print(f"scalar:     {scalar_time * 1000:.1f} ms")
+    print(f"vectorized: {batch_time * 1000:.1f} ms")
+    print(f"speedup:    {scalar_time / batch_time:.1f}x")
+    print(f"mismatches: {mismatches}")
+    return mismatches
+
+
+if __name__ == "__main__":
+    raise SystemExit(1 if main() else 0)
@@ -0,0 +1,42 @@
+### benchmarks/bench_memory.py (Memory per battler)
+# Run from the project root: python -m benchmarks.bench_memory
+# Compares Pokemon, CompactPokemon and BattlerTable holding N battlers.
+import json
+import tracemalloc
+
+from src.pokemon import Pokemon
+from src.battler import CompactPokemon, BattlerTable
+
+
+def measure(build):
+    """Bytes allocated while build() runs (the result is kept alive)."""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = build()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    return size, result
+
+
+def main(n=100000):
+    with open("data/pokemon_stats.json", 'r', encoding='utf-8') as f:
+        pokemon_stats = json.load(f)
+    roster = (pokemon_stats * (n // len(pokemon_stats) + 1))[:n]
+
+    def build_table():
+        table = BattlerTable()
+        for data in roster:
+            table.add(data)
+        return table
+
+    print(f"battlers: {n}")
+    for label, build in (("Pokemon", lambda: [Pokemon(**data) for data in roster]),
+                         ("CompactPokemon", lambda: [CompactPokemon(**data) for data in roster]),
+                         ("BattlerTable", build_table)):
+        size, _ = measure(build)
+        print(f"{label:15} {size / n:8.1f} bytes/battler  ({size / 2**20:.1f} MiB)")
+
+
+if __name__ == "__main__":
+    main()
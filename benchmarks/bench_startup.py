@@ -0,0 +1,114 @@
+### benchmarks/bench_startup.py (JSON vs binary pack startup)
+# Run from the project root: python -m benchmarks.bench_startup
+# Builds a full-dex-sized roster (the starters repeated under new names),
+# then compares json.load with opening the mmap'ed pack and a lazy Registry.
+# Also reports `python -X importtime -c "import main"`: what importing
+# main.py costs, slowest modules first (turtle/tkinter must not be there).
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from src.datapack import DataPack, build_pack
+from src.registry import Registry
+
+FULL_DEX = 1025
+
+
+def make_roster(pokemon_stats, size):
+    roster = []
+    for i in range(size):
+        data = dict(pokemon_stats[i % len(pokemon_stats)])
+        data['id'] = i + 1
+        data['name'] = f"{data['name']}{i}"
+        roster.append(data)
+    return roster
+
+
+def measure(load, repeat=20):
+    """(best seconds, bytes allocated and still alive) of load()."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = load()
+        best = min(best, time.perf_counter() - start)
+        del result
+    tracemalloc.start()
+    result = load()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, size
+
+
+def main(size=FULL_DEX):
+    with open("data/pokemon_stats.json", 'r', encoding='utf-8') as f:
+        roster = make_roster(json.load(f), size)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, "pokemon_stats.json")
+        pack_path = os.path.join(tmp, "pokemon_stats.pack")
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(roster, f, indent=4, ensure_ascii=False)
+        build_pack(roster, pack_path)
+
+        def load_json():
+            with open(json_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+
+        def open_pack():
+            pack = DataPack(pack_path)
+            pack[size // 2] # One lookup, like picking a starter
+            return pack
+
+        def read_pack():
+            pack = DataPack(pack_path)
+            for data in pack:
+                pass
+            return pack
+
+        def open_registry():
+            registry = Registry(DataPack(pack_path))
+            registry.create(size // 2) # Only this species is built
+            return registry
+
+        print(f"species: {size}  json: {os.path.getsize(json_path) / 1024:.0f} KiB  "
+              f"pack: {os.path.getsize(pack_path) / 1024:.0f} KiB")
+        for label, load in (("json.load", load_json),
+                            ("pack open + 1 record", open_pack),
+                            ("pack, every record", read_pack),
+                            ("registry + 1 create", open_registry)):
+            seconds, allocated = measure(load)
+            print(f"{label:22} {seconds * 1000:8.2f} ms  {allocated / 1024:8.0f} KiB allocated")
+    import_times()
+
+
+def import_times(module="main", top=10):
+    """Prints the cumulative import time of `module` and its slowest imports."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True, check=True)
+    rows = [] # (cumulative us, name) of the imports made by `module`
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue # The header line
+        if name.strip() == module:
+            rows.append((int(cumulative), module))
+            break
+        if not name.startswith("  "):
+            rows = [] # Another top-level import (site, ...), not ours
+        else:
+            rows.append((int(cumulative), name.strip()))
+    total = rows[-1][0] if rows else 0
+    tk = "tkinter LOADED" if any(name in ("tkinter", "turtle") for _, name in rows) else "no tkinter"
+    print(f"\nimport {module}: {total / 1000:.2f} ms cumulative ({tk})")
+    for us, name in sorted(rows, reverse=True)[1:top + 1]:
+        print(f"  {us / 1000:8.2f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
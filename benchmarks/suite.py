@@ -0,0 +1,571 @@
+### benchmarks/suite.py (Benchmark suite with saved results and regression check)
+# Run from the project root:
+#   python -m benchmarks.suite run                    -> benchmarks/results/<time>.json
+#   python -m benchmarks.suite run --save-baseline    -> also benchmarks/results/baseline.json
+#   python -m benchmarks.suite run -k battle --quick  -> only names containing "battle"
+#   python -m benchmarks.suite compare [baseline.json] [current.json]
+#
+# Every benchmark is timed as many samples; each sample runs the code enough
+# times to last at least min_time. compare() uses a Mann-Whitney U test on the
+# samples, so a slowdown is only flagged when it is bigger than the noise.
+import gc
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from src import utils
+from src.battle import Battle, FieldBattle
+from src.events import EventBuffer
+from src.datapack import build_pack, load_roster
+from src.game import Game
+from src.render import FrameState
+from src.metrics import Metrics
+from src.moves import intern_move
+from src.pokemon import Pokemon, calculate_stat
+from src.registry import Registry
+from src.simulator import simulate, first_move_policy
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+BASELINE_PATH = os.path.join(RESULTS_DIR, "baseline.json")
+JSON_PATH = "data/pokemon_stats.json"
+
+SAMPLES = 15
+MIN_TIME = 0.02  # Seconds per sample
+ALPHA = 0.01     # Significance level of the regression test
+THRESHOLD = 0.05 # Smaller slowdowns are never flagged (5%)
+
+BENCHMARKS = [] # (kind, name, setup, budget) - setup(context) returns the function to time
+
+
+def benchmark(kind, name, budget=None):
+    """
+    Registers setup(context) -> run() as a 'micro' or 'macro' benchmark.
+    budget: the most seconds one call may take (median); 'run' fails above it.
+    """
+    def register(setup):
+        BENCHMARKS.append((kind, name, setup, budget))
+        return setup
+    return register
+
+
+class Context:
+    """What the setups share: the roster, a registry and a temp directory."""
+    def __init__(self, tmp_dir):
+        with open(JSON_PATH, 'r', encoding='utf-8') as f:
+            self.pokemon_stats = json.load(f)
+        self.registry = Registry(self.pokemon_stats)
+        self.tmp_dir = tmp_dir
+
+
+# --- Micro Benchmarks ---
+
+@benchmark("micro", "battle.calculate_damage")
+def _calculate_damage(context):
+    attacker, defender = context.registry.create(0), context.registry.create(1)
+    battle = Battle(attacker, defender, rng=random.Random(1))
+    move = next(m for m in attacker.moves if m.power)
+    return lambda: battle._calculate_damage(attacker, defender, move)
+
+
+def _action(context, move_name):
+    attacker, defender = context.registry.create(0), context.registry.create(1)
+    battle = Battle(attacker, defender, EventBuffer(64), random.Random(1))
+    move = next(m for m in attacker.moves if m.name == move_name)
+
+    def run():
+        battle.execute_action(attacker, defender, move)
+        defender.hp_actual = defender.hp_max # Never faints
+        battle.events.clear()
+    return run
+
+
+@benchmark("micro", "battle.execute_action")
+def _execute_action(context):
+    return _action(context, "Tackle")
+
+
+@benchmark("micro", "battle.execute_status_move")
+def _execute_status_move(context):
+    return _action(context, "Growl") # Stops at -6: then it is "But it failed!"
+
+
+@benchmark("micro", "battle.execute_action_1000_moves")
+def _execute_action_many_moves(context):
+    # The same hit after interning 1000 more moves with effects: the cost
+    # of a hit must not grow with the move table
+    for i in range(1000):
+        intern_move({"name": f"Bench move {i}", "power": 40 + i % 80, "type": "Normal",
+                     "category": "physical", "accuracy": 95,
+                     "meta": {"ailment": "burn", "ailment_chance": 10}})
+    return _action(context, "Tackle")
+
+
+@benchmark("micro", "utils.get_type_effectiveness")
+def _type_effectiveness(context):
+    move_type = context.pokemon_stats[1]['moves'][0]['type']
+    defender_types = context.pokemon_stats[0]['type']
+    return lambda: utils.get_type_effectiveness(move_type, defender_types)
+
+
+@benchmark("micro", "pokemon.init")
+def _pokemon_init(context):
+    data = context.pokemon_stats[0]
+    return lambda: Pokemon(**data)
+
+
+@benchmark("micro", "pokemon.calculate_stat")
+def _calculate_stat(context):
+    base_stats = context.pokemon_stats[0]['stats']
+    return lambda: calculate_stat(base_stats, 'attack', 5)
+
+
+@benchmark("micro", "registry.create")
+def _registry_create(context):
+    registry = context.registry
+    return lambda: registry.create(0)
+
+
+@benchmark("micro", "registry.create_build")
+def _registry_create_build(context):
+    registry = context.registry
+    ivs = {name: 31 for name in ('hp', 'attack', 'speed')}
+    return lambda: registry.create(0, 50, ivs=ivs, nature="adamant")
+
+
+@benchmark("micro", "game.run_battle_turn")
+def _run_battle_turn(context, metrics=None):
+    game = Game(context.pokemon_stats, registry=context.registry, rng=random.Random(1),
+                metrics=metrics)
+    game.select_starter(0)
+    player, opponent = game.player_pokemon, game.opponent_pokemon
+
+    def run():
+        # Same starting point every turn: full HP, still in battle
+        player.hp_actual, opponent.hp_actual = player.hp_max, opponent.hp_max
+        player.clear_volatile()
+        opponent.clear_volatile()
+        game.state = 'IN_BATTLE'
+        game.run_battle_turn(0)
+        game.events.clear()
+    return run
+
+
+@benchmark("micro", "game.run_battle_turn_metrics")
+def _run_battle_turn_metrics(context):
+    # The cost of metrics when they are on (off is game.run_battle_turn)
+    return _run_battle_turn(context, Metrics())
+
+
+@benchmark("micro", "battle.turn_6v6", budget=100e-6)
+def _turn_6v6(context):
+    # Six battlers per side, all twelve acting in one turn (speed order)
+    rng = random.Random(1)
+    registry, n_species = context.registry, len(context.registry)
+    sides = [[registry.create((i + side) % n_species) for i in range(6)] for side in range(2)]
+    battle = FieldBattle(sides, EventBuffer(), rng)
+    actions = [(pokemon, sides[1 - side][i], pokemon.moves[i % len(pokemon.moves)])
+               for side in range(2) for i, pokemon in enumerate(sides[side])]
+    everyone = sides[0] + sides[1]
+
+    def run():
+        for pokemon in everyone:
+            # A fresh turn every time (no stat drops or seeds left from the last one)
+            pokemon.hp_actual = pokemon.hp_max
+            if pokemon.stages is not None or pokemon.volatile is not None:
+                pokemon.clear_volatile()
+        battle.run_turn(actions)
+        battle.events.clear()
+    return run
+
+
+# --- Macro Benchmarks ---
+
+@benchmark("macro", "game.full_battle")
+def _full_battle(context):
+    def run():
+        rng = random.Random(1) # The same battle every time
+        game = Game(context.pokemon_stats, registry=context.registry, rng=rng)
+        game.select_starter(0)
+        while game.get_state() == 'IN_BATTLE':
+            game.run_battle_turn(rng.randrange(len(game.player_pokemon.moves)))
+        return game.get_pending_messages()
+    return run
+
+
+@benchmark("macro", "simulator.1000_battles", budget=1000 / 20000)
+def _simulate(context):
+    # Random moves: Growl, Leer, Leech seed, Ember... go through the effect
+    # interpreter, which holds this around 30k battles/s (20k is the floor)
+    return lambda: simulate(context.pokemon_stats, 0, 1, 1000, seed=1)
+
+
+@benchmark("macro", "simulator.battles_per_s", budget=1000 / 100000)
+def _simulate_plain(context):
+    # Vine whip vs Scratch: only plain hits (the simulator's inline path),
+    # which has to keep the 100k battles/s target on one core
+    return lambda: simulate(context.pokemon_stats, 0, 1, 1000,
+                            first_move_policy, first_move_policy, seed=1)
+
+
+@benchmark("macro", "stats.batch_10k_builds")
+def _batch_builds(context):
+    import numpy as np
+    from src.stats import base_stat_array, batch_stats, random_builds
+    rng = np.random.default_rng(1)
+    base = base_stat_array(context.pokemon_stats)
+    base = base[rng.integers(0, len(base), 10000)]
+    ivs, evs, natures = random_builds(rng, 10000)
+    return lambda: batch_stats(base, 50, ivs, evs, natures)
+
+
+@benchmark("macro", "env.step_64_battles")
+def _env_step(context):
+    # One VectorEnv step: 64 battle turns, auto-resets and the observation arrays
+    from src.env import VectorEnv
+    env = VectorEnv(context.pokemon_stats, 64, seed=1, registry=context.registry)
+    env.reset()
+    actions = [0] * 64 # Every species has 4 moves: move 0 is always allowed
+    return lambda: env.step(actions)
+
+
+@benchmark("macro", "ladder.ingest_10k_results", budget=10000 / 50000)
+def _ladder_ingest(context):
+    # 10k results into an on-disk ladder (WAL, batched writes), as a stream:
+    # the 50k results/s target is 0.2 s for these
+    from src.ladder import Ladder, random_results
+    results = list(random_results(1000, 10000, seed=1))
+    path = os.path.join(context.tmp_dir, "ladder.db")
+
+    def run():
+        ladder = Ladder(path, batch_size=2000)
+        ladder.ingest(results)
+        ladder.close()
+    return run
+
+
+@benchmark("macro", "pipeline.csv_10k_records")
+def _pipeline_csv(context):
+    # 10k battle records through a CSV sink: chunking, the hand-off to the
+    # writer thread and the writes (the simulation itself is not timed)
+    from src.pipeline import CsvSink, simulate_records
+    records = list(simulate_records(context.pokemon_stats, 10000, seed=1,
+                                    registry=context.registry))
+    path = os.path.join(context.tmp_dir, "results.csv")
+
+    def run():
+        with CsvSink(path) as sink:
+            sink.consume(records)
+    return run
+
+
+@benchmark("macro", "data.load_roster_json")
+def _load_json(context):
+    # What datapack.load_pokemon_stats does when there is no pack
+    missing_pack = os.path.join(context.tmp_dir, "missing.pack")
+    return lambda: load_roster(JSON_PATH, missing_pack)
+
+
+@benchmark("macro", "data.load_roster_pack")
+def _load_pack(context):
+    pack_path = os.path.join(context.tmp_dir, "pokemon_stats.pack")
+    build_pack(context.pokemon_stats, pack_path)
+
+    def run():
+        pack = load_roster(JSON_PATH, pack_path)
+        pack[0] # One lookup, like picking a starter
+        pack.close()
+    return run
+
+
+@benchmark("macro", "render.headless_frame")
+def _headless_frame(context):
+    # The Brain side of one frame of main.render_frame: a turn, then the
+    # dirty regions (src/render.py) and the formatted messages the "Face" draws.
+    game = Game(context.pokemon_stats, registry=context.registry, rng=random.Random(1))
+    game.select_starter(0)
+    player, opponent = game.player_pokemon, game.opponent_pokemon
+    frame = FrameState()
+
+    def run():
+        player.hp_actual, opponent.hp_actual = player.hp_max, opponent.hp_max
+        player.clear_volatile()
+        opponent.clear_volatile()
+        game.state = 'IN_BATTLE'
+        game.run_battle_turn(0)
+        return frame.update(game), game.get_pending_messages()
+    return run
+
+
+@benchmark("macro", "startup.import_engine", budget=20e-3)
+def _import_engine(context):
+    # A cold import of main.py and the headless engine (no Tk, no window):
+    # the modules are dropped from sys.modules and imported again.
+    def is_ours(name):
+        return name in ("main", "src") or name.startswith("src.")
+
+    def run():
+        saved = {name: module for name, module in sys.modules.items() if is_ours(name)}
+        for name in saved:
+            del sys.modules[name]
+        try:
+            import main
+            import src.game
+            import src.datapack
+        finally:
+            for name in [name for name in sys.modules if is_ours(name)]:
+                del sys.modules[name]
+            sys.modules.update(saved)
+    return run
+
+
+# --- Running ---
+
+def calibrate(run, min_time):
+    """How many calls of run() make one sample of at least min_time."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            run()
+        if time.perf_counter() - start >= min_time:
+            return number
+        number *= 2
+
+
+def measure(run, samples=SAMPLES, min_time=MIN_TIME):
+    """Returns (calls per sample, [seconds per call for every sample])."""
+    number = calibrate(run, min_time)
+    times = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable() # Like timeit: a collection in the middle is noise
+    try:
+        for _ in range(samples):
+            start = time.perf_counter()
+            for _ in range(number):
+                run()
+            times.append((time.perf_counter() - start) / number)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return number, times
+
+
+def machine_metadata():
+    """Where and on what code the results were taken."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                                    capture_output=True, text=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        commit, dirty = None, None
+    try:
+        import numpy
+        numpy_version = numpy.__version__
+    except ImportError:
+        numpy_version = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "numpy": numpy_version,
+        "git_commit": commit,
+        "git_dirty": dirty
+    }
+
+
+def run_suite(pattern=None, samples=SAMPLES, min_time=MIN_TIME, progress=print):
+    """Runs every benchmark whose name contains pattern. Returns the results dict."""
+    results = {"meta": machine_metadata(), "benchmarks": {}}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        context = Context(tmp_dir)
+        for kind, name, setup, budget in BENCHMARKS:
+            if pattern and pattern not in name:
+                continue
+            number, times = measure(setup(context), samples, min_time)
+            median = statistics.median(times)
+            results["benchmarks"][name] = {
+                "kind": kind,
+                "number": number,
+                "budget": budget,
+                "over_budget": budget is not None and median > budget,
+                "median": median,
+                "mean": statistics.fmean(times),
+                "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+                "samples": times
+            }
+            if progress:
+                over = "  OVER BUDGET" if results["benchmarks"][name]["over_budget"] else ""
+                progress(f"{kind:5} {name:30} {format_time(median):>10}  "
+                         f"(±{statistics.stdev(times) / median:.1%}, {number} calls x {samples}){over}")
+    return results
+
+
+def format_time(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("µs", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+# --- Comparing ---
+
+def mann_whitney_p(a, b):
+    """
+    Two-sided p-value of the Mann-Whitney U test (normal approximation
+    with tie correction). Small p: a and b do not come from the same
+    distribution.
+    """
+    n1, n2 = len(a), len(b)
+    if not n1 or not n2:
+        return 1.0
+    ranked = sorted([(value, 0) for value in a] + [(value, 1) for value in b])
+    ranks = [0.0] * len(ranked)
+    tie_sum = 0
+    i = 0
+    while i < len(ranked):
+        j = i
+        while j + 1 < len(ranked) and ranked[j + 1][0] == ranked[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1 # Average rank of the tied group
+        tie_sum += (j - i + 1) ** 3 - (j - i + 1)
+        i = j + 1
+    rank_a = sum(rank for rank, (_, group) in zip(ranks, ranked) if group == 0)
+    u = rank_a - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_sum / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (abs(u - n1 * n2 / 2) - 0.5) / math.sqrt(variance)
+    return max(0.0, min(1.0, math.erfc(max(z, 0.0) / math.sqrt(2))))
+
+
+def compare(baseline, current, alpha=ALPHA, threshold=THRESHOLD):
+    """
+    Returns a list of (name, ratio, p-value, verdict) for the benchmarks in both
+    results. ratio = current median / baseline median. verdict is 'regression',
+    'improvement' or 'same'.
+    """
+    rows = []
+    for name, new in current["benchmarks"].items():
+        old = baseline["benchmarks"].get(name)
+        if old is None:
+            continue
+        ratio = new["median"] / old["median"]
+        p = mann_whitney_p(old["samples"], new["samples"])
+        verdict = "same"
+        if p < alpha and ratio > 1 + threshold:
+            verdict = "regression"
+        elif p < alpha and ratio < 1 - threshold:
+            verdict = "improvement"
+        rows.append((name, ratio, p, verdict))
+    return rows
+
+
+def print_comparison(baseline, current, rows):
+    old_meta, new_meta = baseline["meta"], current["meta"]
+    print(f"baseline: {old_meta.get('git_commit')} ({old_meta.get('timestamp')})")
+    print(f"current:  {new_meta.get('git_commit')} ({new_meta.get('timestamp')})")
+    for key in ("machine", "processor", "cpu_count", "python", "implementation"):
+        if old_meta.get(key) != new_meta.get(key):
+            print(f"WARNING: different {key} ({old_meta.get(key)} vs {new_meta.get(key)}),"
+                  f" timings are not comparable")
+    for name, ratio, p, verdict in rows:
+        old = baseline["benchmarks"][name]["median"]
+        new = current["benchmarks"][name]["median"]
+        mark = {"regression": "SLOWER", "improvement": "faster", "same": ""}[verdict]
+        print(f"{name:30} {format_time(old):>10} -> {format_time(new):>10}  "
+              f"{ratio:6.2f}x  p={p:.4f}  {mark}")
+
+
+# --- Command Line ---
+
+def save(results, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+
+
+def load(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def latest_result():
+    names = sorted(name for name in os.listdir(RESULTS_DIR)
+                   if name.endswith(".json") and name != "baseline.json")
+    if not names:
+        raise SystemExit(f"No results in {RESULTS_DIR}, run the suite first.")
+    return os.path.join(RESULTS_DIR, names[-1])
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Benchmark suite")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the benchmarks and save the results")
+    run_parser.add_argument("-k", "--filter", default=None, help="Only names containing this")
+    run_parser.add_argument("--samples", type=int, default=SAMPLES)
+    run_parser.add_argument("--min-time", type=float, default=MIN_TIME)
+    run_parser.add_argument("--quick", action="store_true", help="8 short samples")
+    run_parser.add_argument("--out", default=None)
+    run_parser.add_argument("--save-baseline", action="store_true")
+    run_parser.add_argument("--compare", action="store_true",
+                            help="Compare with the baseline after running")
+
+    compare_parser = commands.add_parser("compare", help="Check results against a baseline")
+    compare_parser.add_argument("baseline", nargs="?", default=BASELINE_PATH)
+    compare_parser.add_argument("current", nargs="?", default=None,
+                                help="Results file (default: the newest one)")
+    compare_parser.add_argument("--alpha", type=float, default=ALPHA)
+    compare_parser.add_argument("--threshold", type=float, default=THRESHOLD)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        samples, min_time = (8, 0.005) if args.quick else (args.samples, args.min_time)
+        current = run_suite(args.filter, samples, min_time)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        out = args.out or os.path.join(RESULTS_DIR, f"{stamp}.json")
+        save(current, out)
+        print(f"Saved {out}")
+        if args.save_baseline:
+            save(current, BASELINE_PATH)
+            print(f"Saved {BASELINE_PATH}")
+        over = [name for name, result in current["benchmarks"].items() if result["over_budget"]]
+        if over:
+            print(f"Over budget: {', '.join(over)}")
+        if not args.compare:
+            return 1 if over else 0
+        baseline, alpha, threshold = load(BASELINE_PATH), ALPHA, THRESHOLD
+    else:
+        baseline = load(args.baseline)
+        current = load(args.current or latest_result())
+        alpha, threshold = args.alpha, args.threshold
+
+    rows = compare(baseline, current, alpha, threshold)
+    print_comparison(baseline, current, rows)
+    regressions = [name for name, _, _, verdict in rows if verdict == "regression"]
+    if regressions:
+        print(f"{len(regressions)} significant regression(s): {', '.join(regressions)}")
+        return 1
+    print("No significant regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
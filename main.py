@@ -1,69 +1,62 @@
-### main.py (PC-Only, v3.2 - Event-Driven Game Loop)
-import sys
-import json
-import turtle
-import os
+### main.py (PC-Only, v3.4 - Headless Core)
+# Importing this file opens no window and loads no Tk: the screen and the
+# pens are created by setup_screen(), when the game really starts.
+# The Brain (src/) and the roster loading never touch the GUI, and what
+# to redraw is decided in src/render.py, so both work headless.
+import time
 
 # Import the "Brain"
 from src.game import Game
-from src.pokemon import Pokemon
+from src.datapack import load_pokemon_stats # (Used to live here; still importable from main)
+from src.render import FrameState
+from src.sprites import SpriteCache, ATLAS_PATH
 
 # --- Screen Configuration ---
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
 
-# --- Global Turtles (Our "Pens") ---
-screen = turtle.Screen()
-player_turtle = turtle.Turtle()
-opponent_turtle = turtle.Turtle()
-ui_turtle = turtle.Turtle() # For writing text
+# --- Global Turtles (Our "Pens"), created by setup_screen() ---
+screen = None
+player_turtle = None
+opponent_turtle = None
+ui_turtle = None # For writing text
+player_hp_turtle = None # HP bars, one pen per side so
+opponent_hp_turtle = None # each can be cleared on its own
+
+# Sprites are decoded the first time they are shown (atlas if it was built)
+sprites = None
 
 # --- Global Game Engine (The "Brain") ---
 game_engine = None
 current_state = "" # Stores the game's current state
 
-# --- Asset Loading ---
-
-def load_pokemon_stats(pokemon_stats_json_path="data/pokemon_stats.json"):
-    try:
-        with open(pokemon_stats_json_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        print(f"ERROR: could not find {pokemon_stats_json_path}.")
-        print(f"Please run 'tools/fetch_pokemon.py' first.")
-        return None
-    except Exception as e:
-        print(f"Error loading JSON: {e}")
-        return None
-
-def register_sprites(pokemon_list):
-    """Pre-loads all Pokémon sprites into Turtle's shapes."""
-    for pokemon_data in pokemon_list:
-        sprite_front = pokemon_data.get("sprite_front")
-        sprite_back = pokemon_data.get("sprite_back")
-        
-        if sprite_front and os.path.exists(sprite_front):
-            screen.register_shape(sprite_front)
-        
-        if sprite_back and os.path.exists(sprite_back):
-            screen.register_shape(sprite_back)
-    print("All sprites registered.")
+# --- Rendering State ---
+# What each screen region shows right now (see src/render.py)
+frame = FrameState()
+frame_scheduled = False # A frame is already waiting in the Tk event loop
 
 # --- Drawing Functions (The "Face") ---
 
 def setup_screen():
-    """Creates and configures the main game window."""
+    """Creates and configures the main game window (the first Tk cost)."""
+    global screen, player_turtle, opponent_turtle, ui_turtle, player_hp_turtle
+    global opponent_hp_turtle, sprites
+    import turtle
+    screen = turtle.Screen()
+    player_turtle = turtle.Turtle()
+    opponent_turtle = turtle.Turtle()
+    ui_turtle = turtle.Turtle()
+    player_hp_turtle = turtle.Turtle()
+    opponent_hp_turtle = turtle.Turtle()
+    sprites = SpriteCache(screen, atlas_path=ATLAS_PATH)
+
     screen.title("Pokémon Battle Simulator")
     screen.setup(SCREEN_WIDTH, SCREEN_HEIGHT)
     screen.tracer(0) # Manual updates
     
-    player_turtle.hideturtle()
-    opponent_turtle.hideturtle()
-    ui_turtle.hideturtle()
-    
-    player_turtle.penup()
-    opponent_turtle.penup()
-    ui_turtle.penup()
+    for pen in (player_turtle, opponent_turtle, ui_turtle, player_hp_turtle, opponent_hp_turtle):
+        pen.hideturtle()
+        pen.penup()
 
 def draw_starter_selection():
     """Displays the starter selection text on the screen."""
@@ -79,27 +72,47 @@ def draw_starter_selection():
     ui_turtle.goto(0, -10)
     ui_turtle.write(f"Press '3' for {starter_names[2]}", align="center", font=("Arial", 16, "normal"))
 
+def draw_sprite(pen, sprite_path, x, y):
+    """Shows one Pokémon sprite (or hides the pen if there is none)."""
+    shape = sprites.shape(sprite_path, pen) # Pinned while this pen shows it
+    if shape:
+        pen.shape(shape)
+        pen.goto(x, y)
+        pen.showturtle()
+    else:
+        pen.hideturtle()
+
+def draw_hp_bar(pen, info, x, y):
+    """Name, level and HP bar of one side. info is None outside a battle."""
+    pen.clear()
+    if info is None:
+        return
+    pen.goto(x, y + 8)
+    pen.write(f"{info['name']}  Lv{info['level']}", font=("Arial", 12, "bold"))
+    
+    width = 150
+    ratio = info['hp_actual'] / info['hp_max'] if info['hp_max'] else 0
+    pen.goto(x, y)
+    pen.color("black")
+    pen.begin_fill()
+    for dx, dy in ((width, 0), (0, -8), (-width, 0), (0, 8)):
+        pen.goto(pen.xcor() + dx, pen.ycor() + dy)
+    pen.end_fill()
+    if ratio > 0:
+        pen.color("green" if ratio > 0.5 else "orange" if ratio > 0.2 else "red")
+        pen.begin_fill()
+        for dx, dy in ((width * ratio, 0), (0, -8), (-width * ratio, 0), (0, 8)):
+            pen.goto(pen.xcor() + dx, pen.ycor() + dy)
+        pen.end_fill()
+    pen.color("black")
+    pen.goto(x + width + 10, y - 10)
+    pen.write(f"{info['hp_actual']}/{info['hp_max']}", font=("Arial", 10, "normal"))
+
 def draw_battle_scene():
     """Draws the Pokémon sprites in their battle positions."""
     ui_turtle.clear() # Clear the selection text
-    
-    battle_info = game_engine.get_battle_info()
-    if not battle_info: return 
-        
-    player_sprite = game_engine.player_pokemon.sprite_back
-    opponent_sprite = game_engine.opponent_pokemon.sprite_front
-    
-    if player_sprite:
-        player_turtle.shape(player_sprite)
-        player_turtle.goto(-150, -100) # Player position
-        player_turtle.showturtle()
-        
-    if opponent_sprite:
-        opponent_turtle.shape(opponent_sprite)
-        opponent_turtle.goto(150, 200) # Opponent position
-        opponent_turtle.showturtle()
-    
-    print_battle_status_to_console()
+    draw_sprite(player_turtle, game_engine.player_pokemon.sprite_back, -150, -100)
+    draw_sprite(opponent_turtle, game_engine.opponent_pokemon.sprite_front, 150, 200)
 
 def print_battle_status_to_console():
     """Prints battle info to the console (temporary)."""
@@ -118,7 +131,7 @@ def print_battle_status_to_console():
     
     print("Choose a move (Press 1, 2, 3, or 4 on keyboard):")
     for i, move in enumerate(battle_info['player']['moves']):
-        print(f"  {i + 1}. {move['name']}")
+        print(f"  {i + 1}. {move.name}")
 
 # --- Input Functions (Connecting Keys to "Brain") ---
 
@@ -137,22 +150,18 @@ def select_starter_3():
 def select_move_1():
     if game_engine.get_state() == 'IN_BATTLE':
         game_engine.run_battle_turn(0) 
-        print_battle_status_to_console()
 
 def select_move_2():
     if game_engine.get_state() == 'IN_BATTLE':
         game_engine.run_battle_turn(1)
-        print_battle_status_to_console()
 
 def select_move_3():
     if game_engine.get_state() == 'IN_BATTLE':
         game_engine.run_battle_turn(2)
-        print_battle_status_to_console()
 
 def select_move_4():
     if game_engine.get_state() == 'IN_BATTLE':
         game_engine.run_battle_turn(3)
-        print_battle_status_to_console()
 
 def set_keybindings(state):
     """Activates and deactivates keys based on game state."""
@@ -176,48 +185,61 @@ def set_keybindings(state):
         screen.onkey(None, "3")
         screen.onkey(None, "4")
 
-# --- ¡NUEVO! Bucle de Juego Basado en Eventos ---
+# --- Bucle de Juego: solo se dibuja cuando algo cambia ---
+
+def on_game_changed(game):
+    """Called by the Brain after every change: asks Tk for one frame."""
+    global frame_scheduled
+    if frame_scheduled:
+        frame.skipped() # Folded into the waiting frame
+        return
+    frame_scheduled = True
+    screen.ontimer(render_frame, 0)
 
-def game_loop():
+def render_frame():
     """
-    This is the main game loop.
-    It checks the state and draws the appropriate screen.
+    Redraws only the regions whose value changed since the last frame.
+    Nothing is scheduled afterwards: the loop sleeps in Tk until the
+    Brain calls on_game_changed() again.
     """
-    global current_state, game_engine
-    
-    # 1. Get the new state from the Brain
-    new_state = game_engine.get_state()
-    
-    # 2. Check if the state changed
-    if new_state != current_state:
-        print(f"STATE CHANGE: {current_state} -> {new_state}")
-        current_state = new_state
-        
-        # Re-bind keys for the new state
+    global frame_scheduled, current_state
+    frame_scheduled = False
+    start = time.perf_counter()
+    values, dirty = frame.update(game_engine)
+
+    for message in game_engine.get_pending_messages():
+        print(f"\n>> {message}")
+
+    if "state" in dirty:
+        print(f"STATE CHANGE: {current_state} -> {values['state']}")
+        current_state = values['state']
         set_keybindings(current_state)
-        
-        # Draw the correct screen for the new state
         if current_state == 'STARTER_SELECTION':
             draw_starter_selection()
-        
-        elif current_state == 'IN_BATTLE':
-            draw_battle_scene()
-        
-        elif current_state == 'GAME_OVER':
-            print("--- Game Over. Click window to exit. ---")
-            screen.exitonclick()
-            return # Stop the loop
+    if "sprites" in dirty and values["sprites"]:
+        draw_battle_scene()
+    if "player_hp" in dirty:
+        draw_hp_bar(player_hp_turtle, values["player_hp"], 40, -120)
+    if "opponent_hp" in dirty:
+        draw_hp_bar(opponent_hp_turtle, values["opponent_hp"], -320, 230)
 
-    # 3. Process any messages from the Brain
-    for message in game_engine.get_pending_messages():
-        print(f"\n>> {message}")
-    
-    # 4. Update the Turtle screen
-    screen.update()
-    
-    # 5. Schedule this function to run again
-    # This is the magic that replaces "while running:"
-    screen.ontimer(game_loop, 30) # ~33 frames per second
+    if dirty == ["messages"]:
+        frame.skipped() # Nothing on screen changed
+    elif dirty:
+        screen.update()
+        frame.rendered(time.perf_counter() - start)
+        if current_state == 'IN_BATTLE' and ("player_hp" in dirty or "opponent_hp" in dirty):
+            print_battle_status_to_console()
+
+    if current_state == 'GAME_OVER':
+        print_render_stats()
+        print("--- Game Over. Click window to exit. ---")
+        screen.exitonclick()
+
+def print_render_stats():
+    print(f"Frames rendered: {frame.stats['frames_rendered']}, "
+          f"skipped: {frame.stats['frames_skipped']}, "
+          f"redraw: {frame.average_ms():.2f} ms/frame, sprites: {sprites.stats()}")
 
 # --- Main Game Execution ---
 
@@ -232,15 +254,13 @@ if __name__ == "__main__":
         # 1. Initialize the Brain
         game_engine = Game(pokemon_stats)
         
-        # 2. Register sprites
-        register_sprites(pokemon_stats)
-        
-        # 3. Start the game loop
-        game_loop()
+        # 2. Draw the first frame, then only when the Brain changes
+        game_engine.subscribe(on_game_changed)
+        render_frame()
         
-        # 4. Tell Turtle to start its event loop
-        # This will wait for key presses and run the ontimer
-        turtle.done() 
+        # 3. Tell Turtle to start its event loop
+        # This will wait for key presses (no polling while idle)
+        screen.mainloop()
 
     else:
         print("No se pudieron cargar los datos. Saliendo.")
\ No newline at end of file
@@ -0,0 +1,200 @@
+### src/ai.py (Opponent policies: from random to game-tree search)
+# A policy chooses a move for one side:
+#     policy(attacker, defender, rng) -> move index
+# attacker.hp_actual / defender.hp_actual are up to date when it is called.
+# Game uses one for the opponent, and the simulator one for each side.
+# They judge moves by damage and accuracy only: stat stages, status and the
+# other move effects happen in the battle but are not looked ahead.
+import time
+
+from .battle import base_damage
+from .calc import hit_chance, hit_distribution, stats_key
+
+
+# --- Simple Policies ---
+
+def random_policy(attacker, defender, rng):
+    """Picks any move (the original opponent behaviour)."""
+    return int(rng.random() * len(attacker.moves))
+
+def first_move_policy(attacker, defender, rng):
+    """Always uses the first move."""
+    return 0
+
+# {(id(attacker), id(defender), attack stats, defense stats): (attacker, defender, index)}
+# The answer only changes with the matchup or the stats (stat stages and
+# burn change them in place), not every turn.
+_strongest_cache = {}
+
+def strongest_move_policy(attacker, defender, rng):
+    """Always uses the move with the highest damage before the roll (times its accuracy)."""
+    stats_a, stats_d = attacker.stats, defender.stats
+    key = (id(attacker), id(defender), stats_a['attack'], stats_a['special-attack'],
+           stats_d['defense'], stats_d['special-defense'])
+    cached = _strongest_cache.get(key)
+    if cached and cached[0] is attacker and cached[1] is defender:
+        return cached[2]
+    best_index, best_damage = 0, -1.0
+    for i, move in enumerate(attacker.moves):
+        damage = base_damage(attacker, defender, move)[0] * hit_chance(move)
+        if damage > best_damage:
+            best_index, best_damage = i, damage
+    if len(_strongest_cache) > 64:
+        _strongest_cache.clear()
+    _strongest_cache[key] = (attacker, defender, best_index)
+    return best_index
+
+POLICIES = {
+    "random": random_policy,
+    "first": first_move_policy,
+    "strongest": strongest_move_policy,
+}
+
+
+# --- Expectiminimax Search ---
+
+class _Timeout(Exception):
+    pass
+
+class ExpectiminimaxPolicy:
+    """
+    Searches the battle tree: our move (max), the other side's move (min),
+    and every damage roll and miss as a chance node (exact distributions
+    from calc.hit_distribution), until time_budget runs out
+    (iterative deepening, one turn per level).
+
+    moves_first says who attacks first in a turn: None (the default) works
+    it out from the speed stats, like Game does (a speed tie is searched as
+    if we were second, the safe side). Moves with a different priority are
+    not taken into account.
+
+    Values are from our side: +1 win, -1 loss, and an HP-based estimate
+    when the search stops before the end. Positions are stored in a
+    transposition table keyed by a packed (our HP, their HP, depth) int.
+    """
+    def __init__(self, time_budget=0.010, max_depth=8, moves_first=None, max_table_size=200000):
+        self.time_budget = time_budget
+        self.max_depth = max_depth
+        self.moves_first = moves_first
+        self.max_table_size = max_table_size
+        self.table = {}
+        self._matchup = None
+        self.nodes = 0
+        self.last_depth = 0
+
+    def __call__(self, attacker, defender, rng=None):
+        return self.choose_move(attacker, defender)
+
+    def choose_move(self, me, them):
+        """Returns the index of the best move found within the time budget."""
+        self._prepare(me, them)
+        self._deadline = time.perf_counter() + self.time_budget
+        self.nodes = 0
+        best = 0
+        for depth in range(1, self.max_depth + 1):
+            try:
+                best = self._root(me.hp_actual, them.hp_actual, depth)
+            except _Timeout:
+                break
+            self.last_depth = depth
+        return best
+
+    def _prepare(self, me, them):
+        """Caches the distributions of every move pair of this matchup."""
+        moves_first = self.moves_first
+        if moves_first is None:
+            moves_first = me.stats['speed'] > them.stats['speed']
+        matchup = (tuple(stats_key(me, them, m) for m in me.moves),
+                   tuple(stats_key(them, me, m) for m in them.moves),
+                   me.hp_max, them.hp_max, moves_first)
+        if matchup == self._matchup:
+            return
+        # New matchup: old positions mean nothing
+        self._matchup = matchup
+        self._first = moves_first
+        self.table.clear()
+        self.my_hits = [hit_distribution(me, them, m) for m in me.moves]
+        self.their_hits = [hit_distribution(them, me, m) for m in them.moves]
+        self.my_hp_max = me.hp_max
+        self.their_hp_max = them.hp_max
+
+    def _root(self, my_hp, their_hp, depth):
+        best_index, best_value = 0, -2.0
+        for i, my_hit in enumerate(self.my_hits):
+            value = min(self._resolve(my_hp, their_hp, my_hit, their_hit, depth)
+                        for their_hit in self.their_hits)
+            if value > best_value:
+                best_index, best_value = i, value
+        return best_index
+
+    def _turn(self, my_hp, their_hp, depth):
+        """Value of the start of a turn with both sides alive."""
+        if depth == 0:
+            # Estimate: difference of remaining HP fractions (always inside (-1, 1))
+            return 0.5 * (my_hp / self.my_hp_max - their_hp / self.their_hp_max)
+
+        key = (my_hp << 20) | (their_hp << 8) | depth
+        value = self.table.get(key)
+        if value is not None:
+            return value
+
+        self.nodes += 1
+        if not self.nodes & 63 and time.perf_counter() > self._deadline:
+            raise _Timeout()
+
+        best = -2.0
+        for my_hit in self.my_hits:
+            worst = 2.0
+            for their_hit in self.their_hits:
+                value = self._resolve(my_hp, their_hp, my_hit, their_hit, depth)
+                if value < worst:
+                    worst = value
+                    if worst <= best:
+                        break # They already have a reply worse for us than our best move
+            if worst > best:
+                best = worst
+
+        if len(self.table) >= self.max_table_size:
+            self.table.clear()
+        self.table[key] = best
+        return best
+
+    def _resolve(self, my_hp, their_hp, my_hit, their_hit, depth):
+        """Expected value of one turn where both moves are known."""
+        if self._first:
+            return self._chance(my_hp, their_hp, my_hit, their_hit, depth, True)
+        return self._chance(my_hp, their_hp, their_hit, my_hit, depth, False)
+
+    def _chance(self, my_hp, their_hp, first_hit, second_hit, depth, we_are_first):
+        expected = 0.0
+        for damage, probability in first_hit:
+            if we_are_first:
+                hp_after = their_hp - damage
+                if hp_after <= 0:
+                    expected += probability
+                    continue
+                expected += probability * self._second(my_hp, hp_after, second_hit, depth, False)
+            else:
+                hp_after = my_hp - damage
+                if hp_after <= 0:
+                    expected -= probability
+                    continue
+                expected += probability * self._second(hp_after, their_hp, second_hit, depth, True)
+        return expected
+
+    def _second(self, my_hp, their_hp, hit, depth, we_attack):
+        expected = 0.0
+        for damage, probability in hit:
+            if we_attack:
+                hp_after = their_hp - damage
+                if hp_after <= 0:
+                    expected += probability
+                else:
+                    expected += probability * self._turn(my_hp, hp_after, depth - 1)
+            else:
+                hp_after = my_hp - damage
+                if hp_after <= 0:
+                    expected -= probability
+                else:
+                    expected += probability * self._turn(hp_after, their_hp, depth - 1)
+        return expected
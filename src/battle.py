@@ -1,81 +1,212 @@
 ### src/battle.py (The Battle "Brain" - NOW WITH REAL LOGIC)
 import random
 from . import utils # <-- Importa la tabla de tipos
+from .events import MOVE_USED, FAILED, HP_CHANGED, FAINTED
+from .effects import run_effects, before_move, end_of_turn
+from .scheduler import TurnScheduler
+
+
+def _quiet(kind, a=None, b=None, c=None):
+    """emit() of a battle without events."""
+    pass
+
+def base_damage(attacker, defender, move):
+    """
+    Damage before the random roll (formula, STAB and type).
+    Does not depend on the turn, so the AI and the matchup tables can precompute it.
+    """
+    if move.power is None:
+        return 0, 1.0
+
+    # --- 2. Get Stats (Physical vs Special) ---
+    if move.physical:
+        attack_stat = attacker.stats['attack']
+        defense_stat = defender.stats['defense']
+    else: # 'special'
+        attack_stat = attacker.stats['special-attack']
+        defense_stat = defender.stats['special-defense']
+        
+    # --- 3. Core Formula ---
+    level = attacker.level
+    power = move.power
+    damage = (((2 * level / 5 + 2) * power * attack_stat / defense_stat) / 50) + 2
+
+    # --- 4. Modifiers (STAB & Type) ---
+    stab_multiplier = 1.0
+    if move.type in attacker.type:
+        stab_multiplier = 1.5
+        
+    type_multiplier = utils.effectiveness(move.type_id, defender.type_key)
+    
+    return damage * stab_multiplier * type_multiplier, type_multiplier
 
 class Battle:
     """
     Manages the pure logic of a battle turn.
     Knows nothing about "print" or "input".
     """
-    def _init_(self, player_pokemon, opponent_pokemon, logger_callback):
-        # Este _init_ SÍ acepta argumentos
+    def __init__(self, player_pokemon, opponent_pokemon, events=None, rng=None, metrics=None):
+        # Este __init__ SÍ acepta argumentos
         self.player_pokemon = player_pokemon
         self.opponent_pokemon = opponent_pokemon
-        self.log = logger_callback # A function (like Game.log) to send messages
+        # Where to send what happens: an events.EventBuffer (like Game.events).
+        # None = no events at all: the quiet version of execute_action is used,
+        # so there is no per-turn cost (not even an "if").
+        self.events = events
+        if events is None:
+            self.execute_action = self._execute_action_quiet
+        # Every roll comes from this battle's own random.Random,
+        # so battles can run in parallel and be reproduced from a seed.
+        self.rng = rng if rng else random.Random()
+        # Orders the actions of a turn (priority, speed, seeded speed ties)
+        self.scheduler = TurnScheduler(self.rng)
+        # Optional metrics.Metrics: wraps the methods above with timers
+        if metrics is not None:
+            metrics.instrument_battle(self)
 
     def _calculate_damage(self, attacker, defender, move):
         """
         Calculates the damage of a move using the real
         Gen 1-5 damage formula.
         """
-        
         # --- 1. Check for Status Move ---
-        if move['power'] is None:
+        if move.power is None:
             return 0, 1.0 # Return 0 damage
 
-        # --- 2. Get Stats (Physical vs Special) ---
-        if move['category'] == 'physical':
-            attack_stat = attacker.stats['attack']
-            defense_stat = defender.stats['defense']
-        else: # 'special'
-            attack_stat = attacker.stats['special-attack']
-            defense_stat = defender.stats['special-defense']
-            
-        # --- 3. Core Formula ---
-        level = attacker.level
-        power = move['power']
-        damage = (((2 * level / 5 + 2) * power * attack_stat / defense_stat) / 50) + 2
-
-        # --- 4. Modifiers (STAB & Type) ---
-        stab_multiplier = 1.0
-        if move['type'] in attacker.type:
-            stab_multiplier = 1.5
-            
-        type_multiplier = utils.get_type_effectiveness(move['type'], defender.type)
-        
+        # --- 2-4. Formula, STAB & Type ---
+        base_damage, type_multiplier = self._base_damage(attacker, defender, move)
+
         # --- 5. Randomness ---
-        random_multiplier = random.uniform(0.85, 1.0)
+        random_multiplier = self.rng.uniform(0.85, 1.0)
         
         # --- 6. Final Damage ---
-        final_damage = damage * stab_multiplier * type_multiplier * random_multiplier
+        final_damage = base_damage * random_multiplier
         
         return int(final_damage), type_multiplier
 
+    def _base_damage(self, attacker, defender, move):
+        """Damage before the random roll (see base_damage)."""
+        return base_damage(attacker, defender, move)
+
     def execute_action(self, attacker, defender, move):
-        """Executes a single attack action."""
-        
-        self.log(f"{attacker.name} used {move['name']}!")
+        """
+        Executes a single action (move is a MoveRecord): runs the move's
+        compiled effects (accuracy, damage, stat stages, status... see effects.py).
+        """
+        emit = self.events.emit
+
+        # Sleep, paralysis, flinch... may take the turn away
+        if attacker.status is not None or attacker.volatile:
+            if not before_move(self, emit, attacker):
+                return
         
-        damage, type_multiplier = self._calculate_damage(attacker, defender, move)
+        emit(MOVE_USED, attacker.name, move)
         
-        if damage > 0:
-            if type_multiplier > 1.0:
-                self.log("It's super effective!")
-            elif type_multiplier < 1.0 and type_multiplier > 0.0:
-                self.log("It's not very effective...")
-            elif type_multiplier == 0.0:
-                self.log(f"It doesn't affect {defender.name}...")
-
-            self.log(f"It deals {damage} damage!")
-            defender.take_damage(damage)
-        else:
-            self.log("But it failed!") # (Simple log for status moves)
+        if not run_effects(self, emit, attacker, defender, move) and not move.power:
+            emit(FAILED) # (A status move that changed nothing)
             
-        self.log(f"{defender.name} has {defender.hp_actual}/{defender.hp_max} HP remaining.")
+        emit(HP_CHANGED, defender.name, defender.hp_actual, defender.hp_max)
+        if not defender.is_alive():
+            emit(FAINTED, defender.name)
+
+    def _execute_action_quiet(self, attacker, defender, move):
+        """execute_action without events (same rolls, same result)."""
+        if attacker.status is not None or attacker.volatile:
+            if not before_move(self, _quiet, attacker):
+                return
+        run_effects(self, _quiet, attacker, defender, move)
+
+    def _end_of_turn(self, actions):
+        """Burn, poison and leech seed, once per battler of the turn."""
+        emit = self.events.emit if self.events is not None else _quiet
+        done = []
+        for attacker, defender, _ in actions:
+            for pokemon in (attacker, defender):
+                if (pokemon.status is not None or pokemon.volatile) and pokemon not in done:
+                    done.append(pokemon)
+                    end_of_turn(self, emit, pokemon)
+
+    def foe_of(self, pokemon):
+        """The battler facing this one (who leech seed heals)."""
+        if pokemon is self.player_pokemon:
+            return self.opponent_pokemon
+        if pokemon is self.opponent_pokemon:
+            return self.player_pokemon
+        return None
+
+    def run_turn(self, actions):
+        """
+        Runs one turn: actions is a list of (attacker, defender, move).
+        Higher priority moves go first, then the faster Pokémon. A Pokémon
+        that faints before its action loses it; so does an action whose
+        target has already fainted. Then burn, poison and leech seed hurt.
+        """
+        scheduler = self.scheduler
+        for attacker, defender, move in actions:
+            scheduler.push(attacker, defender, move)
+        for attacker, defender, move in scheduler:
+            if attacker.hp_actual > 0 and defender.hp_actual > 0:
+                self.execute_action(attacker, defender, move)
+        self._end_of_turn(actions)
 
     def get_state_info(self):
         """Returns a dictionary with info for the "Face" (main.py)."""
         return {
             "player": self.player_pokemon.get_simple_info(),
             "opponent": self.opponent_pokemon.get_simple_info()
-        }
\ No newline at end of file
+        }
+
+
+class FieldBattle(Battle):
+    """
+    A battle with any number of sides and battlers per side:
+    [[a, b], [c, d]] is a double battle, [[a], [b], [c]] a free-for-all.
+    """
+    def __init__(self, sides, events=None, rng=None, metrics=None):
+        super().__init__(sides[0][0], sides[1][0], events, rng, metrics)
+        self.sides = [list(side) for side in sides]
+        self._side_of = {id(pokemon): i for i, side in enumerate(self.sides) for pokemon in side}
+
+    def side_of(self, pokemon):
+        return self._side_of[id(pokemon)]
+
+    def foes(self, pokemon):
+        """The battlers still standing on every other side."""
+        side = self._side_of[id(pokemon)]
+        return [foe for i, other in enumerate(self.sides) if i != side
+                for foe in other if foe.hp_actual > 0]
+
+    def sides_alive(self):
+        return [i for i, side in enumerate(self.sides) if any(p.hp_actual > 0 for p in side)]
+
+    def is_over(self):
+        return len(self.sides_alive()) <= 1
+
+    def run_turn(self, actions):
+        """
+        Like Battle.run_turn, but an action whose target already fainted
+        goes to another foe (picked with the battle's rng) instead of failing.
+        """
+        scheduler = self.scheduler
+        for attacker, defender, move in actions:
+            scheduler.push(attacker, defender, move)
+        for attacker, defender, move in scheduler:
+            if attacker.hp_actual <= 0:
+                continue
+            if defender.hp_actual <= 0:
+                foes = self.foes(attacker)
+                if not foes:
+                    scheduler.clear() # Everyone else is down: the battle is over
+                    break
+                defender = foes[int(self.rng.random() * len(foes))]
+            self.execute_action(attacker, defender, move)
+        self._end_of_turn(actions)
+
+    def foe_of(self, pokemon):
+        """The first foe still standing (who leech seed heals)."""
+        foes = self.foes(pokemon)
+        return foes[0] if foes else None
+
+    def get_state_info(self):
+        """Every side as a list of get_simple_info() dicts."""
+        return {"sides": [[pokemon.get_simple_info() for pokemon in side] for side in self.sides]}
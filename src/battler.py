@@ -0,0 +1,293 @@
+### src/battler.py (Compact Pokémon for big simulations)
+# Two lighter alternatives to Pokemon for when we hold hundreds of
+# thousands of battlers at once:
+#   CompactPokemon -> same API, __slots__ and plain int stats (no dicts)
+#   BattlerTable   -> many Pokémon in typed arrays, used through BattlerView
+# Both work with Battle (they have .stats, .level, .type, .type_key, ...).
+from array import array
+from . import utils
+from .moves import MOVES, intern_move, intern_moveset
+from .pokemon import calculate_stats, check_build
+
+# Moves per battler in a BattlerTable (empty slots hold NO_MOVE)
+MAX_MOVES = 4
+NO_MOVE = -1
+
+
+class CompactPokemon:
+    """
+    Same constructor and methods as Pokemon, but with __slots__
+    and one int field per stat instead of the stats/_base_stats dicts.
+    """
+    __slots__ = ('id', 'name', 'type', 'type_key', 'moves', 'sprite_front', 'sprite_back',
+                 'level', 'hp_max', 'hp_actual', 'attack', 'defense',
+                 'special_attack', 'special_defense', 'speed')
+    # No room for battle state: moves can damage them, not change them (effects.py)
+    stages = status = volatile = None
+
+    def __init__(self, name, type, stats, moves,
+                 sprite_front, sprite_back, id=None, level=5,
+                 ivs=None, evs=None, nature=None, **kwargs):
+        self.id = id
+        self.name = name
+        self.type = type
+        self.type_key = utils.defender_key(type)
+        self.moves = intern_moveset(moves) # Shared tuple of MoveRecords
+        self.sprite_front = sprite_front
+        self.sprite_back = sprite_back
+        self.level = level
+
+        # (The build is not kept, only the stats it gives)
+        check_build(level, ivs, evs, nature)
+        values = calculate_stats(stats, level, ivs, evs, nature)
+        self.hp_max = values['hp']
+        self.hp_actual = self.hp_max
+        self.attack = values['attack']
+        self.defense = values['defense']
+        self.special_attack = values['special-attack']
+        self.special_defense = values['special-defense']
+        self.speed = values['speed']
+
+    @property
+    def stats(self):
+        """The stats as a dict, like Pokemon.stats (built on demand)."""
+        return {
+            'attack': self.attack,
+            'defense': self.defense,
+            'special-attack': self.special_attack,
+            'special-defense': self.special_defense,
+            'speed': self.speed,
+        }
+
+    def take_damage(self, damage):
+        """Subtracts damage from current HP."""
+        self.hp_actual -= damage
+        if self.hp_actual < 0:
+            self.hp_actual = 0
+
+    def is_alive(self):
+        """Checks if the Pokémon has HP greater than 0."""
+        return self.hp_actual > 0
+
+    def get_simple_info(self):
+        """Returns a dict for the "Face" (main.py) to use."""
+        return {
+            "name": self.name,
+            "level": self.level,
+            "hp_actual": self.hp_actual,
+            "hp_max": self.hp_max,
+            "moves": self.moves
+        }
+
+    def to_dict(self):
+        """Converts the Pokémon's state to a dictionary for saving."""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "level": self.level,
+            "hp_actual": self.hp_actual
+        }
+
+
+class BattlerTable:
+    """
+    Stores many Pokémon as columns of typed arrays (struct of arrays).
+    Species data (name, types, sprites) is stored once and moves are
+    MoveRecord IDs (see moves.py). Use view(i) to get a Pokémon-like object.
+    """
+    def __init__(self):
+        # --- Shared tables ---
+        self.species = []       # JSON entries, one per species
+        self._species_index = {} # {id(entry): species index}
+
+        # --- Columns (one element per battler) ---
+        self.species_id = array('i')
+        self.level = array('B')
+        self.hp_actual = array('H')
+        self.hp_max = array('H')
+        self.attack = array('H')
+        self.defense = array('H')
+        self.special_attack = array('H')
+        self.special_defense = array('H')
+        self.speed = array('H')
+        self.type1 = array('B')
+        self.type2 = array('B')
+        self.type_key = array('H')
+        self.move_ids = array('h') # MAX_MOVES per battler
+
+    def __len__(self):
+        return len(self.hp_actual)
+
+    def _intern_species(self, data):
+        """Returns the species index of a JSON entry."""
+        index = self._species_index.get(id(data))
+        if index is None:
+            index = len(self.species)
+            self.species.append(data)
+            self._species_index[id(data)] = index
+        return index
+
+    def add(self, data, level=5, ivs=None, evs=None, nature=None):
+        """
+        Adds a battler from a JSON entry (like Pokemon(**data)), with an
+        optional build. Returns its index. Like CompactPokemon, only the
+        stats of the build are kept.
+        """
+        check_build(level, ivs, evs, nature)
+        values = calculate_stats(data['stats'], level, ivs, evs, nature)
+        types = data['type']
+        self.species_id.append(self._intern_species(data))
+        self.level.append(level)
+
+        self.hp_max.append(values['hp'])
+        self.hp_actual.append(values['hp'])
+        self.attack.append(values['attack'])
+        self.defense.append(values['defense'])
+        self.special_attack.append(values['special-attack'])
+        self.special_defense.append(values['special-defense'])
+        self.speed.append(values['speed'])
+
+        self.type1.append(utils.type_id(types[0]) if types else utils.NO_TYPE)
+        self.type2.append(utils.type_id(types[1]) if len(types) > 1 else utils.NO_TYPE)
+        self.type_key.append(utils.defender_key(types))
+
+        move_ids = [intern_move(move).id for move in data['moves'][:MAX_MOVES]]
+        move_ids += [NO_MOVE] * (MAX_MOVES - len(move_ids))
+        self.move_ids.extend(move_ids)
+        return len(self.hp_actual) - 1
+
+    def add_many(self, data, count, level=5, ivs=None, evs=None, nature=None):
+        """
+        Adds count copies of the same species and build. Returns the first
+        index (len(self) when count is 0 and nothing is added).
+        """
+        if count < 0:
+            raise ValueError(f"count must be 0 or more, got {count}")
+        if count == 0:
+            return len(self)
+        first = self.add(data, level, ivs, evs, nature)
+        for column in (self.species_id, self.level, self.hp_actual, self.hp_max,
+                       self.attack, self.defense, self.special_attack,
+                       self.special_defense, self.speed,
+                       self.type1, self.type2, self.type_key):
+            column.extend(array(column.typecode, [column[first]]) * (count - 1))
+        self.move_ids.extend(self.move_ids[first * MAX_MOVES:] * (count - 1))
+        return first
+
+    def view(self, index):
+        """Returns a lightweight Pokémon-like view of one battler."""
+        return BattlerView(self, index)
+
+    def reset_hp(self):
+        """Heals every battler (e.g. before the next simulated battle)."""
+        self.hp_actual[:] = self.hp_max
+
+
+class BattlerView:
+    """
+    A Pokémon that lives in a BattlerTable. It only holds the table
+    and a row index; every attribute is read from the arrays.
+    """
+    __slots__ = ('table', 'index')
+    stages = status = volatile = None # Like CompactPokemon
+
+    def __init__(self, table, index):
+        self.table = table
+        self.index = index
+
+    # --- Species data ---
+
+    @property
+    def _species(self):
+        return self.table.species[self.table.species_id[self.index]]
+
+    @property
+    def id(self):
+        return self._species.get('id')
+
+    @property
+    def name(self):
+        return self._species['name']
+
+    @property
+    def type(self):
+        return self._species['type']
+
+    @property
+    def sprite_front(self):
+        return self._species.get('sprite_front')
+
+    @property
+    def sprite_back(self):
+        return self._species.get('sprite_back')
+
+    # --- Battler data ---
+
+    @property
+    def level(self):
+        return self.table.level[self.index]
+
+    @property
+    def type_key(self):
+        return self.table.type_key[self.index]
+
+    @property
+    def hp_max(self):
+        return self.table.hp_max[self.index]
+
+    @property
+    def hp_actual(self):
+        return self.table.hp_actual[self.index]
+
+    @hp_actual.setter
+    def hp_actual(self, value):
+        self.table.hp_actual[self.index] = value
+
+    @property
+    def stats(self):
+        """The stats as a dict, like Pokemon.stats (built on demand)."""
+        table, i = self.table, self.index
+        return {
+            'attack': table.attack[i],
+            'defense': table.defense[i],
+            'special-attack': table.special_attack[i],
+            'special-defense': table.special_defense[i],
+            'speed': table.speed[i],
+        }
+
+    @property
+    def moves(self):
+        start = self.index * MAX_MOVES
+        return tuple(MOVES[move_id]
+                     for move_id in self.table.move_ids[start:start + MAX_MOVES]
+                     if move_id != NO_MOVE)
+
+    # --- Same methods as Pokemon ---
+
+    def take_damage(self, damage):
+        """Subtracts damage from current HP."""
+        hp = self.table.hp_actual[self.index] - damage
+        self.table.hp_actual[self.index] = hp if hp > 0 else 0
+
+    def is_alive(self):
+        """Checks if the Pokémon has HP greater than 0."""
+        return self.table.hp_actual[self.index] > 0
+
+    def get_simple_info(self):
+        """Returns a dict for the "Face" (main.py) to use."""
+        return {
+            "name": self.name,
+            "level": self.level,
+            "hp_actual": self.hp_actual,
+            "hp_max": self.hp_max,
+            "moves": self.moves
+        }
+
+    def to_dict(self):
+        """Converts the Pokémon's state to a dictionary for saving."""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "level": self.level,
+            "hp_actual": self.hp_actual
+        }
@@ -0,0 +1,150 @@
+### src/calc.py (Exact damage distributions and KO chances)
+# Battle._calculate_damage rolls random.uniform(0.85, 1.0) on every hit.
+# Instead of sampling it thousands of times, this module works out the
+# exact probability of every damage value (memoized), and convolves
+# them to get "chance to KO in N uses" (misses count, like in hits_to_ko).
+import math
+from functools import lru_cache
+
+from .battle import base_damage
+
+# Same range as the roll in Battle._calculate_damage
+ROLL_LOW = 0.85
+ROLL_HIGH = 1.0
+
+
+def stats_key(attacker, defender, move):
+    """Everything the damage of a hit depends on, as a hashable tuple."""
+    stats_a, stats_d = attacker.stats, defender.stats
+    return (move.id, attacker.level, tuple(attacker.type),
+            stats_a['attack'], stats_a['special-attack'],
+            stats_d['defense'], stats_d['special-defense'], defender.type_key)
+
+
+@lru_cache(maxsize=65536)
+def _distribution_for(key, base):
+    """Exact (damage, probability) pairs of int(base * roll), roll ~ U(0.85, 1.0)."""
+    if base <= 0:
+        return ((0, 1.0),)
+    span = ROLL_HIGH - ROLL_LOW
+    outcomes = []
+    for damage in range(int(base * ROLL_LOW), int(base * ROLL_HIGH) + 1):
+        # The part of the roll range that gives exactly this damage
+        low = max(ROLL_LOW, damage / base)
+        high = min(ROLL_HIGH, (damage + 1) / base)
+        if high > low:
+            outcomes.append((damage, (high - low) / span))
+    return tuple(outcomes)
+
+
+def damage_distribution(attacker, defender, move):
+    """
+    The exact damage outcomes of one hit: ((damage, probability), ...),
+    sorted by damage. Status moves give ((0, 1.0),).
+    Memoized per (attacker stats, defender stats, move).
+    """
+    key = stats_key(attacker, defender, move)
+    return _distribution_for(key, base_damage(attacker, defender, move)[0])
+
+
+def expected_damage(attacker, defender, move):
+    """Average damage of one hit."""
+    return sum(damage * probability
+               for damage, probability in damage_distribution(attacker, defender, move))
+
+
+def hit_chance(move):
+    """Chance the move connects, from its base accuracy (None: never misses)."""
+    if move.accuracy is None or move.accuracy >= 100:
+        return 1.0
+    return move.accuracy / 100
+
+
+@lru_cache(maxsize=65536)
+def _with_misses(distribution, chance):
+    outcomes = {0: 1.0 - chance}
+    for damage, probability in distribution:
+        outcomes[damage] = outcomes.get(damage, 0.0) + probability * chance
+    return tuple(sorted(outcomes.items()))
+
+
+def hit_distribution(attacker, defender, move):
+    """
+    damage_distribution of one use of the move: a miss is a 0 damage
+    outcome. Uses the base accuracy (accuracy and evasion stages are not
+    counted, nor the move's other effects).
+    """
+    distribution = damage_distribution(attacker, defender, move)
+    chance = hit_chance(move)
+    return distribution if chance >= 1.0 else _with_misses(distribution, chance)
+
+
+@lru_cache(maxsize=65536)
+def _ko_chances(distribution, hp, max_hits):
+    """
+    P(KO within n hits) for n = 1..max_hits, by convolving the distribution.
+    The state is {HP left: probability}; KOs are taken out as they happen.
+    """
+    alive = {hp: 1.0}
+    knocked_out = 0.0
+    chances = []
+    for _ in range(max_hits):
+        after = {}
+        for hp_left, p_hp in alive.items():
+            for damage, p_damage in distribution:
+                remaining = hp_left - damage
+                if remaining <= 0:
+                    knocked_out += p_hp * p_damage
+                else:
+                    after[remaining] = after.get(remaining, 0.0) + p_hp * p_damage
+        alive = after
+        chances.append(min(knocked_out, 1.0))
+    return tuple(chances)
+
+
+def hits_to_ko(attacker, defender, hp=None):
+    """
+    (uses, damage): how many uses of attacker's best move knock out defender
+    from hp (defender.hp_actual by default) on average, and that move's
+    expected damage per use (misses included). uses is None when attacker
+    has no damaging move.
+    """
+    if hp is None:
+        hp = defender.hp_actual
+    damage = max((expected_damage(attacker, defender, move) * hit_chance(move)
+                  for move in attacker.moves), default=0.0)
+    if damage <= 0:
+        return None, 0.0
+    return max(1, math.ceil(hp / damage)), damage
+
+
+def ko_chances(attacker, defender, move, max_hits=5, hp=None):
+    """
+    Exact chance that move knocks out defender within 1, 2, ..., max_hits
+    uses, starting from hp (defender.hp_actual by default). A use can
+    miss (hit_distribution), as in hits_to_ko and the AI.
+    """
+    if hp is None:
+        hp = defender.hp_actual
+    return _ko_chances(hit_distribution(attacker, defender, move), hp, max_hits)
+
+
+def ko_probability(attacker, defender, move, hits, hp=None):
+    """Exact chance that move knocks out defender in at most `hits` uses."""
+    return ko_chances(attacker, defender, move, hits, hp)[-1]
+
+
+def roster_ko_table(registry, max_hits=5, level=5):
+    """
+    KO chances of every move of every species against every species,
+    from full HP. Returns {(attacker name, move name, defender name): chances}.
+    """
+    table = {}
+    for template_a in registry.species:
+        attacker = registry.prototype(template_a, level)
+        for template_d in registry.species:
+            defender = registry.prototype(template_d, level)
+            for move in attacker.moves:
+                table[(attacker.name, move.name, defender.name)] = ko_chances(
+                    attacker, defender, move, max_hits, defender.hp_max)
+    return table
@@ -0,0 +1,292 @@
+### src/datapack.py (Binary roster pack with memory-mapped loading)
+# pokemon_stats.json is compiled (tools/build_pack.py) into a versioned
+# binary file that is mmap'ed and read record by record, with no parsing
+# at startup. The JSON stays the source of truth and the fallback.
+#
+# Layout (little-endian):
+#   header   MAGIC, version, counts and the offset of every section
+#   types    one string ref per type ID
+#   moves    fixed-width records (interned: every move is stored once),
+#            effect data as a JSON string in the pool
+#   species  fixed-width records, moves referenced by move ID
+#   strings  UTF-8 string pool (names, sprite file names)
+import json
+import mmap
+import os
+import struct
+
+from . import utils
+from .moves import move_key
+
+MAGIC = b"PKMN"
+VERSION = 3
+MAX_MOVES = 4
+NO_STAT = 0xFFFF # Stat missing in the JSON
+NO_POWER = -1    # Status move (power is null)
+NO_MOVE = 0xFFFF
+NO_ACCURACY = 0xFF # Never misses (accuracy is null)
+# Effect fields of a move (see effects.py), stored as a JSON string
+EFFECT_FIELDS = ("target", "stat_changes", "meta")
+
+CATEGORIES = ("physical", "special", "status")
+
+# magic, version, n_types, n_moves, n_species, types, moves, species, strings offsets
+HEADER = struct.Struct("<4sHHII4I")
+# string offset, string length
+STRING_REF = struct.Struct("<IH")
+# name, power, type ID, category, priority, accuracy, effects (JSON string)
+MOVE = struct.Struct("<IHhBBbBIH")
+# id, name, type IDs (2), 6 stats, move count, move IDs (4), sprite front, sprite back
+SPECIES = struct.Struct("<iIHBB6HB4HIHIH")
+
+STAT_NAMES = ('hp', 'attack', 'defense', 'special-attack', 'special-defense', 'speed')
+
+
+def _sprite_name(path):
+    """Just the file name of a sprite path (the JSON holds absolute Windows paths)."""
+    if not path:
+        return ""
+    return path.replace("\\", "/").rsplit("/", 1)[-1]
+
+
+# --- Writing ---
+
+class _StringPool:
+    def __init__(self):
+        self.data = bytearray()
+        self.refs = {}
+
+    def add(self, text):
+        ref = self.refs.get(text)
+        if ref is None:
+            encoded = text.encode('utf-8')
+            ref = (len(self.data), len(encoded))
+            self.data += encoded
+            self.refs[text] = ref
+        return ref
+
+
+def build_pack(pokemon_stats, pack_path):
+    """Writes pokemon_stats (the list from the JSON) as a binary pack."""
+    strings = _StringPool()
+
+    # Types: the utils IDs first, then any unknown type in the data
+    type_names = list(utils.TYPE_NAMES)
+    for data in pokemon_stats:
+        for type_name in data['type']:
+            if type_name not in type_names:
+                type_names.append(type_name)
+    for move in (m for data in pokemon_stats for m in data['moves']):
+        if move['type'] not in type_names:
+            type_names.append(move['type'])
+    type_ids = {name: i for i, name in enumerate(type_names)}
+
+    # Moves, interned like moves.intern_move (same name is not enough)
+    move_ids = {}
+    move_records = bytearray()
+    for data in pokemon_stats:
+        for move in data['moves']:
+            key = move_key(move)
+            if key in move_ids:
+                continue
+            move_ids[key] = len(move_ids)
+            power = NO_POWER if move['power'] is None else move['power']
+            accuracy = NO_ACCURACY if move.get('accuracy') is None else move['accuracy']
+            effects = {field: move[field] for field in EFFECT_FIELDS if move.get(field)}
+            effects = json.dumps(effects, separators=(',', ':')) if effects else ""
+            move_records += MOVE.pack(*strings.add(move['name']), power,
+                                      type_ids[move['type']], CATEGORIES.index(move['category']),
+                                      move.get('priority', 0), accuracy, *strings.add(effects))
+
+    # Species
+    species_records = bytearray()
+    for data in pokemon_stats:
+        if len(data['moves']) > MAX_MOVES:
+            raise ValueError(f"{data['name']} has more than {MAX_MOVES} moves")
+        types = [type_ids[t] for t in data['type']] + [len(type_names)] * 2
+        stats = [data['stats'].get(name, NO_STAT) for name in STAT_NAMES]
+        moves = [move_ids[move_key(m)] for m in data['moves']]
+        species_records += SPECIES.pack(
+            data.get('id') if data.get('id') is not None else -1,
+            *strings.add(data['name']), types[0], types[1], *stats,
+            len(moves), *(moves + [NO_MOVE] * (MAX_MOVES - len(moves))),
+            *strings.add(_sprite_name(data.get('sprite_front'))),
+            *strings.add(_sprite_name(data.get('sprite_back'))))
+
+    type_records = bytearray()
+    for name in type_names:
+        type_records += STRING_REF.pack(*strings.add(name))
+
+    types_offset = HEADER.size
+    moves_offset = types_offset + len(type_records)
+    species_offset = moves_offset + len(move_records)
+    strings_offset = species_offset + len(species_records)
+    header = HEADER.pack(MAGIC, VERSION, len(type_names), len(move_ids), len(pokemon_stats),
+                         types_offset, moves_offset, species_offset, strings_offset)
+
+    # Write then rename, so a reader never sees half a pack
+    with open(pack_path + ".tmp", 'wb') as f:
+        f.write(header + type_records + move_records + species_records + strings.data)
+    os.replace(pack_path + ".tmp", pack_path)
+
+
+# --- Reading ---
+
+class DataPack:
+    """
+    A memory-mapped pack. Records are read straight from the mapping
+    (struct.unpack_from), only when they are asked for.
+    Behaves like the JSON list: len(pack), pack[i] -> species dict.
+    """
+    def __init__(self, pack_path, sprite_dir=None):
+        self.path = pack_path
+        self.sprite_dir = sprite_dir or os.path.join(os.path.dirname(pack_path), "sprites")
+        with open(pack_path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self.n_types, self.n_moves, self.n_species, self._types,
+         self._moves, self._species, self._strings) = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{pack_path} is not a Pokémon pack")
+        if version != VERSION:
+            raise ValueError(f"{pack_path} is pack version {version}, expected {VERSION}")
+        self._cache = {} # {species index: dict}, filled on demand
+
+    def close(self):
+        self._map.close()
+
+    def __reduce__(self):
+        # Worker processes map the same file again instead of copying it
+        return (DataPack, (self.path, self.sprite_dir))
+
+    def __len__(self):
+        return self.n_species
+
+    def __iter__(self):
+        for i in range(self.n_species):
+            yield self[i]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.n_species))]
+        if index < 0:
+            index += self.n_species
+        data = self._cache.get(index)
+        if data is None:
+            data = self._cache[index] = self._species_dict(index)
+        return data
+
+    # --- Raw records ---
+
+    def string(self, offset, length):
+        start = self._strings + offset
+        return self._map[start:start + length].decode('utf-8')
+
+    def type_name(self, type_id):
+        if type_id >= self.n_types:
+            return None
+        return self.string(*STRING_REF.unpack_from(self._map, self._types + type_id * STRING_REF.size))
+
+    def species_record(self, index):
+        """The raw tuple of one species record (see SPECIES)."""
+        if not 0 <= index < self.n_species:
+            raise IndexError(index)
+        return SPECIES.unpack_from(self._map, self._species + index * SPECIES.size)
+
+    def move(self, move_id):
+        """One move as a JSON-style dict."""
+        (name_offset, name_length, power, type_id, category, priority, accuracy,
+         effects_offset, effects_length) = MOVE.unpack_from(self._map,
+                                                            self._moves + move_id * MOVE.size)
+        move = {
+            "name": self.string(name_offset, name_length),
+            "power": None if power == NO_POWER else power,
+            "type": self.type_name(type_id),
+            "category": CATEGORIES[category],
+            "priority": priority,
+            "accuracy": None if accuracy == NO_ACCURACY else accuracy
+        }
+        if effects_length:
+            move.update(json.loads(self.string(effects_offset, effects_length)))
+        return move
+
+    def name(self, index):
+        """The name of one species, without building its dict."""
+        record = self.species_record(index)
+        return self.string(record[1], record[2])
+
+    def names(self):
+        return [self.name(index) for index in range(self.n_species)]
+
+    def find(self, name):
+        """Index of a species by name (any case), without building the dicts."""
+        wanted = name.lower()
+        for index in range(self.n_species):
+            record = self.species_record(index)
+            if self.string(record[1], record[2]).lower() == wanted:
+                return index
+        raise KeyError(f"Unknown species: {name}")
+
+    def _sprite_path(self, offset, length):
+        name = self.string(offset, length)
+        return os.path.join(self.sprite_dir, name) if name else None
+
+    def _species_dict(self, index):
+        record = self.species_record(index)
+        species_id, name_offset, name_length, type1, type2 = record[:5]
+        stats = record[5:11]
+        n_moves = record[11]
+        move_ids = record[12:12 + n_moves]
+        front_offset, front_length, back_offset, back_length = record[16:20]
+        return {
+            "id": None if species_id == -1 else species_id,
+            "name": self.string(name_offset, name_length),
+            "type": [self.type_name(t) for t in (type1, type2) if t < self.n_types],
+            "stats": {stat: value for stat, value in zip(STAT_NAMES, stats) if value != NO_STAT},
+            "moves": [self.move(move_id) for move_id in move_ids],
+            "sprite_front": self._sprite_path(front_offset, front_length),
+            "sprite_back": self._sprite_path(back_offset, back_length)
+        }
+
+
+def pack_path_for(json_path):
+    """data/pokemon_stats.json -> data/pokemon_stats.pack"""
+    return os.path.splitext(json_path)[0] + ".pack"
+
+
+def load_roster(json_path="data/pokemon_stats.json", pack_path=None):
+    """
+    Returns the roster: the mmap'ed pack if it exists and is not older
+    than the JSON, otherwise the parsed JSON list (the fallback).
+    """
+    pack_path = pack_path or pack_path_for(json_path)
+    if os.path.exists(pack_path):
+        if not os.path.exists(json_path) or os.path.getmtime(pack_path) >= os.path.getmtime(json_path):
+            try:
+                return DataPack(pack_path)
+            except (OSError, ValueError, struct.error) as e:
+                print(f"Could not read {pack_path} ({e}), using the JSON.")
+    with open(json_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def roster_names(pokemon_stats):
+    """The species names of a roster (a pack reads only the names)."""
+    if isinstance(pokemon_stats, DataPack):
+        return pokemon_stats.names()
+    return [data['name'] for data in pokemon_stats]
+
+
+def load_pokemon_stats(pokemon_stats_json_path="data/pokemon_stats.json"):
+    """
+    load_roster() for front ends: prints what went wrong and returns None
+    instead of raising (main.py, tools).
+    """
+    try:
+        return load_roster(pokemon_stats_json_path)
+    except FileNotFoundError:
+        print(f"ERROR: could not find {pokemon_stats_json_path}.")
+        print(f"Please run 'tools/fetch_pokemon.py' first.")
+        return None
+    except Exception as e:
+        print(f"Error loading JSON: {e}")
+        return None
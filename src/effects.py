@@ -0,0 +1,274 @@
+### src/effects.py (Move effects: compiled opcodes and their interpreter)
+# What a move does besides damage comes from the data (PokeAPI "meta",
+# "stat_changes", "accuracy" and "target", see tools/fetch_pokemon.py).
+# When a move is interned (moves.intern_move) it is compiled once into a
+# flat tuple of (opcode, a, b, c) instructions, e.g. Growl:
+#
+#   ((ACCURACY, 100, 0, 0), (STAT_FOE, 'attack', -1, 100))
+#
+# Battle.execute_action runs them through HANDLERS (one function per
+# opcode), so a new kind of effect is a new handler, not another elif in
+# the battle, and the cost of a hit does not depend on how many moves exist.
+#
+# Effects that change a battler (stages, status) need a Pokemon;
+# CompactPokemon and BattlerView only take damage (the effect fails).
+from .events import (DAMAGE, EFFECTIVENESS, FAILED, HP_CHANGED, FAINTED, MISSED, STAT_CHANGED,
+                     STATUS_CHANGED, CANT_MOVE, RESIDUAL)
+
+# --- Opcodes ---                 a, b, c
+ACCURACY = 0  # accuracy %, -, -
+DAMAGE_HIT = 1 # -, -, -
+DRAIN = 2     # % of the damage healed (negative: recoil), -, -
+HEAL = 3      # % of max HP healed, -, -
+STAT_FOE = 4  # stat, stages, chance %
+STAT_SELF = 5 # stat, stages, chance %
+AILMENT = 6   # ailment, -, chance %
+FLINCH = 7    # -, -, chance %
+
+STOP = -1 # Handler result: the move ends here (missed)
+
+# Major status conditions (one at a time) and the volatile ones we run
+STATUSES = ('burn', 'freeze', 'paralysis', 'poison', 'sleep')
+VOLATILE = ('confusion', 'leech-seed')
+# Types that can't get an ailment
+IMMUNE_TYPES = {
+    'burn': ('Fire',),
+    'freeze': ('Ice',),
+    'paralysis': ('Electric',),
+    'poison': ('Poison', 'Steel'),
+    'leech-seed': ('Grass',),
+}
+# PokeAPI targets where the stat changes go to the user
+SELF_TARGETS = ('user', 'users-field', 'user-or-ally', 'user-and-allies', 'ally')
+
+
+def compile_effects(move):
+    """
+    Compiles a JSON move dict into its tuple of instructions. Moves with
+    no effect data compile to the old behaviour: damage, or nothing.
+    """
+    program = []
+    if move.get('accuracy') is not None:
+        program.append((ACCURACY, move['accuracy'], 0, 0))
+    if move.get('power'):
+        program.append((DAMAGE_HIT, 0, 0, 0))
+
+    meta = move.get('meta') or {}
+    if meta.get('drain'):
+        program.append((DRAIN, meta['drain'], 0, 0))
+    if meta.get('healing'):
+        program.append((HEAL, meta['healing'], 0, 0))
+
+    # A chance of 0 in PokeAPI means "always" (the move's main effect)
+    stat_op = STAT_SELF if move.get('target') in SELF_TARGETS else STAT_FOE
+    for change in move.get('stat_changes') or ():
+        program.append((stat_op, change['stat'], change['change'], meta.get('stat_chance') or 100))
+    ailment = meta.get('ailment')
+    if ailment in STATUSES or ailment in VOLATILE:
+        program.append((AILMENT, ailment, 0, meta.get('ailment_chance') or 100))
+    if meta.get('flinch_chance'):
+        program.append((FLINCH, 0, 0, meta['flinch_chance']))
+    return tuple(program)
+
+
+# --- Handlers ---
+# handler(battle, emit, attacker, defender, move, a, b, c, outcome) -> outcome
+# outcome: damage dealt so far (a status move counts 1 once something worked),
+# or STOP. Secondary effects of damaging moves need outcome > 0.
+
+def _stage_multiplier(stage):
+    return (3 + stage) / 3 if stage >= 0 else 3 / (3 - stage)
+
+def _accuracy(battle, emit, attacker, defender, move, accuracy, b, c, outcome):
+    stage = 0
+    if attacker.stages is not None:
+        stage += attacker.stages['accuracy']
+    if defender.stages is not None:
+        stage -= defender.stages['evasion']
+    if accuracy >= 100 and stage >= 0:
+        return outcome # Can't miss: no roll
+    chance = accuracy * _stage_multiplier(max(-6, min(6, stage)))
+    if battle.rng.random() * 100 < chance:
+        return outcome
+    emit(MISSED, attacker.name)
+    return STOP
+
+def _damage(battle, emit, attacker, defender, move, a, b, c, outcome):
+    damage, type_multiplier = battle._calculate_damage(attacker, defender, move)
+    if damage > 0:
+        if type_multiplier != 1.0:
+            emit(EFFECTIVENESS, defender.name, type_multiplier)
+        emit(DAMAGE, damage)
+        defender.take_damage(damage)
+    else:
+        emit(FAILED)
+    return damage
+
+def _heal(emit, pokemon, amount):
+    amount = min(amount, pokemon.hp_max - pokemon.hp_actual)
+    if amount > 0:
+        pokemon.hp_actual += amount
+        emit(HP_CHANGED, pokemon.name, pokemon.hp_actual, pokemon.hp_max)
+    return amount
+
+def _drain(battle, emit, attacker, defender, move, percent, b, c, outcome):
+    if outcome <= 0:
+        return outcome
+    amount = max(1, outcome * abs(percent) // 100)
+    if percent > 0:
+        _heal(emit, attacker, amount)
+    else:
+        attacker.take_damage(amount)
+        emit(RESIDUAL, attacker.name, 'recoil', amount)
+        emit(HP_CHANGED, attacker.name, attacker.hp_actual, attacker.hp_max)
+        if not attacker.is_alive():
+            emit(FAINTED, attacker.name)
+    return outcome
+
+def _heal_self(battle, emit, attacker, defender, move, percent, b, c, outcome):
+    if _heal(emit, attacker, max(1, attacker.hp_max * percent // 100)) > 0:
+        return outcome or 1
+    return outcome
+
+def _rolls(battle, move, chance, outcome):
+    """Whether an effect with this chance happens (secondary ones need a hit)."""
+    if move.power and outcome <= 0:
+        return False
+    return chance >= 100 or battle.rng.random() * 100 < chance
+
+def _holds_state(pokemon):
+    """Pokemon can; CompactPokemon and BattlerView can't (fixed slots / arrays)."""
+    return hasattr(pokemon, 'change_stage')
+
+def _stat(battle, emit, attacker, defender, move, stat, stages, chance, outcome, target):
+    if not _rolls(battle, move, chance, outcome) or not target.is_alive():
+        return outcome
+    changed = target.change_stage(stat, stages) if _holds_state(target) else 0
+    if changed:
+        emit(STAT_CHANGED, target.name, stat, changed)
+        return outcome or 1
+    return outcome
+
+def _stat_foe(battle, emit, attacker, defender, move, stat, stages, chance, outcome):
+    return _stat(battle, emit, attacker, defender, move, stat, stages, chance, outcome, defender)
+
+def _stat_self(battle, emit, attacker, defender, move, stat, stages, chance, outcome):
+    return _stat(battle, emit, attacker, defender, move, stat, stages, chance, outcome, attacker)
+
+def _ailment(battle, emit, attacker, defender, move, ailment, b, chance, outcome):
+    if not _rolls(battle, move, chance, outcome) or not defender.is_alive():
+        return outcome
+    if not _holds_state(defender) or any(t in defender.type
+                                          for t in IMMUNE_TYPES.get(ailment, ())):
+        return outcome
+    if ailment in STATUSES:
+        if defender.status is not None:
+            return outcome
+        turns = battle.rng.randint(1, 3) if ailment == 'sleep' else 0 # Turns asleep
+        defender.set_status(ailment, turns)
+    else:
+        volatile = defender.volatile
+        if volatile and ailment in volatile:
+            return outcome
+        if volatile is None:
+            volatile = defender.volatile = {}
+        # Confusion counts its turns left; leech seed drains the foe in front
+        volatile[ailment] = battle.rng.randint(2, 5) if ailment == 'confusion' else True
+    emit(STATUS_CHANGED, defender.name, ailment, True)
+    return outcome or 1
+
+def _flinch(battle, emit, attacker, defender, move, a, b, chance, outcome):
+    if _rolls(battle, move, chance, outcome) and defender.is_alive() and _holds_state(defender):
+        if defender.volatile is None:
+            defender.volatile = {}
+        defender.volatile['flinch'] = True
+    return outcome
+
+HANDLERS = (_accuracy, _damage, _drain, _heal_self, _stat_foe, _stat_self, _ailment, _flinch)
+
+
+def run_effects(battle, emit, attacker, defender, move):
+    """Runs a move's program. Returns the outcome (see Handlers)."""
+    outcome = 0
+    for op, a, b, c in move.effects:
+        outcome = HANDLERS[op](battle, emit, attacker, defender, move, a, b, c, outcome)
+        if outcome == STOP:
+            break
+    return outcome
+
+
+# --- Before moving / end of turn ---
+
+def before_move(battle, emit, pokemon):
+    """
+    Whether a Pokémon with a status or volatile condition gets to act
+    this turn (sleep, freeze, paralysis, flinch, confusion).
+    """
+    volatile = pokemon.volatile
+    if volatile:
+        if volatile.pop('flinch', False):
+            emit(CANT_MOVE, pokemon.name, 'flinch')
+            return False
+
+    status = pokemon.status
+    if status == 'sleep':
+        if pokemon.status_turns > 0:
+            pokemon.status_turns -= 1
+            emit(CANT_MOVE, pokemon.name, 'sleep')
+            return False
+        pokemon.set_status(None)
+        emit(STATUS_CHANGED, pokemon.name, 'sleep', False)
+    elif status == 'freeze':
+        if battle.rng.random() >= 0.2:
+            emit(CANT_MOVE, pokemon.name, 'freeze')
+            return False
+        pokemon.set_status(None)
+        emit(STATUS_CHANGED, pokemon.name, 'freeze', False)
+    elif status == 'paralysis' and battle.rng.random() < 0.25:
+        emit(CANT_MOVE, pokemon.name, 'paralysis')
+        return False
+
+    if volatile and 'confusion' in volatile:
+        volatile['confusion'] -= 1
+        if volatile['confusion'] <= 0:
+            del volatile['confusion']
+            emit(STATUS_CHANGED, pokemon.name, 'confusion', False)
+        elif battle.rng.random() < 1 / 3:
+            # Hits itself: a typeless 40 power physical move
+            attack, defense = pokemon.stats['attack'], pokemon.stats['defense']
+            damage = (((2 * pokemon.level / 5 + 2) * 40 * attack / defense) / 50) + 2
+            damage = int(damage * battle.rng.uniform(0.85, 1.0))
+            pokemon.take_damage(damage)
+            emit(RESIDUAL, pokemon.name, 'confusion', damage)
+            emit(HP_CHANGED, pokemon.name, pokemon.hp_actual, pokemon.hp_max)
+            if not pokemon.is_alive():
+                emit(FAINTED, pokemon.name)
+            return False
+    return True
+
+
+def end_of_turn(battle, emit, pokemon):
+    """Burn, poison and leech seed damage after everyone has moved."""
+    volatile = pokemon.volatile
+    if volatile:
+        volatile.pop('flinch', None)
+    if not pokemon.is_alive():
+        return
+
+    if pokemon.status in ('burn', 'poison'):
+        damage = max(1, pokemon.hp_max // (16 if pokemon.status == 'burn' else 8))
+        pokemon.take_damage(damage)
+        emit(RESIDUAL, pokemon.name, pokemon.status, damage)
+        emit(HP_CHANGED, pokemon.name, pokemon.hp_actual, pokemon.hp_max)
+
+    if volatile and 'leech-seed' in volatile and pokemon.is_alive():
+        damage = min(max(1, pokemon.hp_max // 8), pokemon.hp_actual)
+        pokemon.take_damage(damage)
+        emit(RESIDUAL, pokemon.name, 'leech-seed', damage)
+        emit(HP_CHANGED, pokemon.name, pokemon.hp_actual, pokemon.hp_max)
+        foe = battle.foe_of(pokemon)
+        if foe is not None and foe.is_alive():
+            _heal(emit, foe, damage)
+
+    if not pokemon.is_alive():
+        emit(FAINTED, pokemon.name)
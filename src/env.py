@@ -0,0 +1,394 @@
+### src/env.py (Vectorized training environment over Game)
+# Steps B battles at once for move-selection bots: one action per battle
+# in, NumPy arrays out (observations, rewards, done flags), and a battle
+# that ends is started again right away (auto-reset).
+#
+#   env = VectorEnv(pokemon_stats, 64, seed=1)
+#   obs = env.reset()                       # {"hp": (64, 2), "moves": (64, 4, 5), ...}
+#   obs, rewards, dones, truncated = env.step(actions)
+#
+# Every array lives in one flat buffer (see make_arrays). SubprocVectorEnv
+# puts that buffer in shared memory and splits the battles between worker
+# processes: each one writes its rows in place, and only a few bytes per
+# step go through the pipes. The arrays are reused by every step, so copy
+# what has to be kept. Needs NumPy.
+import multiprocessing
+import operator
+import os
+import random
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from . import utils
+from .ai import POLICIES
+from .effects import STATUSES
+from .game import Game, PARTY_SIZE
+from .pokemon import STAT_NAMES
+from .registry import Registry
+
+# --- Actions ---
+# 0 to MAX_MOVES - 1: use that move. MAX_MOVES + slot: switch to that party
+# slot (the only choice after the player's Pokémon fainted).
+MAX_MOVES = 4
+N_ACTIONS = MAX_MOVES + PARTY_SIZE
+# action_mask rows with the first n moves allowed and no switches
+_MOVE_MASKS = tuple((True,) * n + (False,) * (N_ACTIONS - n) for n in range(MAX_MOVES + 1))
+
+# A battle where both sides only use status moves never ends:
+# after this many turns it is cut (truncated, reward 0)
+MAX_TURNS = 200
+
+# Reward of a finished game, by Game.result winner
+_REWARDS = {'player': 1.0, 'opponent': -1.0, 'draw': 0.0}
+
+# --- Observations ---
+BATTLE_STATS = STAT_NAMES[1:] # Current values, with stages and status applied
+MOVE_FEATURES = ("power", "type_id", "physical", "priority", "accuracy")
+STATUS_IDS = {None: 0, **{status: i + 1 for i, status in enumerate(STATUSES)}}
+_battle_stats = operator.itemgetter(*BATTLE_STATS)
+
+# (name, dtype, shape of one battle). Index 0 of every "2" is the player's side.
+OBS_FIELDS = (
+    ("hp", np.float32, (2,)),                   # HP fraction in front
+    ("stats", np.float32, (2, len(BATTLE_STATS))),
+    ("types", np.int8, (2, 2)),                 # Type IDs (utils), second one NO_TYPE if none
+    ("status", np.int8, (2,)),                  # 0 or 1 + index in effects.STATUSES
+    ("party", np.int8, (2,)),                   # Pokémon still standing
+    ("moves", np.float32, (MAX_MOVES, len(MOVE_FEATURES))), # The player's, zeros if missing
+    ("action_mask", np.bool_, (N_ACTIONS,)),
+)
+STEP_FIELDS = (
+    ("actions", np.int64, ()),
+    ("rewards", np.float32, ()),  # +1 won, -1 lost, 0 draw or otherwise
+    ("dones", np.bool_, ()),      # The battle ended (won, lost or truncated)
+    ("truncated", np.bool_, ()),  # ... because it reached max_turns
+)
+FIELDS = OBS_FIELDS + STEP_FIELDS
+
+
+def _field_sizes(num_envs):
+    """[(name, dtype, shape, offset)] and the total size in bytes (8-byte aligned fields)."""
+    layout, offset = [], 0
+    for name, dtype, shape in FIELDS:
+        shape = (num_envs,) + shape
+        layout.append((name, dtype, shape, offset))
+        size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        offset += (size + 7) // 8 * 8
+    return layout, offset
+
+
+def buffer_size(num_envs):
+    """Bytes of the flat buffer behind the arrays of num_envs battles."""
+    return _field_sizes(num_envs)[1]
+
+
+def make_arrays(num_envs, buffer=None):
+    """
+    {name: array of shape (num_envs, ...)} for every field in FIELDS, all
+    views into one buffer (a new bytearray, or e.g. SharedMemory.buf).
+    """
+    layout, size = _field_sizes(num_envs)
+    if buffer is None:
+        buffer = bytearray(size)
+    return {name: np.ndarray(shape, dtype, buffer, offset)
+            for name, dtype, shape, offset in layout}
+
+
+# Move rows by moveset (movesets are interned, see moves.py)
+_move_rows = {}
+
+def move_rows(moves):
+    """The "moves" observation of a moveset: (MAX_MOVES, len(MOVE_FEATURES)) floats."""
+    rows = _move_rows.get(moves)
+    if rows is None:
+        rows = np.zeros((MAX_MOVES, len(MOVE_FEATURES)), dtype=np.float32)
+        for i, move in enumerate(moves[:MAX_MOVES]):
+            accuracy = 100 if move.accuracy is None else move.accuracy # None: can't miss
+            rows[i] = (move.power or 0, move.type_id, move.physical, move.priority, accuracy)
+        _move_rows[moves] = rows
+    return rows
+
+
+class VectorEnv:
+    """
+    num_envs Games stepped together, in this process. Every battle has its
+    own random.Random, seeded from (seed, battle number), so a battle plays
+    the same whatever the number of envs or workers around it.
+
+    The player's party is `species` (indexes or names, the first one leads)
+    or party_size random species; the opponent is the Game's (it uses
+    opponent_policy, a function or a name from ai.POLICIES).
+    """
+    def __init__(self, pokemon_stats, num_envs, seed=None, opponent_policy="random",
+                 party_size=1, species=None, max_turns=MAX_TURNS, registry=None,
+                 arrays=None, first_env=0):
+        if isinstance(opponent_policy, str):
+            opponent_policy = POLICIES[opponent_policy]
+        self.registry = registry if registry else Registry(pokemon_stats)
+        self.num_envs = num_envs
+        self.party_size = len(species) if species else party_size
+        self.species = [self.registry.get(s).index for s in species] if species else None
+        self.max_turns = max_turns
+        # All arrays are views into one buffer (SubprocVectorEnv passes
+        # this worker's rows of the shared one)
+        self.arrays = arrays if arrays is not None else make_arrays(num_envs)
+        self.observations = {name: self.arrays[name] for name, _, _ in OBS_FIELDS}
+        self._flat = {name: array.reshape(-1) for name, array in self.observations.items()}
+
+        self.games = [Game(pokemon_stats, registry=self.registry,
+                           rng=random.Random(None if seed is None else f"{seed}:{first_env + i}"),
+                           opponent_policy=opponent_policy, record_events=False)
+                      for i in range(num_envs)]
+        self.turns = [0] * num_envs
+        self._masks = [None] * num_envs # The action_mask rows, as lists
+        self._movesets = [None] * num_envs # Moveset in each "moves" row
+
+    def reset(self):
+        """Starts every battle again. Returns the observations."""
+        for i in range(self.num_envs):
+            self._reset(i)
+        self._observe()
+        return self.observations
+
+    def _reset(self, i):
+        game = self.games[i]
+        species = self.species
+        if species is None:
+            roster = range(len(self.registry))
+            if self.party_size <= len(roster):
+                species = game.rng.sample(roster, self.party_size)
+            else:
+                species = [game.rng.choice(roster) for _ in range(self.party_size)]
+        game.select_party(species)
+        self.turns[i] = 0
+
+    def step(self, actions=None):
+        """
+        Runs one turn of every battle. actions: one per battle, allowed by
+        its action_mask (None: the "actions" array already holds them).
+        Finished battles are reset, so their observation is the new battle.
+        Returns (observations, rewards, dones, truncated).
+        """
+        arrays = self.arrays
+        if actions is None:
+            actions = arrays["actions"]
+        actions = actions.tolist() if hasattr(actions, 'tolist') else list(actions)
+        if len(actions) != self.num_envs:
+            raise ValueError(f"Expected {self.num_envs} actions, got {len(actions)}")
+
+        if self._masks[0] is None:
+            raise RuntimeError("Call reset() before step()")
+        for i, (action, mask) in enumerate(zip(actions, self._masks)):
+            if not 0 <= action < N_ACTIONS or not mask[action]:
+                raise ValueError(f"Action {action} is not allowed in battle {i}")
+
+        rewards = [0.0] * self.num_envs
+        dones = [False] * self.num_envs
+        truncated = [False] * self.num_envs
+        turns, max_turns = self.turns, self.max_turns
+        for i, game in enumerate(self.games):
+            action = actions[i]
+            if action < MAX_MOVES:
+                game.run_battle_turn(action)
+            else:
+                game.switch(action - MAX_MOVES)
+            turns[i] += 1
+
+            if game.state == 'GAME_OVER':
+                rewards[i] = _REWARDS[game.result.winner]
+                dones[i] = True
+            elif turns[i] >= max_turns:
+                dones[i] = truncated[i] = True
+            if dones[i]:
+                self._reset(i)
+
+        arrays["rewards"][:] = rewards
+        arrays["dones"][:] = dones
+        arrays["truncated"][:] = truncated
+        self._observe()
+        return self.observations, arrays["rewards"], arrays["dones"], arrays["truncated"]
+
+    def _observe(self):
+        """Writes every battle's observation (flat lists, one array assignment per field)."""
+        hp, stats, types, status, party, mask_values = [], [], [], [], [], []
+        masks, moves, movesets = self._masks, self.observations["moves"], self._movesets
+        battle_stats = _battle_stats
+        type_slots = utils.NUM_TYPES + 1
+        for i, game in enumerate(self.games):
+            player, opponent = game.player_pokemon, game.opponent_pokemon
+            hp += (player.hp_actual / player.hp_max, opponent.hp_actual / opponent.hp_max)
+            stats += battle_stats(player.stats)
+            stats += battle_stats(opponent.stats)
+            types += divmod(player.type_key, type_slots)
+            types += divmod(opponent.type_key, type_slots)
+            status += (STATUS_IDS[player.status], STATUS_IDS[opponent.status])
+            party += (sum(p.hp_actual > 0 for p in game.player_party),
+                      sum(p.hp_actual > 0 for p in game.opponent_party))
+            if movesets[i] is not player.moves:
+                moves[i] = move_rows(player.moves)
+                movesets[i] = player.moves
+            masks[i] = mask = self._action_mask(game)
+            mask_values += mask
+
+        flat = self._flat
+        flat["hp"][:] = hp
+        flat["stats"][:] = stats
+        flat["types"][:] = types
+        flat["status"][:] = status
+        flat["party"][:] = party
+        flat["action_mask"][:] = mask_values
+
+    @staticmethod
+    def _action_mask(game):
+        if game.state == 'IN_BATTLE':
+            mask = _MOVE_MASKS[min(len(game.player_pokemon.moves), MAX_MOVES)]
+        else:
+            mask = _MOVE_MASKS[0] # Only switching
+        if len(game.player_party) > 1:
+            mask = list(mask)
+            for slot in game.get_switch_options():
+                mask[MAX_MOVES + slot] = True
+        return mask
+
+
+# --- Worker processes ---
+
+def _worker(pipe, shm_name, num_envs, start, stop, pokemon_stats, options):
+    """Runs battles start..stop of a SubprocVectorEnv, in its shared buffer."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    arrays = {name: array[start:stop] for name, array in make_arrays(num_envs, shm.buf).items()}
+    env = VectorEnv(pokemon_stats, stop - start, arrays=arrays, first_env=start, **options)
+    try:
+        while True:
+            command = pipe.recv()
+            if command is None:
+                break
+            try:
+                if command == "step":
+                    env.step()
+                else:
+                    env.reset()
+                pipe.send(None)
+            except Exception as e:
+                pipe.send(e)
+    finally:
+        del env, arrays # No views may be left when the buffer is closed
+        shm.close()
+        pipe.close()
+
+
+class SubprocVectorEnv:
+    """
+    Like VectorEnv, with the battles split between worker processes that
+    share one memory buffer with this one (same arguments, plus workers).
+    Call close() (or use it in a with block) to stop the workers.
+    """
+    def __init__(self, pokemon_stats, num_envs, workers=None, **options):
+        if workers is None:
+            workers = os.cpu_count() or 1
+        workers = max(1, min(workers, num_envs))
+        self.num_envs = num_envs
+        self.shm = shared_memory.SharedMemory(create=True, size=buffer_size(num_envs))
+        self.arrays = make_arrays(num_envs, self.shm.buf)
+        self.observations = {name: self.arrays[name] for name, _, _ in OBS_FIELDS}
+
+        # Contiguous rows per worker, as even as possible
+        bounds = [num_envs * w // workers for w in range(workers + 1)]
+        self._pipes, self._processes = [], []
+        for start, stop in zip(bounds, bounds[1:]):
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_worker, daemon=True,
+                args=(child, self.shm.name, num_envs, start, stop, pokemon_stats, options))
+            process.start()
+            child.close()
+            self._pipes.append(parent)
+            self._processes.append(process)
+
+    def _command(self, command):
+        for pipe in self._pipes:
+            pipe.send(command)
+        errors = [error for error in (pipe.recv() for pipe in self._pipes) if error is not None]
+        if errors:
+            raise errors[0]
+
+    def reset(self):
+        self._command("reset")
+        return self.observations
+
+    def step(self, actions):
+        """Same as VectorEnv.step (the arrays are in shared memory)."""
+        self.arrays["actions"][:] = actions
+        self._command("step")
+        arrays = self.arrays
+        return self.observations, arrays["rewards"], arrays["dones"], arrays["truncated"]
+
+    def close(self):
+        if self.shm is None:
+            return
+        for pipe in self._pipes:
+            pipe.send(None)
+        for process in self._processes:
+            process.join()
+        for pipe in self._pipes:
+            pipe.close()
+        self.arrays = self.observations = None
+        self.shm.close()
+        self.shm.unlink()
+        self.shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def random_actions(rng, action_mask):
+    """A random allowed action per battle (numpy.random.Generator, action_mask array)."""
+    return (rng.random(action_mask.shape) * action_mask).argmax(axis=1)
+
+
+def main(argv=None):
+    """Command line: python -m src.env --envs 256 --workers 4 --steps 2000"""
+    import argparse
+    import time
+    from .datapack import load_roster
+    parser = argparse.ArgumentParser(description="Vectorized environment throughput")
+    parser.add_argument("--envs", type=int, default=256)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Worker processes (default: one per CPU, 0: this process)")
+    parser.add_argument("--steps", type=int, default=2000)
+    parser.add_argument("--party-size", type=int, default=1)
+    parser.add_argument("--policy", choices=POLICIES, default="random", help="Opponent policy")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data", default="data/pokemon_stats.json")
+    args = parser.parse_args(argv)
+
+    pokemon_stats = load_roster(args.data) # Binary pack if built, else the JSON
+    options = dict(seed=args.seed, opponent_policy=args.policy, party_size=args.party_size)
+    if args.workers == 0:
+        env = VectorEnv(pokemon_stats, args.envs, **options)
+    else:
+        env = SubprocVectorEnv(pokemon_stats, args.envs, args.workers, **options)
+
+    rng = np.random.default_rng(args.seed)
+    observations = env.reset()
+    episodes = wins = 0
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        observations, rewards, dones, _ = env.step(random_actions(rng, observations["action_mask"]))
+        episodes += int(dones.sum())
+        wins += int((rewards > 0).sum())
+    elapsed = time.perf_counter() - start
+    if isinstance(env, SubprocVectorEnv):
+        env.close()
+
+    steps = args.steps * args.envs
+    print(f"{steps} env-steps in {elapsed:.2f}s ({steps / elapsed:,.0f} steps/s), "
+          f"{episodes} battles, win rate {wins / max(episodes, 1):.2%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+### src/events.py (Structured battle events)
+# Battle and Game report what happens as small typed events
+# (kind, a, b, c) instead of formatted strings. Text is only built
+# when a consumer asks for it (format_event), e.g. Game.get_pending_messages.
+
+# --- Event Kinds ---            payload (a, b, c)
+MOVE_USED = 0        # attacker name, MoveRecord
+EFFECTIVENESS = 1    # defender name, type multiplier (only when it is not 1.0)
+DAMAGE = 2           # damage
+FAILED = 3           # -
+HP_CHANGED = 4       # Pokémon name, hp_actual, hp_max
+FAINTED = 5          # Pokémon name
+STARTER_CHOSEN = 6   # Pokémon name
+OPPONENT_CHOSEN = 7  # Pokémon name
+BATTLE_WON = 8       # -
+BATTLE_LOST = 9      # -
+MESSAGE = 10         # free text (Game.log)
+SWITCHED = 11        # Pokémon name, True if it is the player's
+MISSED = 12          # attacker name
+STAT_CHANGED = 13    # Pokémon name, stat, stages (+ rose, - fell)
+STATUS_CHANGED = 14  # Pokémon name, ailment, True if it starts (False: it ended)
+CANT_MOVE = 15       # Pokémon name, reason (flinch, sleep, freeze, paralysis)
+RESIDUAL = 16        # Pokémon name, cause (burn, poison, leech-seed, confusion, recoil), damage
+BATTLE_DRAW = 17     # - (both sides ran out of Pokémon in the same turn)
+
+EVENT_NAMES = ("MoveUsed", "Effectiveness", "Damage", "Failed", "HpChanged", "Fainted",
+               "StarterChosen", "OpponentChosen", "BattleWon", "BattleLost", "Message",
+               "Switched", "Missed", "StatChanged", "StatusChanged", "CantMove", "Residual",
+               "BattleDraw")
+
+# --- Message texts of the effect events ---
+_STAGE_WORDS = {1: "rose!", 2: "rose sharply!", 3: "rose drastically!",
+                -1: "fell!", -2: "harshly fell!", -3: "severely fell!"}
+_STATUS_START = {
+    'burn': "{} was burned!", 'freeze': "{} was frozen solid!",
+    'paralysis': "{} is paralyzed! It may be unable to move!", 'poison': "{} was poisoned!",
+    'sleep': "{} fell asleep!", 'confusion': "{} became confused!",
+    'leech-seed': "{} was seeded!",
+}
+_STATUS_END = {'sleep': "{} woke up!", 'freeze': "{} thawed out!",
+               'confusion': "{} snapped out of its confusion!"}
+_CANT_MOVE = {'flinch': "{} flinched and couldn't move!", 'sleep': "{} is fast asleep.",
+              'freeze': "{} is frozen solid!", 'paralysis': "{} is paralyzed! It can't move!"}
+_RESIDUAL = {'burn': "{} was hurt by its burn!", 'poison': "{} was hurt by poison!",
+             'leech-seed': "{}'s health is sapped by Leech Seed!",
+             'confusion': "{} hurt itself in its confusion!",
+             'recoil': "{} is damaged by the recoil!"}
+
+DEFAULT_CAPACITY = 1024
+
+
+class EventBuffer:
+    """
+    A preallocated ring buffer of events. emit() only stores references
+    (no allocation, no formatting). When it is full, the oldest events are
+    overwritten and counted in `dropped`.
+    """
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        # Power of two, so the slot is a bit mask instead of a modulo
+        size = 1
+        while size < capacity:
+            size *= 2
+        self.capacity = size
+        self._mask = size - 1
+        self._kind = [0] * size
+        self._a = [None] * size
+        self._b = [None] * size
+        self._c = [None] * size
+        self._head = 0 # Next event to read
+        self._tail = 0 # Next slot to write
+        self.dropped = 0
+
+    def __len__(self):
+        return self._tail - self._head
+
+    def emit(self, kind, a=None, b=None, c=None):
+        slot = self._tail & self._mask
+        self._kind[slot] = kind
+        self._a[slot] = a
+        self._b[slot] = b
+        self._c[slot] = c
+        self._tail += 1
+        if self._tail - self._head > self.capacity:
+            self._head += 1
+            self.dropped += 1
+
+    def peek(self):
+        """Returns the pending events as (kind, a, b, c) tuples."""
+        mask = self._mask
+        return [(self._kind[i & mask], self._a[i & mask], self._b[i & mask], self._c[i & mask])
+                for i in range(self._head, self._tail)]
+
+    def drain(self):
+        """Returns the pending events and clears them."""
+        events = self.peek()
+        self._head = self._tail
+        return events
+
+    def clear(self):
+        self._head = self._tail
+
+
+def format_event(event):
+    """The message text of an event (what main.py prints)."""
+    kind, a, b, c = event
+    if kind == MOVE_USED:
+        return f"{a} used {b.name}!"
+    if kind == EFFECTIVENESS:
+        if b > 1.0:
+            return "It's super effective!"
+        if b > 0.0:
+            return "It's not very effective..."
+        return f"It doesn't affect {a}..."
+    if kind == DAMAGE:
+        return f"It deals {a} damage!"
+    if kind == FAILED:
+        return "But it failed!" # (Simple log for status moves)
+    if kind == HP_CHANGED:
+        return f"{a} has {b}/{c} HP remaining."
+    if kind == FAINTED:
+        return f"{a} fainted!"
+    if kind == STARTER_CHOSEN:
+        return f"You chose {a}!"
+    if kind == OPPONENT_CHOSEN:
+        return f"Your opponent chose {a}!"
+    if kind == BATTLE_WON:
+        return "You won!"
+    if kind == BATTLE_LOST:
+        return "You have been defeated!"
+    if kind == BATTLE_DRAW:
+        return "Both sides are out of Pokémon. It's a draw!"
+    if kind == SWITCHED:
+        return f"Go! {a}!" if b else f"Your opponent sent out {a}!"
+    if kind == MISSED:
+        return f"{a}'s attack missed!"
+    if kind == STAT_CHANGED:
+        words = _STAGE_WORDS[max(-3, min(3, c))]
+        return f"{a}'s {b.replace('-', ' ').title()} {words}"
+    if kind == STATUS_CHANGED:
+        return (_STATUS_START if c else _STATUS_END)[b].format(a)
+    if kind == CANT_MOVE:
+        return _CANT_MOVE[b].format(a)
+    if kind == RESIDUAL:
+        return _RESIDUAL[b].format(a)
+    return str(a)
+
+
+def format_events(events):
+    """Formats a list of events into message strings."""
+    return [format_event(event) for event in events]
@@ -1,21 +1,63 @@
 ### src/game.py (The Main "Brain")
 import random
-from .pokemon import Pokemon
+from collections import namedtuple
+from .registry import Registry
 from .battle import Battle
+from .ai import random_policy
+from .calc import hits_to_ko
+from .snapshot import take_snapshot, restore_snapshot, clone_game
+from .events import (EventBuffer, format_event, MESSAGE, STARTER_CHOSEN, OPPONENT_CHOSEN,
+                     BATTLE_WON, BATTLE_LOST, BATTLE_DRAW, SWITCHED)
+
+PARTY_SIZE = 6 # Most Pokémon a side can bring
+NO_KO_HITS = 255 # Hits counted for a side that can't KO (as MatchupMatrix.advantage)
+
+# How a finished battle ended (Game.result): winner is 'player', 'opponent' or
+# 'draw' (both sides fainted out in the same turn),
+# the parties are tuples of species names, *_left how many are still standing.
+MatchResult = namedtuple('MatchResult', ('winner', 'turns', 'player_party', 'opponent_party',
+                                         'player_left', 'opponent_left'))
 
 class Game:
     """
     The main "Brain" of the game. Manages state
     (menus, battle, etc.) and logic. It is 100% pure.
     """
-    def __init__(self, pokemon_stats):
+    def __init__(self, pokemon_stats, registry=None, rng=None, opponent_policy=None,
+                 record_events=True, metrics=None):
         self.pokemon_stats = pokemon_stats
-        self.state = 'STARTER_SELECTION' # State machine
-        self.pending_messages = []
+        # Built once, clones battlers (a server can share one between games)
+        self.registry = registry if registry else Registry(pokemon_stats)
+        # One random.Random per game (shared with its Battle): pass
+        # random.Random(seed) to make the whole game reproducible.
+        self.rng = rng if rng else random.Random()
+        # How the opponent picks its move: policy(attacker, defender, rng) -> index
+        # (see ai.py, e.g. ai.ExpectiminimaxPolicy())
+        self.opponent_policy = opponent_policy if opponent_policy else random_policy
+        # State machine: STARTER_SELECTION -> IN_BATTLE <-> CHOOSE_REPLACEMENT -> GAME_OVER
+        # (CHOOSE_REPLACEMENT: the player's Pokémon fainted, switch() one in)
+        self.state = 'STARTER_SELECTION'
+        # What happened since the last get_pending_messages(), as events.
+        # record_events=False turns it off completely (bulk simulation).
+        self.events = EventBuffer() if record_events else None
+        # Change notifications for the "Face": version goes up after every
+        # mutation, and every subscriber is called with the game.
+        self.version = 0
+        self._subscribers = []
         
+        # Parties (1 to PARTY_SIZE Pokémon); *_pokemon is the one in battle
+        self.player_party = []
+        self.opponent_party = []
         self.player_pokemon = None
         self.opponent_pokemon = None
         self.current_battle = None
+        self.turns = 0 # Turns played in this battle (moves and switches, not replacements)
+
+        # Optional metrics.Metrics (timers and counters). None costs nothing:
+        # the methods are only wrapped when it is given.
+        self.metrics = metrics
+        if metrics is not None:
+            metrics.instrument_game(self)
 
     # --- Functions for main.py (The "Face") ---
     
@@ -23,67 +65,220 @@ class Game:
         """Returns the current game state."""
         return self.state
 
+    @property
+    def pending_messages(self):
+        """The queued messages as text (without clearing them)."""
+        if self.events is None:
+            return []
+        return [format_event(event) for event in self.events.peek()]
+
     def get_pending_messages(self):
-        """Returns the message queue and clears it."""
-        messages = self.pending_messages
-        self.pending_messages = []
-        return messages
+        """Returns the message queue (formatted now, not when it happened) and clears it."""
+        if self.events is None:
+            return []
+        return [format_event(event) for event in self.events.drain()]
+
+    def get_pending_events(self):
+        """Returns the queued events (kind, a, b, c) and clears them. See events.py."""
+        if self.events is None:
+            return []
+        return self.events.drain()
+
+    def subscribe(self, callback):
+        """callback(game) is called after every change (see version)."""
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        self._subscribers.remove(callback)
+
+    # --- Saving ---
+
+    def snapshot(self):
+        """The whole game as a few KB of bytes (see snapshot.py)."""
+        return take_snapshot(self)
+
+    def restore(self, data):
+        """Goes back to a snapshot taken from a Game with the same roster."""
+        restore_snapshot(self, data)
+        self._changed()
+
+    def clone(self, events=True):
+        """An independent copy to play ahead with (e.g. AI search)."""
+        return clone_game(self, events)
 
     def get_starter_info(self):
         """Returns a list of starter names."""
-        return [s['name'] for s in self.pokemon_stats]
+        return list(self.registry.names())
 
     def get_battle_info(self):
         """Returns a dictionary with the current battle state."""
         if self.current_battle:
-            return self.current_battle.get_state_info()
+            info = self.current_battle.get_state_info()
+            info["player_party"] = [pokemon.get_simple_info() for pokemon in self.player_party]
+            info["opponent_party"] = [pokemon.get_simple_info() for pokemon in self.opponent_party]
+            return info
         return None
 
+    @property
+    def result(self):
+        """The MatchResult once the state is GAME_OVER, None before."""
+        if self.state != 'GAME_OVER':
+            return None
+        # The battle ends when a side has nobody left (both of them: a draw)
+        player_left = sum(pokemon.is_alive() for pokemon in self.player_party)
+        opponent_left = sum(pokemon.is_alive() for pokemon in self.opponent_party)
+        if player_left:
+            winner = 'player'
+        else:
+            winner = 'opponent' if opponent_left else 'draw'
+        return MatchResult(winner, self.turns,
+                           tuple(pokemon.name for pokemon in self.player_party),
+                           tuple(pokemon.name for pokemon in self.opponent_party),
+                           player_left, opponent_left)
+
+    def get_switch_options(self):
+        """Party indexes the player can switch to (alive and not in battle)."""
+        return [i for i, pokemon in enumerate(self.player_party)
+                if pokemon.is_alive() and pokemon is not self.player_pokemon]
+
     # --- Logic Functions (Mutations) ---
 
     def select_starter(self, chosen_index):
-        """Logic for when the player selects a starter."""
+        """Logic for when the player selects a starter (a party of one)."""
+        self._start_battle([chosen_index])
+
+    def select_party(self, chosen_indices):
+        """Starts a battle with a party (species indexes, the first one leads)."""
+        self._start_battle(list(chosen_indices))
+
+    def _start_battle(self, chosen_indices):
+        if not 1 <= len(chosen_indices) <= PARTY_SIZE:
+            raise ValueError(f"A party has 1 to {PARTY_SIZE} Pokémon")
         # 1. Create the player's Pokémon
-        player_data = self.pokemon_stats[chosen_index]
-        self.player_pokemon = Pokemon(**player_data)
-        self.log(f"You chose {self.player_pokemon.name}!")
+        self.player_party = [self.registry.create(index) for index in chosen_indices]
+        self.player_pokemon = self.player_party[0]
+        self._emit(STARTER_CHOSEN, self.player_pokemon.name)
         
-        # 2. The opponent chooses another
-        possible_indices = [0, 1, 2]
-        possible_indices.pop(chosen_index)
-        opponent_index = random.choice(possible_indices)
+        # 2. The opponent chooses as many others (repeating only if the roster is too small)
+        possible_indices = [i for i in range(len(self.registry)) if i not in chosen_indices]
+        possible_indices = possible_indices or list(range(len(self.registry)))
+        if len(possible_indices) >= len(chosen_indices):
+            opponent_indices = self.rng.sample(possible_indices, len(chosen_indices))
+        else:
+            opponent_indices = [self.rng.choice(possible_indices) for _ in chosen_indices]
         
-        opponent_data = self.pokemon_stats[opponent_index]
-        self.opponent_pokemon = Pokemon(**opponent_data)
-        self.log(f"Your opponent chose {self.opponent_pokemon.name}!")
+        self.opponent_party = [self.registry.create(index) for index in opponent_indices]
+        self.opponent_pokemon = self.opponent_party[0]
+        self._emit(OPPONENT_CHOSEN, self.opponent_pokemon.name)
         
         # 3. Start the battle
-        self.current_battle = Battle(self.player_pokemon, self.opponent_pokemon, self.log)
+        self.current_battle = Battle(self.player_pokemon, self.opponent_pokemon, self.events, self.rng,
+                                     self.metrics)
         self.state = 'IN_BATTLE'
+        self.turns = 0
+        self._changed()
 
     def run_battle_turn(self, player_move_index):
         """Executes one full battle turn."""
-        if not self.current_battle:
+        if not self.current_battle or self.state != 'IN_BATTLE':
             return
             
         player_move = self.player_pokemon.moves[player_move_index]
-        opponent_move = random.choice(self.opponent_pokemon.moves)
+        opponent_index = self.opponent_policy(self.opponent_pokemon, self.player_pokemon, self.rng)
+        opponent_move = self.opponent_pokemon.moves[opponent_index]
         
-        # (We assume player is faster for now)
-        # TODO: Implement speed check
-        self.current_battle.execute_action(self.player_pokemon, self.opponent_pokemon, player_move)
-        
-        if self.opponent_pokemon.is_alive():
-            self.current_battle.execute_action(self.opponent_pokemon, self.player_pokemon, opponent_move)
+        # Priority, then speed (ties decided by self.rng), see scheduler.py
+        self.current_battle.run_turn(((self.player_pokemon, self.opponent_pokemon, player_move),
+                                      (self.opponent_pokemon, self.player_pokemon, opponent_move)))
+        self.turns += 1
+        self._after_turn()
+
+    def switch(self, party_index):
+        """
+        Sends out another party member. In battle it takes the player's turn
+        (switching always goes before moves, then the opponent attacks);
+        in CHOOSE_REPLACEMENT it replaces the fainted Pokémon for free.
+        """
+        if party_index not in self.get_switch_options():
+            raise ValueError(f"Can't switch to party slot {party_index}")
+        if self.state == 'CHOOSE_REPLACEMENT':
+            self._send_out(self.player_party[party_index], True)
+            self.state = 'IN_BATTLE'
+            self._changed()
+            return
+        if self.state != 'IN_BATTLE':
+            return
+
+        # The opponent picked its move against the Pokémon that was there
+        opponent_index = self.opponent_policy(self.opponent_pokemon, self.player_pokemon, self.rng)
+        opponent_move = self.opponent_pokemon.moves[opponent_index]
+        self._send_out(self.player_party[party_index], True)
+        self.current_battle.run_turn(((self.opponent_pokemon, self.player_pokemon, opponent_move),))
+        self.turns += 1
+        self._after_turn()
 
-        # Check for end-of-battle conditions
-        if not self.player_pokemon.is_alive():
-            self.log(f"You have been defeated!")
+    def _send_out(self, pokemon, is_player):
+        (self.player_pokemon if is_player else self.opponent_pokemon).clear_volatile()
+        if is_player:
+            self.player_pokemon = self.current_battle.player_pokemon = pokemon
+        else:
+            self.opponent_pokemon = self.current_battle.opponent_pokemon = pokemon
+        self._emit2(SWITCHED, pokemon.name, is_player)
+
+    def _opponent_replacement(self):
+        """The opponent's next Pokémon: the best matchup against ours, or None."""
+        alive = [pokemon for pokemon in self.opponent_party if pokemon.is_alive()]
+        if len(alive) <= 1:
+            return alive[0] if alive else None
+        # Only these few pairs are scored (the full MatchupMatrix is never built mid-turn):
+        # how many hits sooner the candidate knocks out our Pokémon than the other way round
+        foe = self.player_pokemon
+        def score(pokemon):
+            ours, damage = hits_to_ko(pokemon, foe, foe.hp_max)
+            theirs, _ = hits_to_ko(foe, pokemon, pokemon.hp_max)
+            return ((theirs or NO_KO_HITS) - (ours or NO_KO_HITS), damage)
+        return max(alive, key=score)
+
+    def _after_turn(self):
+        # Check for end-of-battle conditions (and send out the next Pokémon).
+        # Both sides can faint in the same turn (burn, recoil...), so both are checked.
+        player_down = not self.player_pokemon.is_alive()
+        replacement = None
+        if not self.opponent_pokemon.is_alive():
+            replacement = self._opponent_replacement()
+        player_out = player_down and not self.get_switch_options()
+        opponent_out = not self.opponent_pokemon.is_alive() and replacement is None
+        if player_out and opponent_out:
+            self._emit(BATTLE_DRAW)
+            self.state = 'GAME_OVER'
+        elif player_out:
+            self._emit(BATTLE_LOST)
             self.state = 'GAME_OVER'
-        elif not self.opponent_pokemon.is_alive():
-            self.log(f"You won!")
+        elif opponent_out:
+            self._emit(BATTLE_WON)
             self.state = 'GAME_OVER'
+        else:
+            # The opponent's replacement comes out first, then the player picks theirs
+            if replacement is not None:
+                self._send_out(replacement, False)
+            if player_down:
+                self.state = 'CHOOSE_REPLACEMENT'
+        self._changed()
 
     def log(self, message):
         """Adds a message to the queue for the "Face" (main.py) to display."""
-        self.pending_messages.append(message)
\ No newline at end of file
+        self._emit(MESSAGE, message)
+        self._changed()
+
+    def _emit(self, kind, a=None):
+        if self.events is not None:
+            self.events.emit(kind, a)
+
+    def _emit2(self, kind, a, b):
+        if self.events is not None:
+            self.events.emit(kind, a, b)
+
+    def _changed(self):
+        self.version += 1
+        for callback in self._subscribers:
+            callback(self)
@@ -0,0 +1,226 @@
+### src/journal.py (Append-only battle journal: replay and crash recovery)
+# A journal is a file of small records, only ever appended to:
+#
+#   SEED      the game's random.Random was seeded with this (fresh game)
+#   SNAPSHOT  a full snapshot.py snapshot (start point or checkpoint)
+#   STARTER   select_starter(index) (2 bytes; 1 in older journals)
+#   TURN      run_battle_turn(index) + the move the opponent picked
+#   LOG       log(text)
+#   PARTY     select_party(indexes)
+#   SWITCH    switch(index) + the move the opponent picked (if it used one)
+#
+# The Brain is deterministic given its random.Random, so replaying the
+# inputs gives back the same battle and the same pending_messages.
+# recover() starts from the last checkpoint instead of the first record.
+import os
+import struct
+
+from .game import Game
+
+MAGIC = b"PKJL"
+VERSION = 1
+HEADER = struct.Struct("<4sH")
+
+SEED, SNAPSHOT, STARTER, TURN, LOG, PARTY, SWITCH = range(1, 8)
+RECORD = struct.Struct("<BI") # type, payload length
+NO_INDEX = 0xFF
+CHECKPOINT_EVERY = 32 # Inputs between automatic snapshots
+
+
+class ReplayError(Exception):
+    """The replay went a different way than the recorded game."""
+    pass
+
+
+def read_records(path):
+    """
+    Returns the list of (type, payload bytes). A last record cut short
+    (the process died while writing it) is ignored.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < HEADER.size:
+        return []
+    magic, version = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a battle journal (version {VERSION})")
+    records = []
+    offset = HEADER.size
+    while offset + RECORD.size <= len(data):
+        kind, length = RECORD.unpack_from(data, offset)
+        start = offset + RECORD.size
+        if start + length > len(data):
+            break
+        records.append((kind, data[start:start + length]))
+        offset = start + length
+    return records
+
+
+class Journal:
+    """
+    Records every input of one Game into an append-only file:
+
+        journal = Journal("saves/game.journal")
+        journal.record(game, seed=1234) # fresh game, or seed=None for a snapshot
+        game.select_starter(0)          # ... written as it happens
+
+    The file is opened for each record and closed again, so a server can
+    journal thousands of sessions without keeping a file open for each.
+    Every checkpoint_every inputs a snapshot is appended, so recover()
+    never has to replay more than that.
+    """
+    def __init__(self, path, checkpoint_every=CHECKPOINT_EVERY, sync=False):
+        self.path = path
+        self.checkpoint_every = checkpoint_every
+        self.sync = sync # os.fsync after every record (slower, survives power loss)
+        self.inputs = 0
+        self.game = None
+
+    def _append(self, kind, payload=b""):
+        new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        with open(self.path, 'ab') as f:
+            if new_file:
+                f.write(HEADER.pack(MAGIC, VERSION))
+            f.write(RECORD.pack(kind, len(payload)) + payload)
+            f.flush()
+            if self.sync:
+                os.fsync(f.fileno())
+
+    def checkpoint(self):
+        """Appends a snapshot of the game right now."""
+        self._append(SNAPSHOT, self.game.snapshot())
+
+    def record(self, game, seed=None):
+        """
+        Starts recording a game. With a seed, the game's random.Random is
+        seeded with it (use it on a fresh game); without one, the journal
+        starts from a snapshot of the game as it is now.
+        """
+        self.game = game
+        if seed is not None:
+            payload = struct.pack("<q", seed) # Before seeding: a bad seed changes nothing
+            game.rng.seed(seed)
+            self._append(SEED, payload)
+        else:
+            self.checkpoint()
+
+        # The opponent's choices are written too, to detect a replay going wrong
+        policy = game.opponent_policy
+        last_choice = [NO_INDEX]
+
+        def recorded_policy(attacker, defender, rng):
+            index = policy(attacker, defender, rng)
+            last_choice[0] = index
+            return index
+        recorded_policy.__wrapped__ = policy
+        game.opponent_policy = recorded_policy
+
+        select_starter, run_battle_turn, log = game.select_starter, game.run_battle_turn, game.log
+        select_party, switch = game.select_party, game.switch
+
+        # Every input is encoded before it is played: one that can't be
+        # written raises without touching the game (and nothing is recorded)
+        def recorded_select_starter(chosen_index):
+            payload = struct.pack("<H", chosen_index)
+            select_starter(chosen_index)
+            self._append(STARTER, payload)
+            self._input_done()
+
+        def recorded_run_battle_turn(player_move_index):
+            payload = bytes((player_move_index,))
+            last_choice[0] = NO_INDEX
+            run_battle_turn(player_move_index)
+            self._append(TURN, payload + bytes((last_choice[0],)))
+            self._input_done()
+
+        def recorded_select_party(chosen_indices):
+            chosen_indices = list(chosen_indices)
+            payload = struct.pack(f"<{len(chosen_indices)}H", *chosen_indices)
+            select_party(chosen_indices)
+            self._append(PARTY, payload)
+            self._input_done()
+
+        def recorded_switch(party_index):
+            payload = bytes((party_index,))
+            last_choice[0] = NO_INDEX
+            switch(party_index)
+            self._append(SWITCH, payload + bytes((last_choice[0],)))
+            self._input_done()
+
+        def recorded_log(message):
+            payload = message.encode('utf-8')
+            log(message)
+            self._append(LOG, payload)
+            self._input_done()
+
+        game.select_starter = recorded_select_starter
+        game.run_battle_turn = recorded_run_battle_turn
+        game.log = recorded_log
+        game.select_party = recorded_select_party
+        game.switch = recorded_switch
+        return game
+
+    def _input_done(self):
+        self.inputs += 1
+        if self.checkpoint_every and self.inputs % self.checkpoint_every == 0:
+            self.checkpoint()
+
+
+def _apply(game, records, check=True):
+    """Plays journal records on a game."""
+    policy = game.opponent_policy
+    last_choice = [NO_INDEX]
+
+    def checked_policy(attacker, defender, rng):
+        index = policy(attacker, defender, rng)
+        last_choice[0] = index
+        return index
+    game.opponent_policy = checked_policy
+
+    try:
+        for kind, payload in records:
+            if kind == SEED:
+                game.rng.seed(struct.unpack("<q", payload)[0])
+            elif kind == SNAPSHOT:
+                game.restore(payload)
+            elif kind == STARTER:
+                game.select_starter(int.from_bytes(payload, 'little'))
+            elif kind == PARTY:
+                game.select_party(struct.unpack(f"<{len(payload) // 2}H", payload))
+            elif kind in (TURN, SWITCH):
+                last_choice[0] = NO_INDEX
+                if kind == TURN:
+                    game.run_battle_turn(payload[0])
+                else:
+                    game.switch(payload[0])
+                if check and last_choice[0] != payload[1]:
+                    raise ReplayError(f"The opponent picked move {last_choice[0]}, "
+                                      f"the journal says {payload[1]}")
+            elif kind == LOG:
+                game.log(payload.decode('utf-8'))
+    finally:
+        game.opponent_policy = policy
+    return game
+
+
+def replay(path, pokemon_stats, check=True, **game_args):
+    """
+    Builds a new Game (Game(pokemon_stats, **game_args)) and plays the whole
+    journal on it. The opponent policy must be the one that was recorded and
+    must not depend on time (ExpectiminimaxPolicy with a time budget can pick
+    differently); check=True raises ReplayError when it does.
+    """
+    # Checkpoints in the middle would only restore the state it already has
+    records = [record for i, record in enumerate(read_records(path))
+               if i == 0 or record[0] != SNAPSHOT]
+    return _apply(Game(pokemon_stats, **game_args), records, check)
+
+
+def recover(path, pokemon_stats, check=True, **game_args):
+    """Like replay(), but starts from the last snapshot in the journal."""
+    records = read_records(path)
+    start = 0
+    for i, (kind, _) in enumerate(records):
+        if kind in (SEED, SNAPSHOT):
+            start = i
+    return _apply(Game(pokemon_stats, **game_args), records[start:], check)
@@ -0,0 +1,345 @@
+### src/ladder.py (Rating ladder over a stream of match results)
+# Players and bots are rated from finished matches, one result at a time:
+# each result only moves the two ratings involved (Elo or Glicko), so the
+# ladder never recomputes anything from the history.
+#
+#   ladder = Ladder("ladder.db")
+#   ladder.submit("ash", "bot:random", 1.0)         # score from the first player's side
+#   ladder.submit_game("ash", "bot:random", game)   # from Game.result
+#   ladder.top(10), ladder.rank("ash")
+#   ladder.close()
+#
+# Ratings live in memory, with a RatingIndex for top-N and rank queries.
+# SQLite (WAL mode) only stores them: changed players and new matches are
+# written in batches of batch_size results, one transaction and one
+# executemany per table, and loaded back when the ladder is opened again.
+import math
+import sqlite3
+
+BATCH_SIZE = 5000 # Results per SQLite transaction
+
+# Scores, from the first player's side
+WIN, DRAW, LOSS = 1.0, 0.5, 0.0
+
+
+# --- Rating Systems ---
+# update(rating_a, rd_a, rating_b, rd_b, score_a) -> (rating_a, rd_a, rating_b, rd_b)
+
+class Elo:
+    """Classic Elo: the winner takes k * (score - expected) points from the loser."""
+    def __init__(self, k=32.0, initial=1500.0):
+        self.k = k
+        self.initial = initial
+        self.initial_rd = 0.0 # Elo has no deviation
+
+    def update(self, rating_a, rd_a, rating_b, rd_b, score_a):
+        expected_a = 1.0 / (1.0 + 10.0 ** ((rating_b - rating_a) / 400.0))
+        change = self.k * (score_a - expected_a)
+        return rating_a + change, rd_a, rating_b - change, rd_b
+
+
+_Q = math.log(10) / 400.0
+
+class Glicko:
+    """
+    Glicko (the first one), with every match as its own rating period.
+    A new player has a big rating deviation (rd), so their first matches
+    move them a lot; rd never goes below min_rd, so ratings keep moving.
+    """
+    def __init__(self, initial=1500.0, initial_rd=350.0, min_rd=30.0):
+        self.initial = initial
+        self.initial_rd = initial_rd
+        self.min_rd = min_rd
+
+    @staticmethod
+    def _g(rd):
+        return 1.0 / math.sqrt(1.0 + 3.0 * _Q * _Q * rd * rd / (math.pi * math.pi))
+
+    def _one_side(self, rating, rd, other_rating, other_rd, score):
+        g = self._g(other_rd)
+        expected = 1.0 / (1.0 + 10.0 ** (-g * (rating - other_rating) / 400.0))
+        inverse_d2 = _Q * _Q * g * g * expected * (1.0 - expected)
+        precision = 1.0 / (rd * rd) + inverse_d2
+        return (rating + _Q / precision * g * (score - expected),
+                max(self.min_rd, math.sqrt(1.0 / precision)))
+
+    def update(self, rating_a, rd_a, rating_b, rd_b, score_a):
+        new_a, new_rd_a = self._one_side(rating_a, rd_a, rating_b, rd_b, score_a)
+        new_b, new_rd_b = self._one_side(rating_b, rd_b, rating_a, rd_a, 1.0 - score_a)
+        return new_a, new_rd_a, new_b, new_rd_b
+
+SYSTEMS = {"elo": Elo, "glicko": Glicko}
+
+
+# --- Rating Index ---
+
+class RatingIndex:
+    """
+    Players ordered by rating, for top-N and rank queries without sorting.
+    Ratings are bucketed by whole points: every bucket keeps its player
+    count and its own {player: rating}. A rating change is O(1) (two
+    counters at most), a rank is one C-level sum over the counts above it
+    plus the players of its own bucket. Ratings outside [low, high] share
+    the end buckets.
+    """
+    def __init__(self, low=0, high=4000):
+        self.low = low
+        self.size = high - low + 1
+        self._counts = [0] * self.size
+        self._buckets = [None] * self.size # {player: rating} or None
+
+    def __len__(self):
+        return sum(self._counts)
+
+    def _bucket(self, rating):
+        bucket = int(rating) - self.low
+        if 0 <= bucket < self.size:
+            return bucket
+        return 0 if bucket < 0 else self.size - 1
+
+    def add(self, player, rating):
+        bucket = self._bucket(rating)
+        members = self._buckets[bucket]
+        if members is None:
+            members = self._buckets[bucket] = {}
+        members[player] = rating
+        self._counts[bucket] += 1
+
+    def remove(self, player, rating):
+        bucket = self._bucket(rating)
+        del self._buckets[bucket][player]
+        self._counts[bucket] -= 1
+
+    def move(self, player, old_rating, new_rating):
+        """Changes a player's rating."""
+        bucket = self._bucket(old_rating)
+        new_bucket = self._bucket(new_rating)
+        if bucket == new_bucket:
+            self._buckets[bucket][player] = new_rating
+            return
+        del self._buckets[bucket][player]
+        self._counts[bucket] -= 1
+        members = self._buckets[new_bucket]
+        if members is None:
+            members = self._buckets[new_bucket] = {}
+        members[player] = new_rating
+        self._counts[new_bucket] += 1
+
+    def rank(self, rating):
+        """1 + how many players have a higher rating (ties share a rank)."""
+        bucket = self._bucket(rating)
+        higher = sum(self._counts[bucket + 1:])
+        members = self._buckets[bucket] or {}
+        return 1 + higher + sum(1 for other in members.values() if other > rating)
+
+    def top(self, n):
+        """The n best [(player, rating)], highest first (ties by name)."""
+        result = []
+        for bucket in range(self.size - 1, -1, -1):
+            members = self._buckets[bucket]
+            if members:
+                result += sorted(members.items(), key=lambda item: (-item[1], item[0]))
+                if len(result) >= n:
+                    break
+        return result[:n]
+
+
+# --- Ladder ---
+
+_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS players (
+           name TEXT PRIMARY KEY, rating REAL NOT NULL, rd REAL NOT NULL,
+           games INTEGER NOT NULL, wins INTEGER NOT NULL, losses INTEGER NOT NULL,
+           draws INTEGER NOT NULL) WITHOUT ROWID""",
+    "CREATE INDEX IF NOT EXISTS players_by_rating ON players (rating DESC)",
+    """CREATE TABLE IF NOT EXISTS matches (
+           id INTEGER PRIMARY KEY, player TEXT NOT NULL, opponent TEXT NOT NULL,
+           score REAL NOT NULL, turns INTEGER)""",
+)
+_SAVE_PLAYER = "INSERT OR REPLACE INTO players VALUES (?, ?, ?, ?, ?, ?, ?)"
+_SAVE_MATCH = "INSERT INTO matches (player, opponent, score, turns) VALUES (?, ?, ?, ?)"
+
+# Fields of a player entry (a list, updated in place)
+RATING, RD, GAMES, WINS, LOSSES, DRAWS = range(6)
+
+
+class Ladder:
+    """
+    Ratings of every player, updated one result at a time and saved to
+    SQLite in batches (path ":memory:" keeps nothing). system is "elo",
+    "glicko" or an object with the same update() and initial values.
+    keep_matches=False stores only the ratings, not every match.
+    """
+    def __init__(self, path=":memory:", system="glicko", batch_size=BATCH_SIZE,
+                 keep_matches=True):
+        self.system = SYSTEMS[system]() if isinstance(system, str) else system
+        self.batch_size = batch_size
+        self.keep_matches = keep_matches
+        self.players = {}      # {name: [rating, rd, games, wins, losses, draws]}
+        self.index = RatingIndex()
+        self.results = 0       # Results submitted since the ladder was opened
+        self._dirty = set()    # Players changed since the last flush
+        self._matches = []     # Matches not written yet
+        self._pending = 0      # Results since the last flush
+
+        # isolation_level=None: transactions are only the explicit ones in flush()
+        self.db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL") # WAL stays consistent, fsync on checkpoint
+        for statement in _SCHEMA:
+            self.db.execute(statement)
+        for name, *entry in self.db.execute("SELECT * FROM players"):
+            self.players[name] = entry
+            self.index.add(name, entry[RATING])
+
+    def __len__(self):
+        return len(self.players)
+
+    def _player(self, name):
+        entry = self.players.get(name)
+        if entry is None:
+            system = self.system
+            entry = self.players[name] = [system.initial, system.initial_rd, 0, 0, 0, 0]
+            self.index.add(name, entry[RATING])
+        return entry
+
+    def submit(self, player, opponent, score, turns=None):
+        """
+        Rates one finished match. score is from player's side: WIN (1.0),
+        DRAW (0.5) or LOSS (0.0).
+        """
+        if player == opponent:
+            raise ValueError(f"{player} can't play against itself")
+        a, b = self._player(player), self._player(opponent)
+        old_a, old_b = a[RATING], b[RATING]
+        a[RATING], a[RD], b[RATING], b[RD] = self.system.update(old_a, a[RD], old_b, b[RD], score)
+        self.index.move(player, old_a, a[RATING])
+        self.index.move(opponent, old_b, b[RATING])
+
+        a[GAMES] += 1
+        b[GAMES] += 1
+        if score == WIN:
+            a[WINS] += 1
+            b[LOSSES] += 1
+        elif score == LOSS:
+            a[LOSSES] += 1
+            b[WINS] += 1
+        else:
+            a[DRAWS] += 1
+            b[DRAWS] += 1
+
+        self._dirty.add(player)
+        self._dirty.add(opponent)
+        if self.keep_matches:
+            self._matches.append((player, opponent, score, turns))
+        self.results += 1
+        self._pending += 1
+        if self._pending >= self.batch_size:
+            self.flush()
+
+    def submit_game(self, player, opponent, game):
+        """Rates a finished Game (player played the player's side)."""
+        result = game.result
+        if result is None:
+            raise ValueError("The game is not over")
+        score = {'player': WIN, 'draw': DRAW}.get(result.winner, LOSS)
+        self.submit(player, opponent, score, result.turns)
+
+    def ingest(self, results):
+        """
+        Consumes a stream of (player, opponent, score) or (player, opponent,
+        score, turns) tuples, then flushes. Returns how many were rated.
+        """
+        count = 0
+        submit = self.submit
+        for result in results:
+            submit(*result)
+            count += 1
+        self.flush()
+        return count
+
+    def flush(self):
+        """Writes the changed players and the new matches in one transaction."""
+        if not self._dirty and not self._matches:
+            return
+        players = self.players
+        rows = [(name, *players[name]) for name in self._dirty]
+        with self.db:
+            self.db.execute("BEGIN")
+            self.db.executemany(_SAVE_PLAYER, rows)
+            if self._matches:
+                self.db.executemany(_SAVE_MATCH, self._matches)
+        self._dirty.clear()
+        self._matches.clear()
+        self._pending = 0
+
+    # --- Queries ---
+
+    def rating(self, player):
+        """{rating, rd, games, wins, losses, draws} of a player. KeyError if unknown."""
+        entry = self.players[player]
+        return dict(zip(("rating", "rd", "games", "wins", "losses", "draws"), entry))
+
+    def rank(self, player):
+        """The player's position (1 = best; equal ratings share it). KeyError if unknown."""
+        return self.index.rank(self.players[player][RATING])
+
+    def top(self, n=10):
+        """The n best players as [(rank, name, rating)]."""
+        top, result = self.index.top(n), []
+        for position, (name, rating) in enumerate(top):
+            rank = result[-1][0] if result and result[-1][2] == rating else position + 1
+            result.append((rank, name, rating))
+        return result
+
+    def close(self):
+        self.flush()
+        self.db.close()
+
+
+def random_results(players, count, seed=None):
+    """
+    A synthetic stream of results between `players` random players whose
+    hidden strength decides who wins more often (for testing the ladder).
+    """
+    import random
+    rng = random.Random(seed)
+    strength = [rng.gauss(0.0, 1.0) for _ in range(players)]
+    for _ in range(count):
+        a, b = rng.sample(range(players), 2)
+        win_a = 1.0 / (1.0 + math.exp(strength[b] - strength[a]))
+        yield f"p{a}", f"p{b}", WIN if rng.random() < win_a else LOSS
+
+
+def main(argv=None):
+    """Command line: python -m src.ladder --db ladder.db --simulate 1000000 --top 10"""
+    import argparse
+    import time
+    parser = argparse.ArgumentParser(description="Rating ladder")
+    parser.add_argument("--db", default=":memory:")
+    parser.add_argument("--system", choices=SYSTEMS, default="glicko")
+    parser.add_argument("--simulate", type=int, default=0,
+                        help="Ingest this many synthetic results first")
+    parser.add_argument("--players", type=int, default=10000, help="Players in --simulate")
+    parser.add_argument("--no-matches", action="store_true", help="Only store the ratings")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--rank", default=None, help="Print this player's rank")
+    args = parser.parse_args(argv)
+
+    ladder = Ladder(args.db, args.system, keep_matches=not args.no_matches)
+    if args.simulate:
+        results = list(random_results(args.players, args.simulate, args.seed))
+        start = time.perf_counter()
+        ladder.ingest(results)
+        elapsed = time.perf_counter() - start
+        print(f"{len(results)} results in {elapsed:.2f}s ({len(results) / elapsed:,.0f} results/s)")
+    for rank, name, rating in ladder.top(args.top):
+        print(f"{rank:5}  {name:20} {rating:8.1f}")
+    if args.rank:
+        print(f"{args.rank}: rank {ladder.rank(args.rank)} of {len(ladder)}")
+    ladder.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+### src/matchup.py (Precomputed species-vs-species matchup matrix)
+# For every (attacker, defender) pair of the roster, at one level:
+#   expected damage of the attacker's best move against the defender
+#   (per use: misses count as 0, from the move's base accuracy),
+#   which move that is, and how many hits it needs to KO from full HP.
+# Built once with NumPy (a whole row of defenders at a time, rows split
+# between processes for a big dex), then every query is an array lookup.
+# Only damage and accuracy are modelled; stat stages, status and the other
+# move effects are not (see simulator.py for full battles).
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from . import utils
+from .calc import hit_chance
+
+ROLL_LOW = 0.85 # Same roll as Battle._calculate_damage
+NO_KO = 0       # ko_turns when the attacker has no damaging move
+MAX_KO_TURNS = 255
+ROWS_PER_TASK = 64
+
+
+def expected_floor(base):
+    """
+    E[int(base * U)] for U ~ uniform(0.85, 1.0), exactly, for an array of
+    base damages (the mean of calc.damage_distribution, without building it).
+    Uses F(x) = integral of floor(t) from 0 to x = n*x - n*(n+1)/2, n = floor(x).
+    """
+    base = np.asarray(base, dtype=np.float64)
+    low, high = base * ROLL_LOW, base
+    n_low, n_high = np.floor(low), np.floor(high)
+    f_low = n_low * low - n_low * (n_low + 1) / 2
+    f_high = n_high * high - n_high * (n_high + 1) / 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        expected = (f_high - f_low) / (high - low)
+    return np.where(base > 0, expected, 0.0)
+
+
+def roster_arrays(registry, level=5):
+    """The stat, type and move columns of every species (what the workers need)."""
+    prototypes = [registry.prototype(template, level) for template in registry.species]
+    n_moves = max((len(p.moves) for p in prototypes), default=0)
+    n = len(prototypes)
+    arrays = {
+        "level": level,
+        "hp": np.array([p.hp_max for p in prototypes], dtype=np.float64),
+        "attack": np.array([p.stats['attack'] for p in prototypes], dtype=np.float64),
+        "defense": np.array([p.stats['defense'] for p in prototypes], dtype=np.float64),
+        "special_attack": np.array([p.stats['special-attack'] for p in prototypes], dtype=np.float64),
+        "special_defense": np.array([p.stats['special-defense'] for p in prototypes], dtype=np.float64),
+        "type_key": np.array([p.type_key for p in prototypes], dtype=np.int64),
+        # Moves: (species, move slot); power 0 = status move or empty slot
+        "power": np.zeros((n, n_moves), dtype=np.float64),
+        "move_type": np.zeros((n, n_moves), dtype=np.int64),
+        "physical": np.zeros((n, n_moves), dtype=bool),
+        "stab": np.zeros((n, n_moves), dtype=bool),
+        "accuracy": np.ones((n, n_moves), dtype=np.float64), # Hit chance
+    }
+    for i, pokemon in enumerate(prototypes):
+        for slot, move in enumerate(pokemon.moves):
+            arrays["power"][i, slot] = move.power or 0
+            arrays["move_type"][i, slot] = move.type_id
+            arrays["physical"][i, slot] = move.physical
+            arrays["stab"][i, slot] = move.type in pokemon.type
+            arrays["accuracy"][i, slot] = hit_chance(move)
+    return arrays
+
+
+def compute_rows(arrays, start, stop):
+    """Expected damage, best move and KO turns for attackers start..stop-1 vs everyone."""
+    effectiveness = np.asarray(utils.EFFECTIVENESS, dtype=np.float64)
+    level = arrays["level"]
+    n = len(arrays["hp"])
+    rows = stop - start
+    best_damage = np.zeros((rows, n), dtype=np.float64)
+    best_move = np.zeros((rows, n), dtype=np.uint8)
+
+    for row, attacker in enumerate(range(start, stop)):
+        for slot in range(arrays["power"].shape[1]):
+            power = arrays["power"][attacker, slot]
+            if power <= 0:
+                continue
+            # The Battle formula, for one move against every defender at once
+            if arrays["physical"][attacker, slot]:
+                attack, defense = arrays["attack"][attacker], arrays["defense"]
+            else:
+                attack, defense = arrays["special_attack"][attacker], arrays["special_defense"]
+            base = (((2 * level / 5 + 2) * power * attack / defense) / 50) + 2
+            base = base * (1.5 if arrays["stab"][attacker, slot] else 1.0)
+            base = base * effectiveness[arrays["move_type"][attacker, slot] * utils.DEFENDER_KEYS
+                                        + arrays["type_key"]]
+            expected = expected_floor(base) * arrays["accuracy"][attacker, slot]
+            better = expected > best_damage[row]
+            best_damage[row] = np.where(better, expected, best_damage[row])
+            best_move[row] = np.where(better, slot, best_move[row])
+
+    with np.errstate(divide='ignore'):
+        turns = np.ceil(arrays["hp"] / best_damage)
+    ko_turns = np.where(best_damage > 0, np.minimum(turns, MAX_KO_TURNS), NO_KO).astype(np.uint8)
+    return start, best_damage.astype(np.float32), best_move, ko_turns
+
+
+# --- Worker Side ---
+_worker_arrays = None
+
+def _init_worker(arrays):
+    global _worker_arrays
+    _worker_arrays = arrays
+
+def _compute_task(start, stop):
+    return compute_rows(_worker_arrays, start, stop)
+
+
+class MatchupMatrix:
+    """
+    matrix.expected_damage(a, b), best_move(a, b), ko_turns(a, b) for species
+    indexes a (attacker) and b (defender), in registry order.
+    """
+    def __init__(self, names, damage, best_move, ko_turns, level=5):
+        self.names = list(names)
+        self.damage = damage         # float32 (n, n)
+        self.best_moves = best_move  # uint8 (n, n), move slot
+        self.ko = ko_turns           # uint8 (n, n), NO_KO if it can't
+        self.level = level
+        self._index = {name.lower(): i for i, name in enumerate(self.names)}
+
+    @classmethod
+    def build(cls, registry, level=5, workers=None, rows_per_task=ROWS_PER_TASK):
+        """
+        Computes the matrix for a whole registry. workers=None uses every
+        core when the roster is big enough to be worth it; workers=1 stays
+        in this process.
+        """
+        arrays = roster_arrays(registry, level)
+        n = len(registry)
+        damage = np.zeros((n, n), dtype=np.float32)
+        best_move = np.zeros((n, n), dtype=np.uint8)
+        ko_turns = np.zeros((n, n), dtype=np.uint8)
+        tasks = [(start, min(start + rows_per_task, n)) for start in range(0, n, rows_per_task)]
+        if workers is None:
+            workers = min(os.cpu_count() or 1, len(tasks))
+
+        if workers <= 1:
+            results = (compute_rows(arrays, start, stop) for start, stop in tasks)
+            for start, d, m, k in results:
+                damage[start:start + len(d)], best_move[start:start + len(d)] = d, m
+                ko_turns[start:start + len(d)] = k
+        else:
+            with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                     initargs=(arrays,)) as executor:
+                for start, d, m, k in executor.map(_compute_task, *zip(*tasks)):
+                    damage[start:start + len(d)], best_move[start:start + len(d)] = d, m
+                    ko_turns[start:start + len(d)] = k
+        names = [template.name for template in registry.species]
+        return cls(names, damage, best_move, ko_turns, level)
+
+    def __len__(self):
+        return len(self.names)
+
+    def index(self, species):
+        """Species index from a name (any case) or an index."""
+        if isinstance(species, str):
+            return self._index[species.lower()]
+        return species
+
+    def expected_damage(self, attacker, defender):
+        return float(self.damage[self.index(attacker), self.index(defender)])
+
+    def best_move(self, attacker, defender):
+        return int(self.best_moves[self.index(attacker), self.index(defender)])
+
+    def ko_turns(self, attacker, defender):
+        """Hits the best move needs to KO from full HP (NO_KO: never)."""
+        return int(self.ko[self.index(attacker), self.index(defender)])
+
+    def advantage(self, mine, theirs):
+        """
+        How many turns sooner mine knocks out theirs than the other way
+        round (positive is good for mine). A side that can't KO counts as
+        MAX_KO_TURNS.
+        """
+        a, b = self.index(mine), self.index(theirs)
+        ours = int(self.ko[a, b]) or MAX_KO_TURNS
+        theirs_turns = int(self.ko[b, a]) or MAX_KO_TURNS
+        return theirs_turns - ours
+
+    def best_switch(self, candidates, foe):
+        """The candidate species (index) with the best advantage against foe."""
+        foe = self.index(foe)
+        return max(candidates, key=lambda c: (self.advantage(c, foe),
+                                             self.damage[self.index(c), foe]))
+
+    def save(self, path):
+        np.savez_compressed(path, names=np.array(self.names), damage=self.damage,
+                            best_move=self.best_moves, ko_turns=self.ko, level=self.level)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls([str(name) for name in data["names"]], data["damage"],
+                       data["best_move"], data["ko_turns"], int(data["level"]))
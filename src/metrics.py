@@ -0,0 +1,271 @@
+### src/metrics.py (Opt-in timers, counters and latency histograms)
+# Pass a Metrics to Game (or Battle) to see where the time goes:
+#
+#   metrics = Metrics()
+#   game = Game(pokemon_stats, metrics=metrics)
+#   ...
+#   print(metrics.to_prometheus())
+#
+# Instrumenting replaces the hot methods of that one object with timed
+# wrappers (like Battle does with execute_action when there are no events).
+# Without a Metrics nothing is wrapped, so a normal game pays nothing.
+import json
+import sys
+import threading
+import time
+from collections import Counter
+
+# --- Latency Histogram ---
+# HDR-style log-linear buckets over integer nanoseconds: every power of
+# two is split into SUB_BUCKETS equal parts, so any value is stored with
+# an error under 1 / SUB_BUCKETS (~3%) and recording is a few integer ops.
+SUB_BITS = 5
+SUB_BUCKETS = 1 << SUB_BITS
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+PHASES = ("turn", "action", "damage", "log")
+COUNTERS = ("turns", "actions", "hits", "faints", "messages")
+
+
+def bucket_index(value):
+    if value < 2 * SUB_BUCKETS:
+        return value
+    shift = value.bit_length() - SUB_BITS - 1
+    return shift * SUB_BUCKETS + (value >> shift)
+
+
+def bucket_value(index):
+    """The lowest value that falls in a bucket."""
+    if index < 2 * SUB_BUCKETS:
+        return index
+    shift = index // SUB_BUCKETS - 1
+    return (index - shift * SUB_BUCKETS) << shift
+
+
+class Histogram:
+    """Counts per bucket (sparse), plus the exact count, sum, min and max."""
+    def __init__(self):
+        self.buckets = {} # {bucket index: count}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def record(self, value):
+        index = bucket_index(value)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+        if self.min is None or value < self.min:
+            self.min = value
+
+    def percentile(self, q):
+        """Value at quantile q (0.0 - 1.0), to the bucket precision."""
+        if not self.count:
+            return 0
+        rank = max(1, int(q * self.count + 0.5))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(bucket_value(index), self.max)
+        return self.max
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def merge(self, other):
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        return self
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "sum_ns": self.total,
+            "min_ns": self.min or 0,
+            "max_ns": self.max,
+            "mean_ns": self.mean(),
+            "quantiles_ns": {str(q): self.percentile(q) for q in QUANTILES}
+        }
+
+
+class _Timer:
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.record(time.perf_counter_ns() - self.start)
+        return False
+
+
+class Metrics:
+    """
+    Per-phase latency histograms (turn, action, damage, log) and counters
+    (turns, actions, hits, faints, messages). One Metrics can be shared by
+    many games, e.g. every session of the server (single-threaded).
+    """
+    def __init__(self):
+        self.histograms = {phase: Histogram() for phase in PHASES}
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.samples = Counter() # {(file, line, function): samples} from the sampler
+        self._sampler = None
+        self._sampler_stop = None
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def timer(self, phase):
+        """with metrics.timer("phase"): ... records the time of the block."""
+        if phase not in self.histograms:
+            self.histograms[phase] = Histogram()
+        return _Timer(self.histograms[phase])
+
+    def reset(self):
+        for phase in self.histograms:
+            self.histograms[phase] = Histogram()
+        self.counters = dict.fromkeys(self.counters, 0)
+        self.samples.clear()
+
+    # --- Instrumentation ---
+
+    def instrument_game(self, game):
+        """Wraps game.run_battle_turn and game.log, and counts emitted events."""
+        clock = time.perf_counter_ns
+        counters = self.counters
+        turn, log = self.histograms["turn"], self.histograms["log"]
+        run_battle_turn, game_log = game.run_battle_turn, game.log
+
+        def timed_run_battle_turn(player_move_index):
+            start = clock()
+            run_battle_turn(player_move_index)
+            turn.record(clock() - start)
+            counters["turns"] += 1
+
+        def timed_log(message):
+            start = clock()
+            game_log(message)
+            log.record(clock() - start)
+
+        game.run_battle_turn = timed_run_battle_turn
+        game.log = timed_log
+        if game.events is not None:
+            self.instrument_events(game.events)
+
+    def instrument_events(self, events):
+        """Counts every event emitted into an EventBuffer as a message."""
+        emit = events.emit
+        counters = self.counters
+
+        def counted_emit(kind, a=None, b=None, c=None):
+            counters["messages"] += 1
+            emit(kind, a, b, c)
+
+        events.emit = counted_emit
+
+    def instrument_battle(self, battle):
+        """Wraps battle.execute_action (hits, faints) and battle._calculate_damage."""
+        clock = time.perf_counter_ns
+        counters = self.counters
+        action, damage = self.histograms["action"], self.histograms["damage"]
+        execute_action, calculate_damage = battle.execute_action, battle._calculate_damage
+
+        def timed_execute_action(attacker, defender, move):
+            hp = defender.hp_actual
+            start = clock()
+            execute_action(attacker, defender, move)
+            action.record(clock() - start)
+            counters["actions"] += 1
+            if defender.hp_actual < hp:
+                counters["hits"] += 1
+                if not defender.hp_actual:
+                    counters["faints"] += 1
+
+        def timed_calculate_damage(attacker, defender, move):
+            start = clock()
+            result = calculate_damage(attacker, defender, move)
+            damage.record(clock() - start)
+            return result
+
+        battle.execute_action = timed_execute_action
+        battle._calculate_damage = timed_calculate_damage
+
+    # --- Sampling Profiler Hook ---
+
+    def start_sampler(self, interval=0.005, thread_id=None, hook=None):
+        """
+        Every interval seconds, looks at what one thread (default: this one)
+        is running and counts (file, line, function) of the innermost frame
+        in self.samples. hook(frame), if given, is called with every sample
+        (e.g. to walk the whole stack).
+        """
+        if self._sampler is not None:
+            return
+        target = thread_id if thread_id is not None else threading.get_ident()
+        stop = threading.Event()
+
+        def sample():
+            while not stop.wait(interval):
+                frame = sys._current_frames().get(target)
+                if frame is None:
+                    continue
+                code = frame.f_code
+                self.samples[(code.co_filename, frame.f_lineno, code.co_name)] += 1
+                if hook is not None:
+                    hook(frame)
+
+        self._sampler_stop = stop
+        self._sampler = threading.Thread(target=sample, name="metrics-sampler", daemon=True)
+        self._sampler.start()
+
+    def stop_sampler(self):
+        if self._sampler is None:
+            return
+        self._sampler_stop.set()
+        self._sampler.join()
+        self._sampler = None
+
+    def top_samples(self, n=10):
+        return self.samples.most_common(n)
+
+    # --- Export ---
+
+    def to_dict(self):
+        return {
+            "counters": dict(self.counters),
+            "histograms": {phase: h.to_dict() for phase, h in self.histograms.items()},
+            "samples": [{"file": f, "line": line, "function": name, "count": count}
+                        for (f, line, name), count in self.top_samples(20)]
+        }
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.to_dict(), **kwargs)
+
+    def to_prometheus(self, prefix="pokemon_"):
+        """A text snapshot in the Prometheus exposition format."""
+        lines = []
+        for name, value in self.counters.items():
+            metric = f"{prefix}{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value}")
+        metric = f"{prefix}phase_seconds"
+        lines.append(f"# HELP {metric} Time spent per call in each phase.")
+        lines.append(f"# TYPE {metric} summary")
+        for phase, histogram in self.histograms.items():
+            for q in QUANTILES:
+                lines.append(f'{metric}{{phase="{phase}",quantile="{q}"}} '
+                             f'{histogram.percentile(q) / 1e9:.9f}')
+            lines.append(f'{metric}_sum{{phase="{phase}"}} {histogram.total / 1e9:.9f}')
+            lines.append(f'{metric}_count{{phase="{phase}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
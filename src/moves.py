@@ -0,0 +1,82 @@
+### src/moves.py (Interned move records)
+# Every move is stored once, as an immutable MoveRecord with a numeric ID
+# and its type already resolved to a type ID (see utils).
+# Pokémon that share a moveset also share the same tuple of records.
+from collections import namedtuple
+from . import utils
+from .effects import compile_effects
+
+_MoveFields = namedtuple('_MoveFields',
+                         ('id', 'name', 'power', 'type', 'type_id', 'category', 'physical',
+                          'priority', 'accuracy', 'effects'),
+                         defaults=(0, None, ()))
+
+class MoveRecord(_MoveFields):
+    """
+    An immutable move. Read it with attributes (move.power), which is
+    what the battle code does. move['power'] still works like the JSON dict.
+    effects is the compiled program of the move (see effects.py).
+    """
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return getattr(self, key)
+        return tuple.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def to_dict(self):
+        """The move as it appears in the JSON."""
+        return {
+            "name": self.name,
+            "power": self.power,
+            "type": self.type,
+            "category": self.category,
+            "priority": self.priority,
+            "accuracy": self.accuracy
+        }
+
+
+# --- Move Table (one per process) ---
+MOVES = []      # MoveRecord by ID
+_MOVE_IDS = {}  # {(name, power, type, category, priority, accuracy, effects): ID}
+_MOVESETS = {}  # {tuple of IDs: tuple of MoveRecords}
+
+
+def move_key(move):
+    """
+    What identifies a JSON move dict: everything the battle uses
+    (accuracy, priority and compiled effects too, not just the name).
+    A dict can bring its effects already compiled, as 'effects' (snapshot.py).
+    """
+    effects = move.get('effects')
+    effects = compile_effects(move) if effects is None else tuple(map(tuple, effects))
+    return (move['name'], move['power'], move['type'], move['category'],
+            move.get('priority', 0), move.get('accuracy'), effects)
+
+
+def intern_move(move):
+    """
+    Returns the MoveRecord for a JSON move dict (or the record itself).
+    Two moves share a record only if they have the same move_key.
+    """
+    if isinstance(move, MoveRecord):
+        return move
+    key = move_key(move)
+    move_id = _MOVE_IDS.get(key)
+    if move_id is None:
+        name, power, type_name, category, priority, accuracy, effects = key
+        move_id = len(MOVES)
+        MOVES.append(MoveRecord(move_id, name, power, type_name, utils.type_id(type_name),
+                                category, category == 'physical', priority, accuracy, effects))
+        _MOVE_IDS[key] = move_id
+    return MOVES[move_id]
+
+
+def intern_moveset(moves):
+    """Returns a shared tuple of MoveRecords for a list of moves."""
+    records = tuple(intern_move(move) for move in moves)
+    key = tuple(record.id for record in records)
+    return _MOVESETS.setdefault(key, records)
@@ -0,0 +1,371 @@
+### src/pipeline.py (Streaming pipeline for simulation results)
+# Big simulation runs produce one record per battle. Nothing here keeps
+# them: records flow through generator stages and into a sink that writes
+# them to disk as they come, so memory is the same for 1k or 100M battles.
+#
+#   records = simulate_records(pokemon_stats, 1000000, seed=1)   # source
+#   records = where(records, lambda r: r.turns > 3)              # filter
+#   tally = Tally()
+#   with open_sink("results.csv") as sink:                       # sink
+#       sink.consume(tally(records))                             # aggregate on the way
+#
+# A sink buffers chunk_size records as columns, then hands the chunk to
+# its own writer thread through a queue of at most max_pending chunks:
+# the simulation keeps running while a chunk is written. If the disk is
+# slower than the simulation, write() waits for a free slot instead of
+# growing the queue. The memory ceiling is max_pending + 2 chunks:
+# max_pending queued, one being written and one being filled.
+# Formats: CSV, NDJSON, and Parquet or Arrow IPC when pyarrow is installed.
+import csv
+import json
+import queue
+import random
+import threading
+from collections import namedtuple
+
+from .ai import random_policy
+from .game import Game
+from .registry import Registry
+from .simulator import MAX_TURNS
+
+CHUNK_SIZE = 4096 # Records per chunk (one write, one Parquet row group)
+MAX_PENDING = 4   # Chunks waiting for the writer thread at most
+
+# One battle. The parties and move lists are joined into single strings so
+# every column has a plain type: "Bulbasaur/Squirtle", "Tackle;Growl;...".
+RECORD_FIELDS = ("seed", "player", "opponent", "winner", "turns",
+                 "player_moves", "opponent_moves", "player_damage", "opponent_damage")
+BattleRecord = namedtuple('BattleRecord', RECORD_FIELDS)
+
+
+# --- Source ---
+
+def _party_hp(party):
+    return sum(pokemon.hp_actual for pokemon in party)
+
+def simulate_records(pokemon_stats, n_battles, seed=None, party_size=1,
+                     player_policy=random_policy, opponent_policy=random_policy,
+                     max_turns=MAX_TURNS, registry=None):
+    """
+    Plays n_battles Games and yields a BattleRecord for each, one at a time.
+    Each battle gets its own seed (recorded), the only source of randomness
+    of that battle, policies included, so it can be played again from its
+    record. Both parties are random species;
+    damage is the HP each side took away from the other (moves and effects,
+    minus nothing healed). Battles cut at max_turns are a "draw".
+    """
+    registry = registry if registry else Registry(pokemon_stats)
+    seeds = random.Random(seed)
+    roster = range(len(registry))
+
+    # The opponent's policy is called inside Game: wrap it to see its moves
+    opponent_moves = []
+    def recording_policy(attacker, defender, rng):
+        index = opponent_policy(attacker, defender, rng)
+        opponent_moves.append(attacker.moves[index].name)
+        return index
+
+    for _ in range(n_battles):
+        battle_seed = seeds.getrandbits(63)
+        rng = random.Random(battle_seed)
+        game = Game(pokemon_stats, registry=registry, rng=rng,
+                    opponent_policy=recording_policy, record_events=False)
+        if party_size <= len(roster):
+            game.select_party(rng.sample(roster, party_size))
+        else:
+            game.select_party([rng.choice(roster) for _ in range(party_size)])
+
+        player_moves = []
+        opponent_moves.clear()
+        player_damage = opponent_damage = 0
+        while game.state != 'GAME_OVER' and game.turns < max_turns:
+            if game.state == 'CHOOSE_REPLACEMENT':
+                game.switch(game.get_switch_options()[0])
+                continue
+            player_hp, opponent_hp = _party_hp(game.player_party), _party_hp(game.opponent_party)
+            index = player_policy(game.player_pokemon, game.opponent_pokemon, rng)
+            player_moves.append(game.player_pokemon.moves[index].name)
+            game.run_battle_turn(index)
+            player_damage += max(0, opponent_hp - _party_hp(game.opponent_party))
+            opponent_damage += max(0, player_hp - _party_hp(game.player_party))
+
+        result = game.result
+        yield BattleRecord(battle_seed,
+                           "/".join(pokemon.name for pokemon in game.player_party),
+                           "/".join(pokemon.name for pokemon in game.opponent_party),
+                           result.winner if result else "draw", game.turns,
+                           ";".join(player_moves), ";".join(opponent_moves),
+                           player_damage, opponent_damage)
+
+
+# --- Stages ---
+
+def where(records, predicate):
+    """Only the records for which predicate(record) is true."""
+    for record in records:
+        if predicate(record):
+            yield record
+
+
+class Tally:
+    """
+    Running totals per key, updated as records pass through (they are
+    yielded unchanged). Memory grows with the number of keys, not records.
+    key(record) defaults to the (player, opponent) matchup.
+    """
+    def __init__(self, key=None):
+        self.key = key if key else (lambda record: (record.player, record.opponent))
+        self.totals = {} # {key: [battles, player wins, opponent wins, draws, turns, damage, damage]}
+
+    def __call__(self, records):
+        key, totals = self.key, self.totals
+        for record in records:
+            record_key = key(record)
+            entry = totals.get(record_key)
+            if entry is None:
+                entry = totals[record_key] = [0, 0, 0, 0, 0, 0, 0]
+            entry[0] += 1
+            entry[1 if record.winner == 'player' else 2 if record.winner == 'opponent' else 3] += 1
+            entry[4] += record.turns
+            entry[5] += record.player_damage
+            entry[6] += record.opponent_damage
+            yield record
+
+    def to_dict(self):
+        """{key: {battles, win rates, draws, mean turns and damage}}."""
+        summary = {}
+        for key, (battles, wins, losses, draws, turns, damage, taken) in self.totals.items():
+            summary[key] = {"battles": battles, "player_win_rate": wins / battles,
+                            "opponent_win_rate": losses / battles, "draws": draws,
+                            "mean_turns": turns / battles, "mean_player_damage": damage / battles,
+                            "mean_opponent_damage": taken / battles}
+        return summary
+
+
+# --- Sinks ---
+
+class Sink:
+    """
+    Writes records in chunks on a background thread (see the top of the
+    file). Subclasses implement _open, _write_chunk(columns, count) and
+    _close; those three only ever run on the writer thread.
+    """
+    def __init__(self, path, fields=RECORD_FIELDS, chunk_size=CHUNK_SIZE,
+                 max_pending=MAX_PENDING):
+        self.path = path
+        self.fields = tuple(fields)
+        self.chunk_size = chunk_size
+        self.rows = 0   # Records written so far (by the writer thread)
+        self.chunks = 0
+        self._columns = [[] for _ in self.fields]
+        self._count = 0
+        self._queue = queue.Queue(max_pending)
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name=f"sink {path}", daemon=True)
+        self._thread.start()
+
+    def write(self, record):
+        """Adds one record (a tuple in `fields` order, e.g. a BattleRecord)."""
+        for column, value in zip(self._columns, record):
+            column.append(value)
+        self._count += 1
+        if self._count >= self.chunk_size:
+            self._hand_off()
+
+    def consume(self, records):
+        """Writes a whole stream of records. Returns how many."""
+        count = 0
+        write = self.write
+        for record in records:
+            write(record)
+            count += 1
+        return count
+
+    def _hand_off(self):
+        if self._error is not None:
+            raise self._error
+        if self._count:
+            self._queue.put((self._columns, self._count)) # Waits only if max_pending are queued
+            self._columns = [[] for _ in self.fields]
+            self._count = 0
+
+    def _run(self):
+        try:
+            self._open()
+            while True:
+                chunk = self._queue.get()
+                if chunk is None:
+                    break
+                columns, count = chunk
+                self._write_chunk(columns, count)
+                self.rows += count
+                self.chunks += 1
+        except Exception as e:
+            self._error = e
+            while self._queue.get() is not None: # Unblock write() until close()
+                pass
+        finally:
+            try:
+                self._close()
+            except Exception as e:
+                self._error = self._error or e
+
+    def close(self):
+        """Writes what is buffered, waits for the writer thread and closes the file."""
+        if self._thread is None:
+            return
+        try:
+            self._hand_off()
+        finally:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _open(self):
+        pass
+
+    def _write_chunk(self, columns, count):
+        raise NotImplementedError
+
+    def _close(self):
+        pass
+
+
+class CsvSink(Sink):
+    """Comma-separated values with a header row."""
+    def _open(self):
+        self._file = open(self.path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(self.fields)
+
+    def _write_chunk(self, columns, count):
+        self._writer.writerows(zip(*columns))
+
+    def _close(self):
+        if getattr(self, '_file', None):
+            self._file.close()
+
+
+class NdjsonSink(Sink):
+    """One JSON object per line."""
+    def _open(self):
+        self._file = open(self.path, 'w', encoding='utf-8')
+
+    def _write_chunk(self, columns, count):
+        fields, dumps = self.fields, json.dumps
+        self._file.write("".join(dumps(dict(zip(fields, row)), ensure_ascii=False) + "\n"
+                                 for row in zip(*columns)))
+
+    def _close(self):
+        if getattr(self, '_file', None):
+            self._file.close()
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("Parquet and Arrow output need pyarrow (pip install pyarrow)") from None
+    return pyarrow
+
+
+class ParquetSink(Sink):
+    """Parquet, one row group per chunk. Needs pyarrow."""
+    def __init__(self, path, *args, **kwargs):
+        _pyarrow() # Fail here, not on the writer thread
+        super().__init__(path, *args, **kwargs)
+
+    def _open(self):
+        self._writer = None # Created with the schema of the first chunk
+
+    def _write_chunk(self, columns, count):
+        import pyarrow.parquet
+        table = _pyarrow().table(dict(zip(self.fields, columns)))
+        if self._writer is None:
+            self._writer = pyarrow.parquet.ParquetWriter(self.path, table.schema)
+        self._writer.write_table(table)
+
+    def _close(self):
+        if getattr(self, '_writer', None):
+            self._writer.close()
+
+
+class ArrowSink(Sink):
+    """Arrow IPC file, one record batch per chunk. Needs pyarrow."""
+    def __init__(self, path, *args, **kwargs):
+        _pyarrow()
+        super().__init__(path, *args, **kwargs)
+
+    def _open(self):
+        self._writer = None
+
+    def _write_chunk(self, columns, count):
+        pyarrow = _pyarrow()
+        batch = pyarrow.record_batch(dict(zip(self.fields, columns)))
+        if self._writer is None:
+            self._writer = pyarrow.ipc.new_file(self.path, batch.schema)
+        self._writer.write_batch(batch)
+
+    def _close(self):
+        if getattr(self, '_writer', None):
+            self._writer.close()
+
+
+SINKS = {".csv": CsvSink, ".ndjson": NdjsonSink, ".jsonl": NdjsonSink,
+         ".parquet": ParquetSink, ".arrow": ArrowSink}
+
+
+def open_sink(path, **kwargs):
+    """The sink for a file name's extension (see SINKS)."""
+    for extension, sink in SINKS.items():
+        if path.endswith(extension):
+            return sink(path, **kwargs)
+    raise ValueError(f"Unknown results format: {path} (use one of {', '.join(SINKS)})")
+
+
+def main(argv=None):
+    """Command line: python -m src.pipeline -n 1000000 --out results.csv --seed 1"""
+    import argparse
+    import time
+    from .datapack import load_roster
+    from .simulator import POLICIES
+    parser = argparse.ArgumentParser(description="Simulate battles into a results file")
+    parser.add_argument("-n", "--battles", type=int, default=100000)
+    parser.add_argument("--out", default="results.csv",
+                        help=f"Output file ({', '.join(SINKS)})")
+    parser.add_argument("--party-size", type=int, default=1)
+    parser.add_argument("--policy-player", choices=POLICIES, default="random")
+    parser.add_argument("--policy-opponent", choices=POLICIES, default="random")
+    parser.add_argument("--min-turns", type=int, default=0, help="Only keep longer battles")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--data", default="data/pokemon_stats.json")
+    args = parser.parse_args(argv)
+
+    pokemon_stats = load_roster(args.data) # Binary pack if built, else the JSON
+    records = simulate_records(pokemon_stats, args.battles, args.seed, args.party_size,
+                               POLICIES[args.policy_player], POLICIES[args.policy_opponent])
+    if args.min_turns:
+        records = where(records, lambda record: record.turns >= args.min_turns)
+    tally = Tally()
+
+    start = time.perf_counter()
+    with open_sink(args.out) as sink:
+        count = sink.consume(tally(records))
+    elapsed = time.perf_counter() - start
+
+    for (player, opponent), summary in sorted(tally.to_dict().items()):
+        print(f"{player:>20} vs {opponent:<20} player wins {summary['player_win_rate']:6.2%}  "
+              f"turns {summary['mean_turns']:5.1f}")
+    print(f"{count} records to {args.out} in {elapsed:.2f}s ({count / elapsed:,.0f} battles/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,47 +1,208 @@
 ### src/pokemon.py (The Pokémon Template)
+from . import utils
+from .moves import intern_moveset
+
+# Stat keys as they come from the JSON (same order everywhere)
+STAT_NAMES = ('hp', 'attack', 'defense', 'special-attack', 'special-defense', 'speed')
+
+# --- Builds (IVs, EVs, Nature) ---
+MIN_LEVEL, MAX_LEVEL = 1, 100
+MAX_IV = 31
+MAX_EV = 252       # Per stat
+MAX_TOTAL_EV = 510 # All stats together
+
+# --- Battle modifiers ---
+# Stats that moves raise or lower in stages (-6 to +6)
+STAGE_STATS = ('attack', 'defense', 'special-attack', 'special-defense', 'speed',
+               'accuracy', 'evasion')
+MAX_STAGE = 6
+
+# Nature -> (stat x1.1, stat x0.9). The 5 neutral ones change nothing.
+_BOOSTED = ('attack', 'defense', 'speed', 'special-attack', 'special-defense')
+NATURES = {}
+for _row, _names in enumerate((("hardy", "lonely", "brave", "adamant", "naughty"),
+                               ("bold", "docile", "relaxed", "impish", "lax"),
+                               ("timid", "hasty", "serious", "jolly", "naive"),
+                               ("modest", "mild", "quiet", "bashful", "rash"),
+                               ("calm", "gentle", "sassy", "careful", "quirky"))):
+    for _col, _nature in enumerate(_names):
+        NATURES[_nature] = (None, None) if _row == _col else (_BOOSTED[_row], _BOOSTED[_col])
+
+
+def calculate_stat(base_stats, stat_name, level, iv=0, ev=0, nature=None):
+    """
+    Calculates a stat for a level (main series formula). With no IVs, EVs
+    or nature it is the old simple formula, so default battlers don't change.
+    """
+    base_val = base_stats.get(stat_name, 10)
+    core = (2 * base_val + iv + ev // 4) * level // 100
+
+    if stat_name == 'hp':
+        # HP Formula
+        return core + level + 10
+    # General Formula, then the nature (rounded down)
+    value = core + 5
+    if nature is not None:
+        boosted, lowered = NATURES[nature]
+        if stat_name == boosted:
+            return value * 11 // 10
+        if stat_name == lowered:
+            return value * 9 // 10
+    return value
+
+
+def calculate_stats(base_stats, level, ivs=None, evs=None, nature=None):
+    """All the stats of a build as a dict (ivs/evs: {stat name: value}, missing = 0)."""
+    if not ivs and not evs and nature is None:
+        return {name: calculate_stat(base_stats, name, level) for name in STAT_NAMES}
+    ivs, evs = ivs or {}, evs or {}
+    return {name: calculate_stat(base_stats, name, level, ivs.get(name, 0), evs.get(name, 0),
+                                 nature)
+            for name in STAT_NAMES}
+
+
+def check_build(level, ivs=None, evs=None, nature=None):
+    """Raises ValueError if the level, IVs, EVs or nature are out of the game's limits."""
+    if not MIN_LEVEL <= level <= MAX_LEVEL:
+        raise ValueError(f"Level must be in [{MIN_LEVEL}, {MAX_LEVEL}], got {level}")
+    for name, value in (ivs or {}).items():
+        if name not in STAT_NAMES or not 0 <= value <= MAX_IV:
+            raise ValueError(f"Bad IV {name}={value} (0 to {MAX_IV})")
+    for name, value in (evs or {}).items():
+        if name not in STAT_NAMES or not 0 <= value <= MAX_EV:
+            raise ValueError(f"Bad EV {name}={value} (0 to {MAX_EV})")
+    if sum((evs or {}).values()) > MAX_TOTAL_EV:
+        raise ValueError(f"EVs add up to more than {MAX_TOTAL_EV}")
+    if nature is not None and nature not in NATURES:
+        raise ValueError(f"Unknown nature: {nature}")
 
 class Pokemon:
     """
-    Defines a static Pokémon for battle (Level 5, no progression).
+    Defines a Pokémon for battle: a species at a level (5 by default)
+    with optional IVs, EVs and nature.
     """
     def __init__(self, name, type, stats, moves, 
-                 sprite_front, sprite_back, id=None, **kwargs):
+                 sprite_front, sprite_back, id=None, level=5,
+                 ivs=None, evs=None, nature=None, **kwargs):
         
         self.name = name
         self.type = type # (e.g. ["Plant", "Poison"])
-        self.moves = moves # (e.g. [{"name": "Tackle", "power": 40, ...}, ...])
+        self.type_key = utils.defender_key(type) # Type IDs for utils.effectiveness
+        self.moves = intern_moveset(moves) # (e.g. (MoveRecord(name="Tackle", power=40, ...), ...))
         self.sprite_front = sprite_front
         self.sprite_back = sprite_back
         self.id = id
         
-        # Fixed Level 5 as requested
-        self.level = 5
+        # Level 5 unless the Registry asks for another one
+        check_build(level, ivs, evs, nature)
+        self.level = level
+        self.ivs = ivs     # {stat name: 0-31} or None (all 0)
+        self.evs = evs     # {stat name: 0-252} or None (all 0)
+        self.nature = nature
         
         # Base stats (from JSON)
         self._base_stats = stats
         
-        # Actual stats (calculated for Lvl 5)
-        self.stats = {}
-        self.hp_max = self._calculate_stat('hp')
+        # Actual stats (calculated for the level and build)
+        self._set_stats()
         self.hp_actual = self.hp_max
-        
-        # Pre-calculate other stats
-        self.stats['attack'] = self._calculate_stat('attack')
-        self.stats['defense'] = self._calculate_stat('defense')
-        self.stats['special-attack'] = self._calculate_stat('special-attack')
-        self.stats['special-defense'] = self._calculate_stat('special-defense')
-        self.stats['speed'] = self._calculate_stat('speed')
+
+        # Battle state (see effects.py). None = nothing, so no dicts by default
+        self.stages = None       # {stat: stage} once a move changes one
+        self.status = None       # 'burn', 'sleep', ... (one at a time)
+        self.status_turns = 0    # Turns left asleep
+        self.volatile = None     # {'confusion': turns, 'leech-seed': True, 'flinch': True}
+        self._unmodified = None  # self.stats without stages or status
+
+    def _set_stats(self):
+        stats = calculate_stats(self._base_stats, self.level, self.ivs, self.evs, self.nature)
+        self.hp_max = stats.pop('hp')
+        self.stats = stats
+
+    def change_stage(self, stat, stages):
+        """Raises or lowers a stat stage. Returns how many stages it really moved."""
+        table = self.stages
+        if table is None:
+            table = self.stages = dict.fromkeys(STAGE_STATS, 0)
+        old = table[stat]
+        new = old + stages
+        if new > MAX_STAGE:
+            new = MAX_STAGE
+        elif new < -MAX_STAGE:
+            new = -MAX_STAGE
+        if new == old:
+            return 0 # Already at the limit
+        table[stat] = new
+        if stat in self.stats:
+            self._update_stat(stat)
+        return new - old
+
+    def set_status(self, status, turns=0):
+        """Sets (or clears, with None) the major status condition."""
+        self.status = status
+        self.status_turns = turns
+        self._update_stat('attack')   # Burn halves it
+        self._update_stat('speed')    # Paralysis halves it
+
+    def clear_volatile(self):
+        """Stat stages and volatile conditions go away when switching out."""
+        self.stages = None
+        self.volatile = None
+        if self._unmodified is not None:
+            self.stats.update(self._unmodified)
+            if self.status is not None:
+                self._update_stat('attack')
+                self._update_stat('speed')
+
+    def _update_stat(self, stat):
+        """self.stats[stat] = the stat with its stage and status applied."""
+        if self._unmodified is None:
+            if self.stages is None and self.status is None:
+                return # Nothing applied yet
+            self._unmodified = dict(self.stats)
+        value = self._unmodified[stat]
+        stage = self.stages[stat] if self.stages is not None else 0
+        if stage > 0:
+            value = value * (2 + stage) // 2
+        elif stage < 0:
+            value = value * 2 // (2 - stage)
+        if (stat == 'attack' and self.status == 'burn'
+                or stat == 'speed' and self.status == 'paralysis'):
+            value //= 2
+        self.stats[stat] = max(1, value)
 
     def _calculate_stat(self, stat_name):
-        """Calculates a stat based on Level 5 (Simple formula, no EVs/IVs)."""
-        base_val = self._base_stats.get(stat_name, 10)
-        
-        if stat_name == 'hp':
-            # HP Formula
-            return int(((2 * base_val) * self.level / 100) + self.level + 10)
-        else:
-            # General Formula
-            return int(((2 * base_val) * self.level / 100) + 5)
+        """Calculates one stat for this Pokémon's level and build."""
+        ivs, evs = self.ivs or {}, self.evs or {}
+        return calculate_stat(self._base_stats, stat_name, self.level,
+                              ivs.get(stat_name, 0), evs.get(stat_name, 0), self.nature)
+
+    def with_build(self, level=None, ivs=None, evs=None, nature=None):
+        """
+        A copy at another level and/or build, with full HP (the moves, types
+        and sprites are shared). Used by Registry.create for custom builds.
+        """
+        new = Pokemon.__new__(Pokemon)
+        new.__dict__.update(self.__dict__)
+        new.level = self.level if level is None else level
+        new.ivs, new.evs, new.nature = ivs, evs, nature
+        check_build(new.level, ivs, evs, nature)
+        new._set_stats()
+        new.hp_actual = new.hp_max
+        new.stages = new.status = new.volatile = new._unmodified = None
+        new.status_turns = 0
+        return new
+
+    def clone(self):
+        """Fast copy with no stat recalculation (used by the Registry)."""
+        new = Pokemon.__new__(Pokemon)
+        new.__dict__.update(self.__dict__)
+        new.stats = self.stats.copy()
+        if self.stages is not None:
+            new.stages = self.stages.copy()
+        if self.volatile is not None:
+            new.volatile = self.volatile.copy()
+        return new
 
     def take_damage(self, damage):
         """Subtracts damage from current HP."""
@@ -60,6 +221,7 @@ class Pokemon:
             "level": self.level,
             "hp_actual": self.hp_actual,
             "hp_max": self.hp_max,
+            "status": self.status,
             "moves": self.moves
         }
 
@@ -70,5 +232,8 @@ class Pokemon:
             "id": self.id,
             "name": self.name,
             "level": self.level,
-            "hp_actual": self.hp_actual
+            "hp_actual": self.hp_actual,
+            "ivs": self.ivs,
+            "evs": self.evs,
+            "nature": self.nature
         }
\ No newline at end of file
@@ -0,0 +1,129 @@
+### src/registry.py (Species registry built once from pokemon_stats.json)
+# Interns moves and species and caches a fully calculated Pokémon per
+# (species, level), so creating a battler is just a copy of that template.
+# Species are resolved on first use: a Registry over a 1000-species pack
+# costs nothing until a battle needs some of them.
+from . import utils
+from .datapack import roster_names
+from .moves import intern_moveset
+from .pokemon import Pokemon
+
+
+class SpeciesTemplate:
+    """The static data of one species, with moves and types already resolved."""
+    __slots__ = ('index', 'id', 'name', 'type', 'type_key', 'base_stats', 'moves',
+                 'sprite_front', 'sprite_back')
+
+    def __init__(self, index, data):
+        self.index = index
+        self.id = data.get('id')
+        self.name = data['name']
+        self.type = data['type']
+        self.type_key = utils.defender_key(data['type'])
+        self.base_stats = data['stats']
+        self.moves = intern_moveset(data['moves'])
+        self.sprite_front = data.get('sprite_front')
+        self.sprite_back = data.get('sprite_back')
+
+
+class Registry:
+    """
+    All species from the JSON. Build it once and reuse it:
+        registry = Registry(pokemon_stats)
+        pokemon = registry.create("Bulbasaur")
+    """
+    def __init__(self, pokemon_stats):
+        self.roster = pokemon_stats
+        self._species = [None] * len(pokemon_stats) # SpeciesTemplate, built on first use
+        self._missing = len(pokemon_stats)          # How many are still None
+        self._names = None                          # Species names, read on first use
+        self._by_name = None                        # {lower name: index}
+        self._prototypes = {} # {(species index, level): Pokemon}
+        self._matchups = {}   # {level: matchup.MatchupMatrix}, built on first use
+        self._stat_tables = {} # {level: (species, 6) stats array}, built on first use
+
+    def __len__(self):
+        return len(self._species)
+
+    @property
+    def species(self):
+        """Every SpeciesTemplate, in roster order (resolves the ones not used yet)."""
+        if self._missing:
+            for index in range(len(self._species)):
+                self._template(index)
+        return self._species
+
+    def _template(self, index):
+        template = self._species[index]
+        if template is None:
+            template = self._species[index] = SpeciesTemplate(index, self.roster[index])
+            self._missing -= 1
+        return template
+
+    def names(self):
+        """The species names, without resolving any species."""
+        if self._by_name is None:
+            self._names = roster_names(self.roster)
+            self._by_name = {name.lower(): i for i, name in enumerate(self._names)}
+        return self._names
+
+    def get(self, species):
+        """Returns the SpeciesTemplate for a name (any case) or an index."""
+        if isinstance(species, SpeciesTemplate):
+            return species
+        if isinstance(species, int):
+            if species < 0:
+                species += len(self._species)
+            return self._template(species)
+        self.names()
+        index = self._by_name.get(species.lower())
+        if index is None:
+            raise KeyError(f"Unknown species: {species}")
+        return self._template(index)
+
+    def prototype(self, species, level=5):
+        """The cached, fully calculated Pokémon for (species, level). Do not modify it."""
+        template = self.get(species)
+        key = (template.index, level)
+        pokemon = self._prototypes.get(key)
+        if pokemon is None:
+            pokemon = Pokemon(template.name, template.type, template.base_stats, template.moves,
+                              template.sprite_front, template.sprite_back,
+                              id=template.id, level=level)
+            self._prototypes[key] = pokemon
+        return pokemon
+
+    def stats_for(self, species, level=5):
+        """Returns (hp_max, stats dict) for a species at a level (cached)."""
+        pokemon = self.prototype(species, level)
+        return pokemon.hp_max, pokemon.stats
+
+    def create(self, species, level=5, ivs=None, evs=None, nature=None):
+        """
+        Creates a new battler by copying the cached template. With IVs, EVs
+        or a nature only the stats are recalculated (see Pokemon.with_build).
+        """
+        if ivs is None and evs is None and nature is None:
+            return self.prototype(species, level).clone()
+        return self.prototype(species, level).with_build(None, ivs, evs, nature)
+
+    def stat_table(self, level=5):
+        """
+        The default-build stats of every species at a level, as a (species, 6)
+        int array in STAT_NAMES order (built once, needs NumPy).
+        """
+        table = self._stat_tables.get(level)
+        if table is None:
+            from .stats import base_stat_array, batch_stats
+            base = base_stat_array({'stats': t.base_stats} for t in self.species)
+            table = self._stat_tables[level] = batch_stats(base, level)
+            table.flags.writeable = False
+        return table
+
+    def matchups(self, level=5, workers=None):
+        """The MatchupMatrix of the whole roster at a level (built once, needs NumPy)."""
+        matrix = self._matchups.get(level)
+        if matrix is None:
+            from .matchup import MatchupMatrix
+            matrix = self._matchups[level] = MatchupMatrix.build(self, level, workers)
+        return matrix
@@ -0,0 +1,52 @@
+### src/render.py (Headless frame logic of the "Face")
+# What main.py draws is decided here, without turtle or Tk: every screen
+# region has a value taken from the Brain, and a region is redrawn only
+# when its value changed since the last frame. main.py turns the dirty
+# regions into turtle calls; benchmarks and tests run the same logic
+# with no window.
+
+# Screen regions, in drawing order
+REGIONS = ("state", "sprites", "player_hp", "opponent_hp", "messages")
+
+
+def region_values(game):
+    """The value behind every screen region, taken from the Brain."""
+    info = game.get_battle_info()
+    return {
+        "state": game.get_state(),
+        "sprites": (game.player_pokemon.sprite_back, game.opponent_pokemon.sprite_front)
+                   if info else None,
+        "player_hp": info['player'] if info else None,
+        "opponent_hp": info['opponent'] if info else None,
+        "messages": game.version # New messages come with every change
+    }
+
+
+class FrameState:
+    """
+    What each region shows right now, and the frame counters:
+
+        frame = FrameState()
+        values, dirty = frame.update(game) # dirty: regions to redraw
+    """
+    def __init__(self):
+        self.drawn = {}
+        self.stats = {"frames_rendered": 0, "frames_skipped": 0, "redraw_seconds": 0.0}
+
+    def update(self, game):
+        """Takes the new region values. Returns (values, dirty regions in REGIONS order)."""
+        values = region_values(game)
+        dirty = [region for region in REGIONS if self.drawn.get(region) != values[region]]
+        self.drawn.update(values)
+        return values, dirty
+
+    def skipped(self):
+        self.stats["frames_skipped"] += 1
+
+    def rendered(self, seconds):
+        self.stats["frames_rendered"] += 1
+        self.stats["redraw_seconds"] += seconds
+
+    def average_ms(self):
+        frames = self.stats["frames_rendered"]
+        return self.stats["redraw_seconds"] / frames * 1000 if frames else 0.0
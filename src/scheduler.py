@@ -0,0 +1,52 @@
+### src/scheduler.py (Turn order: priority, then speed, then a seeded coin flip)
+# Every action of a turn goes into a heap ordered by
+#   (-move priority, -attacker speed, random tiebreak, arrival order)
+# so the same code orders one battler per side or a 6v6 free-for-all.
+# The tiebreak comes from the battle's random.Random: a seeded battle
+# always breaks speed ties the same way.
+import heapq
+
+
+def order_key(attacker, move, rng):
+    """
+    Where an action goes in its turn (smaller goes first). Draws the
+    tiebreak from rng, one draw per action, in the order they are pushed.
+    simulator.simulate inlines it for two actions: keep them the same.
+    """
+    return (-move.priority, -attacker.stats['speed'], rng.random())
+
+
+class TurnScheduler:
+    """
+    The action queue of one turn:
+
+        scheduler.push(attacker, defender, move)   # any number of times
+        for attacker, defender, move in scheduler:  # fastest first
+            ...
+    """
+    def __init__(self, rng):
+        self.rng = rng
+        self._heap = []
+        self._count = 0
+
+    def __len__(self):
+        return len(self._heap)
+
+    def push(self, attacker, defender, move):
+        self._count += 1
+        heapq.heappush(self._heap, (*order_key(attacker, move, self.rng),
+                                    self._count, attacker, defender, move))
+
+    def pop(self):
+        """The next action to run, as (attacker, defender, move)."""
+        entry = heapq.heappop(self._heap)
+        return entry[4], entry[5], entry[6]
+
+    def __iter__(self):
+        heap = self._heap
+        while heap:
+            entry = heapq.heappop(heap)
+            yield entry[4], entry[5], entry[6]
+
+    def clear(self):
+        self._heap.clear()
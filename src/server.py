@@ -0,0 +1,315 @@
+### src/server.py (Multi-session battle server over asyncio)
+# Hosts many independent Game "Brains" in one process. Any client (a bot,
+# a test, another "Face") talks to it over a local TCP socket using
+# newline-delimited JSON: one request object per line, one reply per line.
+#
+#   -> {"id": 1, "op": "create"}
+#   <- {"id": 1, "ok": true, "session": "3f2a...", "state": "STARTER_SELECTION", ...}
+#   -> {"id": 2, "op": "select_starter", "session": "3f2a...", "index": 0}
+#   -> {"id": 3, "op": "move", "session": "3f2a...", "index": 1}
+#
+#   -> {"id": 4, "op": "switch", "session": "3f2a...", "index": 2}
+#
+# Ops: create, select_starter, select_party, move, switch, messages, state,
+# close, metrics. select_party takes "indices" (1 to 6 species indexes).
+# Every reply carries the state, the battle info and the drained messages,
+# and "result" (Game.result as a dict) once the state is GAME_OVER.
+# "metrics" (server started with --metrics) returns the counters and latency
+# histograms of every session, plus the same snapshot in Prometheus format.
+#
+# With --journal-dir every session writes an append-only journal (journal.py),
+# and a restarted server recovers all sessions from it (last checkpoint +
+# the few inputs after it) instead of losing them.
+import asyncio
+import glob
+import json
+import os
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+
+from .datapack import load_roster
+from .game import Game, PARTY_SIZE
+from .journal import Journal, ReplayError, recover
+from .metrics import Metrics
+from .registry import Registry
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+IDLE_TIMEOUT = 300.0 # Seconds without requests before a session is evicted
+EVICT_INTERVAL = 5.0 # Seconds between eviction passes
+
+
+class ServerError(Exception):
+    """A bad request. Sent back to the client as {"ok": false, "error": ...}."""
+    pass
+
+
+def _encode_battle_info(info):
+    """get_battle_info() with the move records turned into plain names."""
+    if not info:
+        return None
+    def encode(pokemon):
+        return dict(pokemon, moves=[move.name for move in pokemon['moves']])
+    return {key: [encode(p) for p in value] if isinstance(value, list) else encode(value)
+            for key, value in info.items()}
+
+
+class SessionManager:
+    """
+    All live Game sessions, least recently used first.
+    Touching a session moves it to the end, so eviction only
+    has to look at the front of the OrderedDict.
+    """
+    def __init__(self, pokemon_stats, idle_timeout=IDLE_TIMEOUT, clock=time.monotonic,
+                 metrics=None, journal_dir=None):
+        self.pokemon_stats = pokemon_stats
+        self.metrics = metrics # Shared by every Game too (None: not measured)
+        self.registry = Registry(pokemon_stats) # Shared by every Game
+        self.idle_timeout = idle_timeout
+        self.clock = clock
+        self.sessions = OrderedDict() # {session id: [game, last used]}
+        self.evicted = 0
+        self.journal_dir = journal_dir # None: sessions only live in memory
+        if journal_dir:
+            os.makedirs(journal_dir, exist_ok=True)
+            self.recover_sessions()
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def create(self):
+        session_id = uuid.uuid4().hex
+        game = Game(self.pokemon_stats, registry=self.registry, metrics=self.metrics)
+        if self.journal_dir:
+            Journal(self._journal_path(session_id)).record(game)
+        self.sessions[session_id] = [game, self.clock()]
+        return session_id, game
+
+    def _journal_path(self, session_id):
+        return os.path.join(self.journal_dir, f"{session_id}.journal")
+
+    def _forget(self, session_id):
+        if self.journal_dir:
+            try:
+                os.remove(self._journal_path(session_id))
+            except FileNotFoundError:
+                pass
+
+    def recover_sessions(self):
+        """Loads every session journaled in journal_dir. Returns how many."""
+        count = 0
+        for path in sorted(glob.glob(os.path.join(self.journal_dir, "*.journal"))):
+            session_id = os.path.basename(path)[:-len(".journal")]
+            try:
+                game = recover(path, self.pokemon_stats, registry=self.registry,
+                               metrics=self.metrics)
+            except (OSError, ValueError, ReplayError) as e:
+                print(f"Could not recover session {session_id}: {e}")
+                continue
+            # Replies already carried the messages from before the restart
+            game.get_pending_events()
+            Journal(path).record(game) # Continues the same file from a checkpoint
+            self.sessions[session_id] = [game, self.clock()]
+            count += 1
+        return count
+
+    def get(self, session_id):
+        entry = self.sessions.get(session_id)
+        if entry is None:
+            raise ServerError(f"Unknown session: {session_id}")
+        entry[1] = self.clock()
+        self.sessions.move_to_end(session_id)
+        return entry[0]
+
+    def close(self, session_id):
+        if self.sessions.pop(session_id, None) is None:
+            raise ServerError(f"Unknown session: {session_id}")
+        self._forget(session_id)
+
+    def evict_idle(self):
+        """Removes the sessions idle for longer than idle_timeout. Returns how many."""
+        deadline = self.clock() - self.idle_timeout
+        count = 0
+        while self.sessions:
+            session_id, (game, last_used) = next(iter(self.sessions.items()))
+            if last_used > deadline:
+                break
+            del self.sessions[session_id]
+            self._forget(session_id)
+            count += 1
+        self.evicted += count
+        return count
+
+
+class BattleServer:
+    """
+    The asyncio front end. handle_request() is plain synchronous code:
+    a Game turn never waits, so requests are answered without yielding.
+    """
+    def __init__(self, pokemon_stats, idle_timeout=IDLE_TIMEOUT, metrics=None, journal_dir=None):
+        self.manager = SessionManager(pokemon_stats, idle_timeout, metrics=metrics,
+                                      journal_dir=journal_dir)
+        self.requests = 0
+        self._server = None
+        self._evict_task = None
+
+    # --- Request Handling ---
+
+    def handle_request(self, request):
+        """Runs one request dict and returns the reply dict."""
+        self.requests += 1
+        op = request.get("op")
+
+        if op == "create":
+            session_id, game = self.manager.create()
+            reply = self._game_reply(game)
+            reply["session"] = session_id
+            reply["starters"] = game.get_starter_info()
+            return reply
+
+        if op == "metrics":
+            metrics = self.manager.metrics
+            if metrics is None:
+                raise ServerError("Metrics are off (start the server with --metrics)")
+            return {"ok": True, "sessions": len(self.manager), "requests": self.requests,
+                    "metrics": metrics.to_dict(), "prometheus": metrics.to_prometheus()}
+
+        session_id = request.get("session")
+        if op == "close":
+            self.manager.close(session_id)
+            return {"ok": True}
+
+        game = self.manager.get(session_id)
+        if op == "select_starter":
+            if game.get_state() != 'STARTER_SELECTION':
+                raise ServerError("Not in STARTER_SELECTION")
+            game.select_starter(self._index(request, len(game.pokemon_stats)))
+        elif op == "select_party":
+            if game.get_state() != 'STARTER_SELECTION':
+                raise ServerError("Not in STARTER_SELECTION")
+            indices, limit = request.get("indices"), len(game.pokemon_stats)
+            if (not isinstance(indices, list) or not 1 <= len(indices) <= PARTY_SIZE
+                    or not all(isinstance(i, int) and 0 <= i < limit for i in indices)):
+                raise ServerError(f"indices must be a list of 1 to {PARTY_SIZE} ints in [0, {limit})")
+            game.select_party(indices)
+        elif op == "switch":
+            if game.get_state() not in ('IN_BATTLE', 'CHOOSE_REPLACEMENT'):
+                raise ServerError("Not IN_BATTLE or CHOOSE_REPLACEMENT")
+            index = self._index(request, len(game.player_party))
+            if index not in game.get_switch_options():
+                raise ServerError(f"Can't switch to party slot {index}")
+            game.switch(index)
+        elif op == "move":
+            if game.get_state() != 'IN_BATTLE':
+                raise ServerError("Not IN_BATTLE")
+            game.run_battle_turn(self._index(request, len(game.player_pokemon.moves)))
+        elif op not in ("messages", "state"):
+            raise ServerError(f"Unknown op: {op}")
+        return self._game_reply(game)
+
+    def _index(self, request, limit):
+        index = request.get("index")
+        if not isinstance(index, int) or not 0 <= index < limit:
+            raise ServerError(f"index must be an int in [0, {limit})")
+        return index
+
+    def _game_reply(self, game):
+        result = game.result
+        return {
+            "ok": True,
+            "state": game.get_state(),
+            "battle": _encode_battle_info(game.get_battle_info()),
+            "messages": game.get_pending_messages(),
+            "result": result._asdict() if result is not None else None
+        }
+
+    def handle_line(self, line):
+        """Decodes one request line and encodes its reply (bytes in, bytes out)."""
+        request = {}
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ServerError("Request must be a JSON object")
+            reply = self.handle_request(request)
+        except (ServerError, ValueError) as e:
+            reply = {"ok": False, "error": str(e)}
+        except Exception as e:
+            # A bug, not a bad request: logged here, and the connection stays open
+            print(f"Error handling request {line[:200]!r}:")
+            traceback.print_exc()
+            reply = {"ok": False, "error": f"Internal server error ({type(e).__name__})"}
+        if isinstance(request, dict) and "id" in request:
+            reply["id"] = request["id"]
+        return json.dumps(reply, separators=(',', ':')).encode('utf-8') + b"\n"
+
+    # --- Networking ---
+
+    async def _client_connected(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                writer.write(self.handle_line(line))
+                # Only wait when the client is not reading fast enough
+                if writer.transport.get_write_buffer_size() > 64 * 1024:
+                    await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _evict_loop(self):
+        while True:
+            await asyncio.sleep(EVICT_INTERVAL)
+            self.manager.evict_idle()
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self._server = await asyncio.start_server(self._client_connected, host, port,
+                                                  limit=1024 * 1024)
+        self._evict_task = asyncio.create_task(self._evict_loop())
+        return self._server
+
+    async def stop(self):
+        if self._evict_task:
+            self._evict_task.cancel()
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def serve_forever(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        server = await self.start(host, port)
+        print(f"Battle server listening on {host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None):
+    """Command line: python -m src.server --port 8765"""
+    import argparse
+    parser = argparse.ArgumentParser(description="Multi-session battle server")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--idle-timeout", type=float, default=IDLE_TIMEOUT)
+    parser.add_argument("--data", default="data/pokemon_stats.json")
+    parser.add_argument("--metrics", action="store_true", help="Time every turn (op 'metrics')")
+    parser.add_argument("--journal-dir", default=None,
+                        help="Journal every session here and recover them on restart")
+    args = parser.parse_args(argv)
+
+    pokemon_stats = load_roster(args.data) # Binary pack if built, else the JSON
+    server = BattleServer(pokemon_stats, idle_timeout=args.idle_timeout,
+                          metrics=Metrics() if args.metrics else None,
+                          journal_dir=args.journal_dir)
+    try:
+        asyncio.run(server.serve_forever(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+### src/simulator.py (Headless batch battle simulator)
+# Runs many full battles between two species with no "Face" and no log,
+# for balance-testing movesets. A turn plays like Battle.run_turn in Game
+# (same order, same rolls: a seeded battle here is the same battle there),
+# with plain hits done inline and everything else (stat stages, status,
+# recoil...) by the effect interpreter through a Battle without events.
+import random
+import time
+from .pokemon import Pokemon
+from .battle import Battle, base_damage, _quiet
+from .effects import ACCURACY, DAMAGE_HIT, HANDLERS, STOP, end_of_turn
+from .datapack import load_roster
+# Policies live in ai.py (re-exported here for the command line and tournament)
+from .ai import POLICIES, random_policy, first_move_policy, strongest_move_policy
+
+# A battle where both sides only use status moves never ends.
+# After this many turns it is counted as a draw.
+MAX_TURNS = 1000
+
+
+class SimulationResult:
+    """
+    Aggregate results of many battles between side A and side B.
+    """
+    def __init__(self, species_a, species_b):
+        self.species_a = species_a
+        self.species_b = species_b
+        self.battles = 0
+        self.wins_a = 0
+        self.wins_b = 0
+        self.draws = 0
+        self.turns = {}    # {turn count: battles}
+        self.damage_a = {} # {damage dealt by A in one hit: hits}
+        self.damage_b = {} # {damage dealt by B in one hit: hits}
+        self.elapsed = 0.0
+
+    def win_rate(self, side):
+        """Fraction of battles won by side 'a' or 'b'."""
+        if not self.battles:
+            return 0.0
+        wins = self.wins_a if side == 'a' else self.wins_b
+        return wins / self.battles
+
+    def merge(self, other):
+        """Adds the counts of another result for the same matchup."""
+        self.battles += other.battles
+        self.wins_a += other.wins_a
+        self.wins_b += other.wins_b
+        self.draws += other.draws
+        for mine, theirs in ((self.turns, other.turns),
+                             (self.damage_a, other.damage_a),
+                             (self.damage_b, other.damage_b)):
+            for key, count in theirs.items():
+                mine[key] = mine.get(key, 0) + count
+        self.elapsed += other.elapsed
+        return self
+
+    def to_dict(self):
+        """Plain dict version (sorted histograms) for printing or saving."""
+        return {
+            "species_a": self.species_a,
+            "species_b": self.species_b,
+            "battles": self.battles,
+            "win_rate_a": self.win_rate('a'),
+            "win_rate_b": self.win_rate('b'),
+            "draws": self.draws,
+            "turns": dict(sorted(self.turns.items())),
+            "damage_a": dict(sorted(self.damage_a.items())),
+            "damage_b": dict(sorted(self.damage_b.items())),
+        }
+
+
+def find_species(pokemon_stats, species):
+    """Returns the JSON entry for a species name (any case) or list index."""
+    if isinstance(species, int):
+        return pokemon_stats[species]
+    for data in pokemon_stats:
+        if data['name'].lower() == species.lower():
+            return data
+    raise KeyError(f"Unknown species: {species}")
+
+
+class _CountingBattle(Battle):
+    """A Battle without events that counts the damage of every hit, per side."""
+    def __init__(self, pokemon_a, pokemon_b, rng, damage_a, damage_b):
+        super().__init__(pokemon_a, pokemon_b, events=None, rng=rng)
+        self._damage = {id(pokemon_a): damage_a, id(pokemon_b): damage_b}
+
+    def _calculate_damage(self, attacker, defender, move):
+        damage, type_multiplier = Battle._calculate_damage(self, attacker, defender, move)
+        histogram = self._damage[id(attacker)]
+        histogram[damage] = histogram.get(damage, 0) + 1
+        return damage, type_multiplier
+
+
+def _is_plain(move):
+    """Whether the move's program is only an accuracy check and/or a hit."""
+    return all(op in (ACCURACY, DAMAGE_HIT) for op, _, _, _ in move.effects)
+
+def _accuracy_of(move):
+    """The move's ACCURACY operand, or None if it never rolls one."""
+    for op, a, _, _ in move.effects:
+        if op == ACCURACY:
+            return a
+    return None
+
+def _stat_keys(move):
+    """The attack and defense stats the damage of a move depends on."""
+    if move.physical:
+        return 'attack', 'defense'
+    return 'special-attack', 'special-defense'
+
+
+def _slots(attacker, defender):
+    """
+    What the loop needs of each move of attacker, precomputed:
+    (move, plain, accuracy, damaging, base damage, stat keys, {stats: base}).
+    The base damage holds while neither side has stat stages or status;
+    with them, it is cached per (attack, defense) pair.
+    """
+    return [(move, _is_plain(move), _accuracy_of(move),
+             any(op == DAMAGE_HIT for op, _, _, _ in move.effects),
+             base_damage(attacker, defender, move)[0], _stat_keys(move), {})
+            for move in attacker.moves]
+
+
+def simulate(pokemon_stats, species_a, species_b, n_battles,
+             policy_a=random_policy, policy_b=random_policy,
+             seed=None, rng=None):
+    """
+    Runs n_battles full battles of species_a vs species_b and returns
+    a SimulationResult. Each turn both sides pick a move, then they act in
+    the order (and with the same rolls) of Battle.run_turn in Game, with
+    side A as the player: accuracy, stat stages, status, recoil... all count.
+    Both sides fainting in the same turn is a draw.
+    """
+    if rng is None:
+        rng = random.Random(seed)
+    pokemon_a = Pokemon(**find_species(pokemon_stats, species_a))
+    pokemon_b = Pokemon(**find_species(pokemon_stats, species_b))
+    result = SimulationResult(pokemon_a.name, pokemon_b.name)
+    battle = _CountingBattle(pokemon_a, pokemon_b, rng, result.damage_a, result.damage_b)
+
+    # Fast path: a plain move (only ACCURACY and DAMAGE_HIT) from an attacker
+    # with no status or volatile condition is played here, drawing exactly
+    # what the effect interpreter would. While neither side has stat stages
+    # its damage before the roll is the precomputed one; with stages, the
+    # accuracy roll uses them and the damage is cached per stat pair.
+    # Anything else goes through Battle.execute_action (effects.py).
+    slots_a, slots_b = _slots(pokemon_a, pokemon_b), _slots(pokemon_b, pokemon_a)
+    moves_a, moves_b = pokemon_a.moves, pokemon_b.moves
+    accuracy_check = HANDLERS[ACCURACY]
+    # Same numbers as random.uniform(0.85, 1.0) in Battle._calculate_damage
+    roll_low, roll_span = 0.85, 1.0 - 0.85
+
+    # Local names: this loop runs millions of times
+    execute = battle.execute_action # The quiet one (no events)
+    rand = rng.random
+    # random_policy is int(rng.random() * moves) and first_move_policy is 0:
+    # done inline (same draws), other policies are called
+    inline_a = {random_policy: len(moves_a), first_move_policy: 0}.get(policy_a)
+    inline_b = {random_policy: len(moves_b), first_move_policy: 0}.get(policy_b)
+    hp_max_a, hp_max_b = pokemon_a.hp_max, pokemon_b.hp_max
+    turns, damage_a, damage_b = result.turns, result.damage_a, result.damage_b
+    wins_a = wins_b = draws = 0
+
+    start = time.perf_counter()
+    for _ in range(n_battles):
+        # Fresh battlers: full HP, no stages, no status
+        for pokemon in (pokemon_a, pokemon_b):
+            if pokemon.stages is not None or pokemon.volatile is not None:
+                pokemon.clear_volatile()
+            if pokemon.status is not None:
+                pokemon.set_status(None)
+        pokemon_a.hp_actual, pokemon_b.hp_actual = hp_max_a, hp_max_b
+        turn = 0
+        while turn < MAX_TURNS:
+            turn += 1
+            if inline_a is None:
+                index_a = policy_a(pokemon_a, pokemon_b, rng)
+            else:
+                index_a = int(rand() * inline_a) if inline_a else 0
+            if inline_b is None:
+                index_b = policy_b(pokemon_b, pokemon_a, rng)
+            else:
+                index_b = int(rand() * inline_b) if inline_b else 0
+            action_a = (pokemon_a, pokemon_b, slots_a[index_a], damage_a)
+            action_b = (pokemon_b, pokemon_a, slots_b[index_b], damage_b)
+            # --- Who goes first ---
+            # scheduler.order_key inlined (two calls a turn cost more than
+            # both attacks): same key, and its tiebreak draw for A then B,
+            # as Battle.run_turn pushes them, even when it decides nothing
+            if ((-moves_a[index_a].priority, -pokemon_a.stats['speed'], rand())
+                    <= (-moves_b[index_b].priority, -pokemon_b.stats['speed'], rand())):
+                order = (action_a, action_b)
+            else:
+                order = (action_b, action_a)
+
+            # --- Both actions (a fainted side loses its own) ---
+            for attacker, defender, slot, histogram in order:
+                if attacker.hp_actual <= 0 or defender.hp_actual <= 0:
+                    continue
+                move, plain, hit_chance, damaging, base, stat_keys, bases = slot
+                if not plain or attacker.status is not None or attacker.volatile:
+                    execute(attacker, defender, move)
+                    continue
+                if attacker.stages is None and defender.stages is None:
+                    if hit_chance is not None and hit_chance < 100 and rand() * 100 >= hit_chance:
+                        continue # Missed
+                else:
+                    if hit_chance is not None and accuracy_check(
+                            battle, _quiet, attacker, defender, move, hit_chance, 0, 0, 0) == STOP:
+                        continue
+                    key = (attacker.stats[stat_keys[0]], defender.stats[stat_keys[1]])
+                    base = bases.get(key)
+                    if base is None:
+                        base = bases[key] = base_damage(attacker, defender, move)[0]
+                if damaging:
+                    damage = int(base * (roll_low + roll_span * rand()))
+                    histogram[damage] = histogram.get(damage, 0) + 1
+                    if damage > 0:
+                        hp = defender.hp_actual - damage # (Pokemon.take_damage)
+                        defender.hp_actual = hp if hp > 0 else 0
+
+            # --- Burn, poison, leech seed (A then B, as Battle._end_of_turn) ---
+            if pokemon_a.status is not None or pokemon_a.volatile:
+                end_of_turn(battle, _quiet, pokemon_a)
+            if pokemon_b.status is not None or pokemon_b.volatile:
+                end_of_turn(battle, _quiet, pokemon_b)
+            if pokemon_a.hp_actual <= 0 or pokemon_b.hp_actual <= 0:
+                break
+        a_down, b_down = pokemon_a.hp_actual <= 0, pokemon_b.hp_actual <= 0
+        if a_down == b_down:
+            draws += 1 # Out of turns, or a mutual KO (recoil, burn...)
+        elif b_down:
+            wins_a += 1
+        else:
+            wins_b += 1
+        turns[turn] = turns.get(turn, 0) + 1
+
+    result.elapsed = time.perf_counter() - start
+    result.battles = n_battles
+    result.wins_a, result.wins_b, result.draws = wins_a, wins_b, draws
+    return result
+
+
+def main(argv=None):
+    """Command line: python -m src.simulator Bulbasaur Charmander -n 100000"""
+    import argparse
+    import json
+    parser = argparse.ArgumentParser(description="Headless batch battle simulator")
+    parser.add_argument("species_a")
+    parser.add_argument("species_b")
+    parser.add_argument("-n", "--battles", type=int, default=100000)
+    parser.add_argument("--policy-a", choices=POLICIES, default="random")
+    parser.add_argument("--policy-b", choices=POLICIES, default="random")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--data", default="data/pokemon_stats.json")
+    args = parser.parse_args(argv)
+
+    pokemon_stats = load_roster(args.data) # Binary pack if built, else the JSON
+
+    result = simulate(pokemon_stats, args.species_a, args.species_b, args.battles,
+                      POLICIES[args.policy_a], POLICIES[args.policy_b], seed=args.seed)
+    print(json.dumps(result.to_dict(), indent=4))
+    print(f"{result.battles} battles in {result.elapsed:.3f}s "
+          f"({result.battles / max(result.elapsed, 1e-9):,.0f} battles/s)")
+
+
+if __name__ == "__main__":
+    main()
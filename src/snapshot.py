@@ -0,0 +1,283 @@
+### src/snapshot.py (Binary Game snapshots and cheap clones)
+# A snapshot is everything a Game needs to continue exactly where it was:
+# the state machine, both parties (species, level, build, HP, stages and
+# status conditions), the random.Random
+# state and the events not read yet. Species are stored as registry indexes,
+# so restoring needs a Game built from the same roster.
+#
+# Layout (little-endian):
+#   header    MAGIC, version, state, turns played
+#   parties   2 x (size, active slot or 0xFF, then size x battler)
+#   battler   species index, level, hp_actual, status, status turns,
+#             7 stat stages, leech seed flag, confusion turns,
+#             6 IVs, 6 EVs (STAT_NAMES order), nature (0 = none)
+#   rng       gauss flag, gauss value, 625 Mersenne Twister words
+#   events    count, then every event: kind + 3 tagged values
+import random
+import struct
+
+from .battle import Battle
+from .effects import STATUSES
+from .events import EventBuffer
+from .moves import intern_move
+from .pokemon import NATURES, STAGE_STATS, STAT_NAMES
+
+MAGIC = b"PKSS"
+VERSION = 6 # 2: whole parties instead of one battler per side, 3: stages and status,
+            # 4: turn count, 5: IVs, EVs and nature, 6: whole moves in events
+STATES = ('STARTER_SELECTION', 'IN_BATTLE', 'GAME_OVER', 'CHOOSE_REPLACEMENT')
+
+HEADER = struct.Struct("<4sHBI")
+PARTY = struct.Struct("<BB")
+BATTLER = struct.Struct("<hBHBB7bBB6B6BB")
+RNG = struct.Struct("<Bd625I")
+COUNT = struct.Struct("<I")
+EVENT_KIND = struct.Struct("<B")
+
+NO_SPECIES = -1
+NO_ACTIVE = 0xFF
+_NATURE_NAMES = tuple(NATURES) # Stored as index + 1
+CLONE_EVENTS = 64 # Event capacity of a clone
+
+# Tags of the event payload values
+_NONE, _INT, _FLOAT, _STR, _MOVE = range(5)
+_TAG = struct.Struct("<B")
+_I64 = struct.Struct("<q")
+_F64 = struct.Struct("<d")
+_LEN = struct.Struct("<H")
+
+
+class SnapshotError(ValueError):
+    """The data is not a snapshot this version can read."""
+    pass
+
+
+# --- Event payload values ---
+
+def _pack_str(out, text):
+    encoded = text.encode('utf-8')
+    out += _LEN.pack(len(encoded))
+    out += encoded
+
+def _pack_value(out, value):
+    if value is None:
+        out += _TAG.pack(_NONE)
+    elif isinstance(value, tuple) and hasattr(value, 'category'):
+        # A MoveRecord: by its fields and compiled effects (IDs change between processes)
+        out += _TAG.pack(_MOVE)
+        _pack_str(out, value.name)
+        _pack_value(out, value.power)
+        _pack_str(out, value.type)
+        _pack_str(out, value.category)
+        _pack_value(out, value.priority)
+        _pack_value(out, value.accuracy)
+        out += _LEN.pack(len(value.effects))
+        for instruction in value.effects:
+            for field in instruction:
+                _pack_value(out, field)
+    elif isinstance(value, int):
+        out += _TAG.pack(_INT) + _I64.pack(value)
+    elif isinstance(value, float):
+        out += _TAG.pack(_FLOAT) + _F64.pack(value)
+    else:
+        out += _TAG.pack(_STR)
+        _pack_str(out, str(value))
+
+def _unpack_str(data, offset):
+    (length,) = _LEN.unpack_from(data, offset)
+    offset += _LEN.size
+    return bytes(data[offset:offset + length]).decode('utf-8'), offset + length
+
+def _unpack_value(data, offset):
+    (tag,) = _TAG.unpack_from(data, offset)
+    offset += _TAG.size
+    if tag == _NONE:
+        return None, offset
+    if tag == _INT:
+        return _I64.unpack_from(data, offset)[0], offset + _I64.size
+    if tag == _FLOAT:
+        return _F64.unpack_from(data, offset)[0], offset + _F64.size
+    if tag == _STR:
+        return _unpack_str(data, offset)
+    if tag == _MOVE:
+        name, offset = _unpack_str(data, offset)
+        power, offset = _unpack_value(data, offset)
+        move_type, offset = _unpack_str(data, offset)
+        category, offset = _unpack_str(data, offset)
+        priority, offset = _unpack_value(data, offset)
+        accuracy, offset = _unpack_value(data, offset)
+        (count,) = _LEN.unpack_from(data, offset)
+        offset += _LEN.size
+        effects = []
+        for _ in range(count):
+            instruction = []
+            for _ in range(4):
+                field, offset = _unpack_value(data, offset)
+                instruction.append(field)
+            effects.append(tuple(instruction))
+        return intern_move({"name": name, "power": power, "type": move_type,
+                            "category": category, "priority": priority,
+                            "accuracy": accuracy, "effects": effects}), offset
+    raise SnapshotError(f"Unknown value tag {tag}")
+
+
+# --- Snapshots ---
+
+def _species_index(game, pokemon):
+    if pokemon is None:
+        return NO_SPECIES
+    return game.registry.get(pokemon.name).index
+
+def _pack_battler(game, pokemon):
+    stages = pokemon.stages or dict.fromkeys(STAGE_STATS, 0)
+    volatile = pokemon.volatile or {}
+    status = STATUSES.index(pokemon.status) + 1 if pokemon.status is not None else 0
+    ivs, evs = pokemon.ivs or {}, pokemon.evs or {}
+    nature = _NATURE_NAMES.index(pokemon.nature) + 1 if pokemon.nature is not None else 0
+    return BATTLER.pack(_species_index(game, pokemon), pokemon.level, pokemon.hp_actual,
+                        status, pokemon.status_turns, *(stages[stat] for stat in STAGE_STATS),
+                        'leech-seed' in volatile, volatile.get('confusion', 0),
+                        *(ivs.get(stat, 0) for stat in STAT_NAMES),
+                        *(evs.get(stat, 0) for stat in STAT_NAMES), nature)
+
+def _unpack_battler(game, fields):
+    index, level, hp, status, status_turns = fields[:5]
+    stages, seeded, confusion = fields[5:12], fields[12], fields[13]
+    ivs, evs, nature = fields[14:20], fields[20:26], fields[26]
+    # All zero is the default build (None), which skips recalculating the stats
+    pokemon = game.registry.create(index, level,
+                                   dict(zip(STAT_NAMES, ivs)) if any(ivs) else None,
+                                   dict(zip(STAT_NAMES, evs)) if any(evs) else None,
+                                   _NATURE_NAMES[nature - 1] if nature else None)
+    pokemon.hp_actual = hp
+    if status:
+        pokemon.set_status(STATUSES[status - 1], status_turns)
+    for stat, stage in zip(STAGE_STATS, stages):
+        if stage:
+            pokemon.change_stage(stat, stage)
+    if seeded or confusion:
+        pokemon.volatile = {}
+        if seeded:
+            pokemon.volatile['leech-seed'] = True
+        if confusion:
+            pokemon.volatile['confusion'] = confusion
+    return pokemon
+
+def take_snapshot(game):
+    """Returns the state of a Game as bytes (see restore_snapshot)."""
+    out = bytearray(HEADER.pack(MAGIC, VERSION, STATES.index(game.state), game.turns))
+    for party, active in ((game.player_party, game.player_pokemon),
+                          (game.opponent_party, game.opponent_pokemon)):
+        slot = next((i for i, pokemon in enumerate(party) if pokemon is active), NO_ACTIVE)
+        out += PARTY.pack(len(party), slot)
+        for pokemon in party:
+            out += _pack_battler(game, pokemon)
+
+    _, words, gauss = game.rng.getstate()
+    out += RNG.pack(gauss is not None, gauss or 0.0, *words)
+
+    events = game.events.peek() if game.events is not None else []
+    out += COUNT.pack(len(events))
+    for kind, a, b, c in events:
+        out += EVENT_KIND.pack(kind)
+        _pack_value(out, a)
+        _pack_value(out, b)
+        _pack_value(out, c)
+    return bytes(out)
+
+
+def restore_snapshot(game, data):
+    """
+    Puts a Game back in the state of a snapshot. The Game must use the same
+    roster (and so the same registry indexes) as the one that took it.
+    """
+    magic, version, state, turns = HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise SnapshotError("Not a game snapshot")
+    if version != VERSION:
+        raise SnapshotError(f"Snapshot version {version}, expected {VERSION}")
+    offset = HEADER.size
+
+    parties, battlers = [], []
+    for _ in range(2):
+        size, slot = PARTY.unpack_from(data, offset)
+        offset += PARTY.size
+        party = []
+        for _ in range(size):
+            party.append(_unpack_battler(game, BATTLER.unpack_from(data, offset)))
+            offset += BATTLER.size
+        parties.append(party)
+        battlers.append(party[slot] if slot != NO_ACTIVE else None)
+
+    has_gauss, gauss, *words = RNG.unpack_from(data, offset)
+    offset += RNG.size
+    game.rng.setstate((3, tuple(words), gauss if has_gauss else None))
+
+    (count,) = COUNT.unpack_from(data, offset)
+    offset += COUNT.size
+    if game.events is not None:
+        game.events.clear()
+    for _ in range(count):
+        (kind,) = EVENT_KIND.unpack_from(data, offset)
+        offset += EVENT_KIND.size
+        a, offset = _unpack_value(data, offset)
+        b, offset = _unpack_value(data, offset)
+        c, offset = _unpack_value(data, offset)
+        if game.events is not None:
+            game.events.emit(kind, a, b, c)
+
+    game.state = STATES[state]
+    game.turns = turns
+    game.player_party, game.opponent_party = parties
+    game.player_pokemon, game.opponent_pokemon = battlers
+    game.current_battle = None
+    if game.player_pokemon is not None and game.opponent_pokemon is not None:
+        game.current_battle = Battle(game.player_pokemon, game.opponent_pokemon,
+                                     game.events, game.rng, game.metrics)
+    return game
+
+
+def clone_game(game, events=True):
+    """
+    An independent copy of a Game for search (no files, no bytes):
+    new battlers, its own random.Random and event buffer. Subscribers and
+    metrics are not copied; registry and opponent policy are shared.
+    events=False gives a copy that records nothing (faster to play ahead).
+    """
+    new = game.__class__.__new__(game.__class__)
+    new.__dict__.update(game.__dict__)
+    # Instance-level wrappers (metrics, journal) belong to the original
+    for name in ('run_battle_turn', 'select_starter', 'select_party', 'switch', 'log'):
+        new.__dict__.pop(name, None)
+    new._subscribers = []
+    new.metrics = None
+    new.opponent_policy = getattr(game.opponent_policy, '__wrapped__', game.opponent_policy)
+
+    # __new__ skips seeding from the OS, setstate overwrites everything anyway
+    new.rng = random.Random.__new__(random.Random)
+    new.rng.setstate(game.rng.getstate())
+    if not events:
+        new.events = None
+    elif game.events is not None:
+        # A small buffer: a clone is played for a few turns, not a whole session
+        new.events = EventBuffer(max(CLONE_EVENTS, len(game.events)))
+        for event in game.events.peek():
+            new.events.emit(*event)
+
+    new.player_party = [pokemon.clone() for pokemon in game.player_party]
+    new.opponent_party = [pokemon.clone() for pokemon in game.opponent_party]
+    new.player_pokemon = _same_slot(game.player_pokemon, game.player_party, new.player_party)
+    new.opponent_pokemon = _same_slot(game.opponent_pokemon, game.opponent_party,
+                                      new.opponent_party)
+    new.current_battle = None
+    if new.player_pokemon is not None and new.opponent_pokemon is not None:
+        new.current_battle = Battle(new.player_pokemon, new.opponent_pokemon, new.events, new.rng)
+    return new
+
+
+def _same_slot(pokemon, party, new_party):
+    """The clone of pokemon (the party member at the same slot)."""
+    for i, member in enumerate(party):
+        if member is pokemon:
+            return new_party[i]
+    return pokemon.clone() if pokemon is not None else None
@@ -0,0 +1,206 @@
+### src/sprites.py (Sprite loading for the turtle "Face")
+# Sprites are found by file name in data/sprites (the JSON paths are
+# absolute Windows paths), decoded only the first time they are shown,
+# and kept in an LRU with a memory cap. They can also be read from one
+# prebuilt atlas file instead of many GIFs.
+#
+# Nothing here imports turtle/tkinter until a sprite is really decoded.
+import base64
+import mmap
+import os
+import struct
+from collections import OrderedDict
+
+SPRITE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                          "data", "sprites")
+ATLAS_PATH = os.path.join(os.path.dirname(SPRITE_DIR), "sprites.atlas")
+MAX_BYTES = 32 * 1024 * 1024 # Decoded pixels kept in memory
+
+# --- Atlas Format ---
+# header: magic, version, count
+# index:  count x (name length, name, offset, length), names are UTF-8
+# data:   the GIF files, one after another
+ATLAS_MAGIC = b"PKSA"
+ATLAS_VERSION = 1
+ATLAS_HEADER = struct.Struct("<4sHI")
+ATLAS_ENTRY = struct.Struct("<H")
+ATLAS_SPAN = struct.Struct("<QI")
+
+
+def sprite_name(path):
+    """Just the file name ('c:\\...\\1bulbasaur_front.gif' -> '1bulbasaur_front.gif')."""
+    if not path:
+        return None
+    return path.replace("\\", "/").rsplit("/", 1)[-1]
+
+
+def gif_size(data):
+    """(width, height) from a GIF header, without decoding it."""
+    if data[:3] != b"GIF" or len(data) < 10:
+        return 0, 0
+    return struct.unpack_from("<HH", data, 6)
+
+
+def build_atlas(sprite_dir=SPRITE_DIR, atlas_path=ATLAS_PATH):
+    """Packs every GIF in sprite_dir into one atlas file. Returns how many."""
+    names = sorted(name for name in os.listdir(sprite_dir) if name.lower().endswith(".gif"))
+    blobs = []
+    for name in names:
+        with open(os.path.join(sprite_dir, name), 'rb') as f:
+            blobs.append(f.read())
+
+    encoded_names = [name.encode('utf-8') for name in names]
+    offset = ATLAS_HEADER.size + sum(ATLAS_ENTRY.size + len(encoded) + ATLAS_SPAN.size
+                                     for encoded in encoded_names)
+    index = bytearray()
+    for encoded, blob in zip(encoded_names, blobs):
+        index += ATLAS_ENTRY.pack(len(encoded)) + encoded + ATLAS_SPAN.pack(offset, len(blob))
+        offset += len(blob)
+
+    with open(atlas_path + ".tmp", 'wb') as f:
+        f.write(ATLAS_HEADER.pack(ATLAS_MAGIC, ATLAS_VERSION, len(names)))
+        f.write(index)
+        for blob in blobs:
+            f.write(blob)
+    os.replace(atlas_path + ".tmp", atlas_path)
+    return len(names)
+
+
+class SpriteAtlas:
+    """A memory-mapped atlas: only the small index is read when it is opened."""
+    def __init__(self, atlas_path=ATLAS_PATH):
+        with open(atlas_path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count = ATLAS_HEADER.unpack_from(self._map, 0)
+        if magic != ATLAS_MAGIC or version != ATLAS_VERSION:
+            raise ValueError(f"{atlas_path} is not a sprite atlas (version {ATLAS_VERSION})")
+        self.index = {} # {file name: (offset, length)}
+        position = ATLAS_HEADER.size
+        for _ in range(count):
+            (name_length,) = ATLAS_ENTRY.unpack_from(self._map, position)
+            position += ATLAS_ENTRY.size
+            name = self._map[position:position + name_length].decode('utf-8')
+            position += name_length
+            self.index[name] = ATLAS_SPAN.unpack_from(self._map, position)
+            position += ATLAS_SPAN.size
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def read(self, name):
+        offset, length = self.index[name]
+        return self._map[offset:offset + length]
+
+
+class SpriteCache:
+    """
+    Turns sprite paths from the roster into turtle shape names, on demand.
+    Decoded images stay in an LRU until max_bytes is reached; then the
+    least recently used ones are unregistered from the screen, except the
+    ones a pen is showing (pinned by shape(path, pen) until release(pen)).
+    Counters: hits, misses (decodes), evictions, missing (files not found).
+    """
+    def __init__(self, screen, sprite_dir=SPRITE_DIR, atlas_path=None, max_bytes=MAX_BYTES):
+        self.screen = screen
+        self.sprite_dir = sprite_dir
+        self.atlas = SpriteAtlas(atlas_path) if atlas_path and os.path.exists(atlas_path) else None
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._shapes = OrderedDict() # {file name: decoded size in bytes}
+        self._pinned = {}            # {pen: file name it is showing}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.missing = 0
+        self._warned = set()
+
+    def shape(self, path, pen=None):
+        """
+        Returns the turtle shape name for a sprite path (decoding it the
+        first time), or None if the sprite can't be found.
+        Call it every time a sprite is shown, so the LRU knows it is in use.
+        With the pen that will show it, the shape is pinned (never evicted)
+        until that pen shows another sprite or is released.
+        """
+        name = sprite_name(path)
+        if name is None:
+            self.release(pen)
+            return None
+        if name in self._shapes:
+            self.hits += 1
+            self._shapes.move_to_end(name)
+            self._pin(pen, name)
+            return name
+
+        data = self._read(name)
+        if data is None:
+            self.release(pen)
+            self.missing += 1
+            if name not in self._warned:
+                self._warned.add(name)
+                print(f"WARNING: sprite {name} not found in {self.sprite_dir}")
+            return None
+
+        self.misses += 1
+        self._register(name, data)
+        width, height = gif_size(data)
+        size = width * height * 4 # Decoded RGBA
+        self._shapes[name] = size
+        self.bytes += size
+        self._pin(pen, name)
+        self._evict()
+        return name
+
+    def _pin(self, pen, name):
+        if pen is not None:
+            self._pinned[pen] = name
+
+    def release(self, pen):
+        """The pen no longer shows a sprite (hidden): its shape can be evicted."""
+        self._pinned.pop(pen, None)
+
+    def _read(self, name):
+        if self.atlas is not None and name in self.atlas:
+            return self.atlas.read(name)
+        path = os.path.join(self.sprite_dir, name)
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _register(self, name, data):
+        import tkinter
+        import turtle
+        image = tkinter.PhotoImage(data=base64.b64encode(data).decode('ascii'))
+        self.screen.register_shape(name, turtle.Shape("image", image))
+
+    def _evict(self):
+        # Least recently used first; keep the pinned ones and the sprite just added
+        if self.bytes <= self.max_bytes:
+            return
+        pinned = set(self._pinned.values())
+        for name in list(self._shapes)[:-1]:
+            if name in pinned:
+                continue
+            self.bytes -= self._shapes.pop(name)
+            self.evictions += 1
+            self._unregister(name)
+            if self.bytes <= self.max_bytes:
+                break
+
+    def _unregister(self, name):
+        # turtle can't remove a shape: the name is registered again as an
+        # empty polygon, which drops the last reference to the decoded image
+        self.screen.register_shape(name, ((0, 0), (0, 0), (0, 0)))
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "missing": self.missing,
+            "cached": len(self._shapes),
+            "pinned": len(set(self._pinned.values())),
+            "bytes": self.bytes
+        }
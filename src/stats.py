@@ -0,0 +1,70 @@
+### src/stats.py (Vectorized stat calculation for whole rosters and builds)
+# The same formula as pokemon.calculate_stat, for arrays: every species of a
+# roster, or thousands of random IV/EV/nature builds, in one NumPy pass.
+# Stat columns are in pokemon.STAT_NAMES order (hp first). Needs NumPy.
+import numpy as np
+
+from .pokemon import STAT_NAMES, NATURES, MAX_IV, MAX_EV, MAX_TOTAL_EV, MIN_LEVEL, MAX_LEVEL
+
+# Natures by index, and their multiplier per stat in tenths (9, 10 or 11)
+NATURE_NAMES = tuple(NATURES)
+NATURE_TENTHS = np.full((len(NATURE_NAMES), len(STAT_NAMES)), 10, dtype=np.int64)
+for _i, (_boosted, _lowered) in enumerate(NATURES.values()):
+    if _boosted is not None:
+        NATURE_TENTHS[_i, STAT_NAMES.index(_boosted)] = 11
+        NATURE_TENTHS[_i, STAT_NAMES.index(_lowered)] = 9
+NEUTRAL = NATURE_NAMES.index("hardy")
+
+
+def base_stat_array(pokemon_stats):
+    """(species, 6) int array of base stats from the JSON dicts (missing stats are 10)."""
+    return np.array([[data['stats'].get(name, 10) for name in STAT_NAMES]
+                     for data in pokemon_stats], dtype=np.int64).reshape(-1, len(STAT_NAMES))
+
+
+def batch_stats(base, level, ivs=0, evs=0, natures=None):
+    """
+    Returns int64 stats, shape (..., 6), for every row of the batch.
+    Arguments broadcast against each other:
+      base    -> (..., 6) base stats (see base_stat_array)
+      level   -> scalar or (...) levels
+      ivs     -> scalar or (..., 6), 0 to 31
+      evs     -> scalar or (..., 6), 0 to 252
+      natures -> None (neutral) or (...) indexes into NATURE_NAMES
+    Integer arithmetic all the way, so every value is exactly calculate_stat's.
+    """
+    base = np.asarray(base, dtype=np.int64)
+    level = np.asarray(level, dtype=np.int64)[..., np.newaxis]
+    core = (2 * base + ivs + np.asarray(evs, dtype=np.int64) // 4) * level // 100
+
+    stats = core + 5
+    if natures is not None:
+        stats = stats * NATURE_TENTHS[np.asarray(natures)] // 10
+    stats[..., 0] = core[..., 0] + level[..., 0] + 10 # HP has its own formula, no nature
+    return stats
+
+
+def random_builds(rng, count, ev_total=MAX_TOTAL_EV):
+    """
+    count random builds from a numpy.random.Generator, as (ivs, evs, natures):
+    uniform IVs, ev_total EVs spread at random (in steps of 4, at most 252
+    per stat) and a uniform nature.
+    """
+    ivs = rng.integers(0, MAX_IV + 1, size=(count, len(STAT_NAMES)))
+    evs = rng.multinomial(ev_total // 4, [1 / len(STAT_NAMES)] * len(STAT_NAMES), size=count) * 4
+    evs = np.minimum(evs, MAX_EV)
+    natures = rng.integers(0, len(NATURE_NAMES), size=count)
+    return ivs, evs, natures
+
+
+def level_table(base, levels=range(MIN_LEVEL, MAX_LEVEL + 1)):
+    """(levels, species, 6) default-build stats of a roster at every level."""
+    levels = np.asarray(levels, dtype=np.int64)
+    return batch_stats(np.asarray(base)[np.newaxis], levels[:, np.newaxis])
+
+
+def build_dict(ivs, evs, nature):
+    """One row of random_builds as the (ivs, evs, nature) that Pokemon takes."""
+    return (dict(zip(STAT_NAMES, (int(v) for v in ivs))),
+            dict(zip(STAT_NAMES, (int(v) for v in evs))),
+            NATURE_NAMES[int(nature)])
@@ -0,0 +1,131 @@
+### src/tournament.py (Sharded, reproducible tournament runner)
+# Every species vs every species, K battles each, split into fixed-size
+# shards that run on a ProcessPoolExecutor. Each shard gets its own seed
+# from (seed, species A, species B, shard number), so the merged results
+# are the same no matter how many workers run them, or in what order.
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .datapack import load_roster
+from .simulator import POLICIES, SimulationResult, simulate
+
+SHARD_SIZE = 20000 # Battles per shard
+
+
+def shard_seed(seed, index_a, index_b, shard):
+    """A 64-bit seed for one shard, the same on every machine and process."""
+    key = f"{seed}:{index_a}:{index_b}:{shard}".encode('ascii')
+    return int.from_bytes(hashlib.sha256(key).digest()[:8], 'little')
+
+
+def plan_shards(n_species, battles_per_pair, seed, shard_size=SHARD_SIZE):
+    """
+    Returns the list of (index_a, index_b, shard, n_battles, shard seed).
+    It only depends on the arguments, never on the number of workers.
+    """
+    shards = []
+    for index_a in range(n_species):
+        for index_b in range(n_species):
+            for shard, start in enumerate(range(0, battles_per_pair, shard_size)):
+                n_battles = min(shard_size, battles_per_pair - start)
+                shards.append((index_a, index_b, shard, n_battles,
+                               shard_seed(seed, index_a, index_b, shard)))
+    return shards
+
+
+# --- Worker Side ---
+# Each worker process receives the roster once (initializer),
+# then only small shard tuples travel through the pool.
+_worker_stats = None
+
+def _init_worker(pokemon_stats):
+    global _worker_stats
+    _worker_stats = pokemon_stats
+
+def _run_shard(shard, policy_a, policy_b, pokemon_stats=None):
+    index_a, index_b, _, n_battles, seed = shard
+    result = simulate(pokemon_stats or _worker_stats, index_a, index_b, n_battles,
+                      POLICIES[policy_a], POLICIES[policy_b], seed=seed)
+    return shard, result
+
+
+# --- Main Side ---
+
+def iter_tournament(pokemon_stats, battles_per_pair, seed=0, workers=None,
+                    policy_a="random", policy_b="random", shard_size=SHARD_SIZE):
+    """
+    Yields (shard, SimulationResult) as each shard finishes.
+    Policies are names from simulator.POLICIES (they must reach the workers).
+    workers=1 runs everything in this process.
+    """
+    shards = plan_shards(len(pokemon_stats), battles_per_pair, seed, shard_size)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers == 1:
+        for shard in shards:
+            yield _run_shard(shard, policy_a, policy_b, pokemon_stats)
+        return
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker,
+                             initargs=(pokemon_stats,)) as executor:
+        futures = [executor.submit(_run_shard, shard, policy_a, policy_b) for shard in shards]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def run_tournament(pokemon_stats, battles_per_pair, seed=0, workers=None,
+                   policy_a="random", policy_b="random", shard_size=SHARD_SIZE,
+                   on_progress=None):
+    """
+    Runs the full tournament and returns {(index_a, index_b): SimulationResult}.
+    on_progress(done, total) is called after every shard that comes back.
+    """
+    results = {}
+    total = len(plan_shards(len(pokemon_stats), battles_per_pair, seed, shard_size))
+    done = 0
+    for shard, partial in iter_tournament(pokemon_stats, battles_per_pair, seed, workers,
+                                          policy_a, policy_b, shard_size):
+        key = (shard[0], shard[1])
+        if key not in results:
+            results[key] = SimulationResult(partial.species_a, partial.species_b)
+        results[key].merge(partial)
+        done += 1
+        if on_progress:
+            on_progress(done, total)
+    return results
+
+
+def main(argv=None):
+    """Command line: python -m src.tournament -k 100000 --workers 4 --seed 1"""
+    import argparse
+    import time
+    parser = argparse.ArgumentParser(description="Every species vs every species")
+    parser.add_argument("-k", "--battles", type=int, default=100000,
+                        help="Battles per matchup")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--policy-a", choices=POLICIES, default="random")
+    parser.add_argument("--policy-b", choices=POLICIES, default="random")
+    parser.add_argument("--data", default="data/pokemon_stats.json")
+    args = parser.parse_args(argv)
+
+    pokemon_stats = load_roster(args.data) # Binary pack if built, else the JSON
+
+    start = time.perf_counter()
+    results = run_tournament(pokemon_stats, args.battles, args.seed, args.workers,
+                             args.policy_a, args.policy_b,
+                             on_progress=lambda done, total: print(f"\r{done}/{total} shards",
+                                                                   end="", flush=True))
+    elapsed = time.perf_counter() - start
+    print()
+    for (index_a, index_b), result in sorted(results.items()):
+        print(f"{result.species_a:>12} vs {result.species_b:<12} "
+              f"A wins {result.win_rate('a'):6.2%}  B wins {result.win_rate('b'):6.2%}")
+    battles = sum(result.battles for result in results.values())
+    print(f"{battles} battles in {elapsed:.2f}s ({battles / elapsed:,.0f} battles/s)")
+
+
+if __name__ == "__main__":
+    main()
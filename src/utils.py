@@ -81,18 +81,83 @@ TYPE_CHART = {
 }
 
 
+# --- TYPE IDS ---
+# The 18 types are interned to small integers (chart order) when this
+# module is loaded, so a battle never has to look up a type by its string.
+TYPE_NAMES = list(TYPE_CHART)
+TYPE_IDS = {name: i for i, name in enumerate(TYPE_NAMES)}
+NUM_TYPES = len(TYPE_NAMES)
+
+# Used for unknown types and for the empty second slot of single-type
+# Pokémon. It is neutral (1.0) against and from every type.
+NO_TYPE = NUM_TYPES
+
+# TYPE_MATRIX[attacking id][defending id], 19x19 including NO_TYPE
+TYPE_MATRIX = [
+    [TYPE_CHART[attacker].get(defender, 1.0) for defender in TYPE_NAMES] + [1.0]
+    for attacker in TYPE_NAMES
+] + [[1.0] * (NUM_TYPES + 1)]
+
+# Every possible defender: (first type, second type or NO_TYPE)
+DEFENDER_KEYS = (NUM_TYPES + 1) * (NUM_TYPES + 1)
+
+# Precomputed multiplier of every move type against every single- and
+# dual-type defender. Index with move_type_id * DEFENDER_KEYS + defender_key.
+EFFECTIVENESS = [
+    TYPE_MATRIX[move_id][first] * TYPE_MATRIX[move_id][second]
+    for move_id in range(NUM_TYPES + 1)
+    for first in range(NUM_TYPES + 1)
+    for second in range(NUM_TYPES + 1)
+]
+
+
+def type_id(type_name):
+    """Returns the integer ID of a type ("Grass" -> 4), NO_TYPE if unknown."""
+    return TYPE_IDS.get(type_name, NO_TYPE)
+
+
+def defender_key(defender_types):
+    """
+    Packs a list of one or two type names into one integer
+    (the column of EFFECTIVENESS). Compute it once per Pokémon.
+    """
+    first = type_id(defender_types[0]) if defender_types else NO_TYPE
+    second = type_id(defender_types[1]) if len(defender_types) > 1 else NO_TYPE
+    return first * (NUM_TYPES + 1) + second
+
+
+def effectiveness(move_type_id, defender_type_key):
+    """Type multiplier with IDs: a single index into EFFECTIVENESS."""
+    return EFFECTIVENESS[move_type_id * DEFENDER_KEYS + defender_type_key]
+
+
 def get_type_effectiveness(move_type, defender_types):
     """
     Calculates the type effectiveness multiplier.
+    (String version, kept for compatibility: it converts to IDs.)
+    """
+    if len(defender_types) > 2:
+        total_multiplier = 1.0
+        row = TYPE_MATRIX[type_id(move_type)]
+        for def_type in defender_types:
+            total_multiplier *= row[type_id(def_type)]
+        return total_multiplier
+
+    return EFFECTIVENESS[type_id(move_type) * DEFENDER_KEYS + defender_key(defender_types)]
+
+
+def roster_effectiveness(pokemon_stats):
+    """
+    Effectiveness of every move against every species in the roster.
+    Returns table[attacker index][move index][defender index],
+    in the same order as the pokemon_stats list (from the JSON).
     """
-    if move_type not in TYPE_CHART:
-        return 1.0 
-
-    total_multiplier = 1.0
-    move_effectiveness = TYPE_CHART.get(move_type, {})
-    
-    for def_type in defender_types:
-        multiplier = move_effectiveness.get(def_type, 1.0)
-        total_multiplier *= multiplier
-        
-    return total_multiplier
\ No newline at end of file
+    defender_keys = [defender_key(data['type']) for data in pokemon_stats]
+    table = []
+    for data in pokemon_stats:
+        rows = []
+        for move in data['moves']:
+            start = type_id(move['type']) * DEFENDER_KEYS
+            rows.append([EFFECTIVENESS[start + key] for key in defender_keys])
+        table.append(rows)
+    return table
@@ -0,0 +1,24 @@
+""" BUILD THE SPRITE ATLAS """
+# Packs every GIF in data/sprites into data/sprites.atlas (see src/sprites.py),
+# so the game reads one memory-mapped file instead of opening every sprite.
+# Run it again after tools/fetch_pokemon.py.
+
+import os
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, os.pardir))
+sys.path.insert(0, PROJECT_ROOT)
+
+from src.sprites import build_atlas, SPRITE_DIR, ATLAS_PATH
+
+
+def main():
+    sprite_dir = sys.argv[1] if len(sys.argv) > 1 else SPRITE_DIR
+    atlas_path = sys.argv[2] if len(sys.argv) > 2 else ATLAS_PATH
+    count = build_atlas(sprite_dir, atlas_path)
+    print(f"Wrote {atlas_path}: {count} sprites, {os.path.getsize(atlas_path)} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+""" BUILD THE BINARY ROSTER PACK """
+# Compiles data/pokemon_stats.json into data/pokemon_stats.pack
+# (see src/datapack.py). Run it again after tools/fetch_pokemon.py.
+
+import json
+import os
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, os.pardir))
+sys.path.insert(0, PROJECT_ROOT)
+
+from src.datapack import build_pack, pack_path_for, DataPack
+
+INPUT_FILE = os.path.join(PROJECT_ROOT, "data", "pokemon_stats.json")
+
+
+def main():
+    json_path = sys.argv[1] if len(sys.argv) > 1 else INPUT_FILE
+    pack_path = sys.argv[2] if len(sys.argv) > 2 else pack_path_for(json_path)
+    with open(json_path, 'r', encoding='utf-8') as f:
+        pokemon_stats = json.load(f)
+    build_pack(pokemon_stats, pack_path)
+
+    pack = DataPack(pack_path)
+    print(f"Wrote {pack_path}: {pack.n_species} species, {pack.n_moves} moves, "
+          f"{pack.n_types} types, {os.path.getsize(pack_path)} bytes")
+    pack.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+""" OFFLINE CHECK OF tools/fetch_pokemon.py """
+# Runs fetch_all twice against tools/replay_server.py serving the recorded
+# fixtures in tools/fixtures, with the cache and the sprites in a temporary
+# directory, and checks what the server saw:
+#
+#   1st run: one plain request per unique URL (Growl, shared by both
+#            species, only once)
+#   2nd run: only conditional requests, all answered with 304, and the
+#            sprite is not downloaded again
+#   3rd run: with one cache entry corrupted, that URL alone is fetched
+#            again in full
+#
+#   python tools/check_fetch.py
+
+import os
+import sys
+import tempfile
+import threading
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPT_DIR)
+
+import fetch_pokemon
+import replay_server
+
+FIXTURE_DIR = os.path.join(SCRIPT_DIR, "fixtures")
+SPECIES_IDS = [1, 4] # Bulbasaur, Charmander (the recorded ones)
+
+
+def check(condition, message):
+    if not condition:
+        raise SystemExit(f"FAILED: {message}")
+
+
+def run(log):
+    """One fetch_all; returns the requests the server got for it."""
+    del log[:]
+    pokemon_list = fetch_pokemon.fetch_all(SPECIES_IDS)
+    check(len(pokemon_list) == len(SPECIES_IDS), f"got {len(pokemon_list)} Pokémon")
+    check(all(len(p["moves"]) == fetch_pokemon.MOVES_PER_POKEMON for p in pokemon_list),
+          "some Pokémon are missing moves")
+    return list(log)
+
+
+def sprite_files(sprite_dir):
+    """{name: (inode, mtime)}: a new download replaces the file."""
+    files = {}
+    for name in os.listdir(sprite_dir):
+        info = os.stat(os.path.join(sprite_dir, name))
+        files[name] = (info.st_ino, info.st_mtime_ns)
+    return files
+
+
+def main():
+    log = []
+    server = replay_server.serve(FIXTURE_DIR, port=0, log=log)
+    host, port = server.server_address
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    recorded = set(replay_server.load_fixtures(FIXTURE_DIR, f"http://{host}:{port}/"))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fetch_pokemon.BASE_API_URL = f"http://{host}:{port}/pokeapi.co/api/v2/"
+        fetch_pokemon.CACHE_DIR = os.path.join(tmp, ".api_cache")
+        fetch_pokemon.SPRITE_DIR = os.path.join(tmp, "sprites")
+        os.makedirs(fetch_pokemon.SPRITE_DIR)
+        try:
+            # --- 1. Empty cache ---
+            first = run(log)
+            paths = [path for path, _, _ in first]
+            check(len(paths) == len(set(paths)), "a URL was requested more than once")
+            check(set(paths) == recorded, f"requested {sorted(set(paths) ^ recorded)} unexpectedly")
+            check(all(not conditional and status == 200 for _, conditional, status in first),
+                  "the first run sent conditional requests or got errors")
+            sprites = sprite_files(fetch_pokemon.SPRITE_DIR)
+            check(sprites, "no sprite was downloaded")
+
+            # --- 2. Everything cached ---
+            second = run(log)
+            check(sorted(path for path, _, _ in second) == sorted(paths),
+                  "the second run did not request the same URLs once each")
+            check(all(conditional and status == 304 for _, conditional, status in second),
+                  "the second run sent plain requests or got something other than 304")
+            check(sprite_files(fetch_pokemon.SPRITE_DIR) == sprites,
+                  "an unchanged sprite was downloaded again")
+
+            # --- 3. One corrupt cache entry ---
+            path = "/pokeapi.co/api/v2/pokemon/1"
+            url = f"http://{host}:{port}{path}"
+            with open(fetch_pokemon._cache_path(url), 'w', encoding='utf-8') as f:
+                f.write('{"url": "' + url + '", "etag"') # Cut short
+            third = run(log)
+            fresh = [path for path, conditional, status in third if not conditional]
+            check(fresh == [path] and
+                  all(status == (304 if conditional else 200) for _, conditional, status in third),
+                  "a corrupt cache entry was not fetched again (alone)")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    print(f"ok: {len(first)} requests, then {len(second)} revalidated with 304")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,10 @@
 import requests # Connects to API
 import json     # Creates .json
 import os       # File manager
+import hashlib  # Cache file names
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 
 """ CONSTANTS """
 
@@ -12,11 +16,23 @@ PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, os.pardir))
 DATA_DIR = os.path.join(PROJECT_ROOT, "data")
 SPRITE_DIR = os.path.join(DATA_DIR, "sprites")
 OUTPUT_FILE = os.path.join(DATA_DIR, "pokemon_stats.json")
+# Raw API responses with their ETag / Last-Modified, for revalidation
+CACHE_DIR = os.path.join(DATA_DIR, ".api_cache")
 
 # --- API VARIABLES ---
 # We are still only fetching the starters for the MVP
 STARTER_IDS = [1, 4, 7] # Bulbasaur, Charmander, Squirtle
-BASE_API_URL = "https://pokeapi.co/api/v2/"
+# Can point to a local stand-in server (see tools/replay_server.py)
+BASE_API_URL = os.environ.get("POKEAPI_URL", "https://pokeapi.co/api/v2/")
+
+# --- CONCURRENCY ---
+MAX_WORKERS = 8      # Requests in flight at the same time
+REQUEST_TIMEOUT = 30 # Seconds
+MOVES_PER_POKEMON = 4
+
+# --- MOVE EFFECTS ---
+# PokeAPI "meta" fields kept for src/effects.py (only the ones that are set)
+META_FIELDS = ("ailment_chance", "drain", "healing", "flinch_chance", "stat_chance")
 
 # --- DATA MAPPING ---
 #
@@ -34,6 +50,87 @@ STAT_MAP = {
     "speed": "speed"
 }
 
+""" HTTP SESSION AND CACHE """
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """
+    One pooled requests.Session for every thread, so connections
+    to the API are reused instead of opened once per request.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=MAX_WORKERS, pool_maxsize=MAX_WORKERS)
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+        return _session
+
+def _cache_path(url):
+    name = hashlib.sha1(url.encode('utf-8')).hexdigest()
+    return os.path.join(CACHE_DIR, name + ".json")
+
+def _read_cache(url, field):
+    """The cache entry of url, or None if it is missing, corrupt or has no field."""
+    try:
+        with open(_cache_path(url), 'r', encoding='utf-8') as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(entry, dict) or field not in entry:
+        return None
+    return entry
+
+def _write_cache(url, entry):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = _cache_path(url)
+    # Write then rename, so a crash never leaves half a cache file
+    with open(path + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump(entry, f)
+    os.replace(path + ".tmp", path)
+
+def _validators(entry):
+    """Conditional request headers from a cache entry."""
+    headers = {}
+    if entry and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry and entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+def cached_get_json(url):
+    """
+    GET a JSON URL through the on-disk cache.
+    Cached responses are revalidated with ETag / If-Modified-Since;
+    a 304 reuses the cached body. If the API can't be reached,
+    the cached body is used as it is.
+    """
+    entry = _read_cache(url, "body")
+    try:
+        response = get_session().get(url, headers=_validators(entry), timeout=REQUEST_TIMEOUT)
+        if response.status_code == 304:
+            if entry:
+                return entry["body"]
+            # Nothing cached to reuse: ask again without the validators
+            response = get_session().get(url, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+    except requests.RequestException:
+        if entry:
+            return entry["body"]
+        raise
+
+    body = response.json()
+    _write_cache(url, {
+        "url": url,
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "body": body
+    })
+    return body
+
 """ HELPER FUNCTIONS """
 
 def get_move_data(move_url):
@@ -41,110 +138,194 @@ def get_move_data(move_url):
     Fetches the details for a single move from its API URL.
     """
     try:
-        response = requests.get(move_url)
-        response.raise_for_status() # Check for errors
-        move_data = response.json()
-        
-        # We will keep status moves (like Growl) for now
-        # as they were in your original JSON.
+        move_data = cached_get_json(move_url)
+
+        # Status moves (like Growl) do what their effect data says
         return {
             "name": move_data["name"].replace('-', ' ').capitalize(),
             "power": move_data["power"], # Will be None for status moves
             "type": move_data["type"]["name"].capitalize(),
-            "category": move_data["damage_class"]["name"]
+            "category": move_data["damage_class"]["name"],
+            "priority": move_data["priority"], # Quick Attack +1, most moves 0
+            "accuracy": move_data["accuracy"], # None: never misses
+            "target": move_data["target"]["name"],
+            "stat_changes": [{"stat": change["stat"]["name"], "change": change["change"]}
+                             for change in move_data["stat_changes"]],
+            "meta": move_meta(move_data.get("meta"))
         }
     except requests.RequestException as e:
         print(f"Error fetching move data: {e}")
         return None
 
+def move_meta(meta):
+    """The effect fields of a move's PokeAPI "meta" (ailment, chances, drain...)."""
+    if not meta:
+        return {}
+    effects = {field: meta[field] for field in META_FIELDS if meta.get(field)}
+    ailment = (meta.get("ailment") or {}).get("name", "none")
+    if ailment != "none":
+        effects["ailment"] = ailment
+    return effects
+
 def download_sprite(url, save_path):
     """
     Downloads a file from a URL and saves it locally.
+    If the file is already there, it is revalidated with its ETag /
+    Last-Modified and only downloaded again when it changed.
     """
     if not url:
         return None
+    entry = _read_cache(url, "path") if os.path.exists(save_path) else None
     try:
-        response = requests.get(url, stream=True)
+        response = get_session().get(url, headers=_validators(entry), stream=True,
+                                     timeout=REQUEST_TIMEOUT)
+        if response.status_code == 304:
+            if entry:
+                return save_path # Unchanged
+            response = get_session().get(url, stream=True, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
-        with open(save_path, 'wb') as f:
+        with open(save_path + ".tmp", 'wb') as f:
             for chunk in response.iter_content(chunk_size=8192):
                 f.write(chunk)
+        os.replace(save_path + ".tmp", save_path)
+        _write_cache(url, {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "path": save_path
+        })
         return save_path
     except requests.RequestException as e:
+        if os.path.exists(save_path):
+            return save_path # Offline: keep the copy we have
         print(f"Error downloading sprite: {e}")
         return None
 
-""" PRIMARY FETCH FUNCTION """
+""" PRIMARY FETCH FUNCTIONS """
 
-def fetch_pokemon_data(pokemon_id):
+def fetch_species(pokemon_id):
     """
-    Fetches all required data for a single Pokémon
-    and formats it for our game.
+    Fetches the raw API data of one Pokémon (None on error).
     """
     try:
-        print(f"\nFetching data for Pokémon ID: {pokemon_id}")
-        pokemon_url = f"{BASE_API_URL}pokemon/{pokemon_id}"
-        response = requests.get(pokemon_url)
-        response.raise_for_status()
-        pokemon_data = response.json()
-
-        # Build the stats dictionary using our corrected STAT_MAP
-        pokemon_stats = {}
-        for stat_entry in pokemon_data["stats"]:
-            api_name = stat_entry["stat"]["name"]
-            if api_name in STAT_MAP:
-                # Use the map to get the correct key (e.g., "special-attack")
-                json_key = STAT_MAP[api_name]
-                pokemon_stats[json_key] = stat_entry["base_stat"]
-        
-        # Get list of types
-        types = [t["type"]["name"].capitalize() for t in pokemon_data["types"]]
-        
-        # Get move data
-        print(f"Fetching move data for {pokemon_data['name']}...")
-        moves = []
-        for move_entry in pokemon_data["moves"]:
-            # Filter for moves learned by leveling up
-            if move_entry["version_group_details"][0]["move_learn_method"]["name"] == "level-up":
-                move_url = move_entry["move"]["url"]
-                move_data = get_move_data(move_url)
-                if move_data:
-                    moves.append(move_data)
-                    if len(moves) >= 4: # Get 4 moves only
-                        break
-        
-        # Get sprites
-        print(f"Downloading sprites for {pokemon_data['name']}...")
-        sprites_api = pokemon_data["sprites"]["versions"]["generation-v"]["black-white"]["animated"]
-        
-        # *** Preserving your custom sprite name format ***
-        path_front = os.path.join(SPRITE_DIR, f"{pokemon_id}{pokemon_data['name']}_front.gif")
-        path_back = os.path.join(SPRITE_DIR, f"{pokemon_id}{pokemon_data['name']}_back.gif")
-        
-        sprite_front_local = download_sprite(sprites_api["front_default"], path_front)
-        sprite_back_local = download_sprite(sprites_api["back_default"], path_back)
-
-        # Create the final, clean dictionary
-        pokemon_clean = {
-            "id": pokemon_id,
-            "name": pokemon_data['name'].capitalize(),
-            
-            # *** THIS IS THE SECOND FIX ***
-            # Renamed "types" (plural) to "type" (singular)
-            # to match the _init_ of our Pokemon class.
-            "type": types,
-            
-            "stats": pokemon_stats,
-            "moves": moves,
-            "sprite_front": sprite_front_local,
-            "sprite_back": sprite_back_local
-        }
-        return pokemon_clean
-        
+        print(f"Fetching data for Pokémon ID: {pokemon_id}")
+        return cached_get_json(f"{BASE_API_URL}pokemon/{pokemon_id}")
     except requests.RequestException as e:
         print(f"Failed to fetch data for ID {pokemon_id}: {e}")
         return None
 
+def level_up_move_urls(pokemon_data):
+    """URLs of the moves learned by leveling up, in API order."""
+    return [move_entry["move"]["url"] for move_entry in pokemon_data["moves"]
+            # Filter for moves learned by leveling up
+            if move_entry["version_group_details"][0]["move_learn_method"]["name"] == "level-up"]
+
+def fetch_moves(species_list, executor):
+    """
+    Fetches the moves of every species at once.
+    Each move URL is requested only once, even when many species
+    share it. Returns {move url: move dict or None}.
+    """
+    move_cache = {}
+    candidates = [level_up_move_urls(data) for data in species_list]
+    # Start with the first 4 of each; ask for more only if some failed
+    wanted = [MOVES_PER_POKEMON] * len(species_list)
+    while True:
+        needed = {} # Unique URLs in order (a dict: the full dex shares many)
+        for urls, count in zip(candidates, wanted):
+            for url in urls[:count]:
+                if url not in move_cache:
+                    needed[url] = None
+        if not needed:
+            return move_cache
+        for url, move_data in zip(needed, executor.map(get_move_data, needed)):
+            move_cache[url] = move_data
+        for i, urls in enumerate(candidates):
+            found = sum(1 for url in urls[:wanted[i]] if move_cache.get(url))
+            if found < MOVES_PER_POKEMON and wanted[i] < len(urls):
+                wanted[i] += MOVES_PER_POKEMON - found
+
+def build_pokemon(pokemon_id, pokemon_data, move_cache, sprite_paths):
+    """
+    Formats the API data of one Pokémon for our game.
+    """
+    # Build the stats dictionary using our corrected STAT_MAP
+    pokemon_stats = {}
+    for stat_entry in pokemon_data["stats"]:
+        api_name = stat_entry["stat"]["name"]
+        if api_name in STAT_MAP:
+            # Use the map to get the correct key (e.g., "special-attack")
+            json_key = STAT_MAP[api_name]
+            pokemon_stats[json_key] = stat_entry["base_stat"]
+
+    # Get list of types
+    types = [t["type"]["name"].capitalize() for t in pokemon_data["types"]]
+
+    # Get move data (already fetched, first 4 that worked)
+    moves = []
+    for move_url in level_up_move_urls(pokemon_data):
+        move_data = move_cache.get(move_url)
+        if move_data:
+            moves.append(move_data)
+            if len(moves) >= MOVES_PER_POKEMON: # Get 4 moves only
+                break
+
+    # Create the final, clean dictionary
+    return {
+        "id": pokemon_id,
+        "name": pokemon_data['name'].capitalize(),
+
+        # *** THIS IS THE SECOND FIX ***
+        # Renamed "types" (plural) to "type" (singular)
+        # to match the _init_ of our Pokemon class.
+        "type": types,
+
+        "stats": pokemon_stats,
+        "moves": moves,
+        "sprite_front": sprite_paths[0],
+        "sprite_back": sprite_paths[1]
+    }
+
+def fetch_all(pokemon_ids, max_workers=MAX_WORKERS):
+    """
+    Fetches every Pokémon concurrently (species, then shared moves,
+    then sprites) and returns the list of clean dictionaries.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # 1. Species
+        raw = list(executor.map(fetch_species, pokemon_ids))
+        found = [(poke_id, data) for poke_id, data in zip(pokemon_ids, raw) if data]
+        for poke_id, data in zip(pokemon_ids, raw):
+            if not data:
+                print(f"Could not get data for Pokémon ID: {poke_id}")
+
+        # 2. Moves (deduplicated across species)
+        print(f"Fetching move data for {len(found)} Pokémon...")
+        move_cache = fetch_moves([data for _, data in found], executor)
+
+        # 3. Sprites
+        print("Downloading sprites...")
+        jobs = []
+        for poke_id, data in found:
+            sprites_api = data["sprites"]["versions"]["generation-v"]["black-white"]["animated"]
+            # *** Preserving your custom sprite name format ***
+            path_front = os.path.join(SPRITE_DIR, f"{poke_id}{data['name']}_front.gif")
+            path_back = os.path.join(SPRITE_DIR, f"{poke_id}{data['name']}_back.gif")
+            jobs.append(executor.submit(download_sprite, sprites_api["front_default"], path_front))
+            jobs.append(executor.submit(download_sprite, sprites_api["back_default"], path_back))
+        sprite_paths = [job.result() for job in jobs]
+
+    return [build_pokemon(poke_id, data, move_cache, sprite_paths[2 * i:2 * i + 2])
+            for i, (poke_id, data) in enumerate(found)]
+
+def fetch_pokemon_data(pokemon_id):
+    """
+    Fetches all required data for a single Pokémon
+    and formats it for our game.
+    """
+    pokemon_list = fetch_all([pokemon_id])
+    return pokemon_list[0] if pokemon_list else None
+
 """ MAIN EXECUTION """
 
 def main():
@@ -159,14 +340,8 @@ def main():
         os.makedirs(SPRITE_DIR)
         print(f"Path created: {SPRITE_DIR}")
 
-    pokemon_list = []
     print("--- Starting Data Download ---")
-    for poke_id in STARTER_IDS:
-        data = fetch_pokemon_data(poke_id) 
-        if data:
-            pokemon_list.append(data)
-        else:
-            print(f"Could not get data for Pokémon ID: {poke_id}")
+    pokemon_list = fetch_all(STARTER_IDS)
 
     # Save the data to the JSON file
     if pokemon_list:
@@ -179,4 +354,4 @@ def main():
 
 # Dunder check (con doble guion bajo, como pediste)
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,136 @@
+""" LOAD GENERATOR FOR src/server.py """
+# Opens a few connections, creates many sessions on them and plays every
+# session to GAME_OVER with random moves, measuring each turn's latency.
+# Each session waits a random "think time" between turns, like a player,
+# so all sessions stay open at the same time.
+#
+#   python -m src.server &
+#   python tools/load_client.py --sessions 10000 --connections 100 --processes 4
+#
+# A single Python client cannot keep up with 10k sessions by itself, so the
+# sessions can be split across several client processes.
+
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+
+class Connection:
+    """One socket with many requests in flight, matched to replies by id."""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.pending = {}
+        self.ids = itertools.count()
+        self.reader_task = asyncio.create_task(self._read_replies())
+
+    async def _read_replies(self):
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                break
+            reply = json.loads(line)
+            future = self.pending.pop(reply.get("id"), None)
+            if future:
+                future.set_result(reply)
+
+    async def request(self, op, **fields):
+        request_id = next(self.ids)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = future
+        fields.update(id=request_id, op=op)
+        self.writer.write(json.dumps(fields).encode('utf-8') + b"\n")
+        reply = await future
+        if not reply.get("ok"):
+            raise RuntimeError(reply.get("error"))
+        return reply
+
+    async def close(self):
+        self.reader_task.cancel()
+        self.writer.close()
+
+
+async def play_session(connection, latencies, rng, think):
+    """Creates a session and plays it to the end."""
+    reply = await connection.request("create")
+    session = reply["session"]
+    reply = await connection.request("select_starter", session=session,
+                                     index=rng.randrange(len(reply["starters"])))
+    while reply["state"] == "IN_BATTLE":
+        await asyncio.sleep(rng.uniform(0, 2 * think))
+        moves = reply["battle"]["player"]["moves"]
+        start = time.perf_counter()
+        reply = await connection.request("move", session=session, index=rng.randrange(len(moves)))
+        latencies.append(time.perf_counter() - start)
+    await connection.request("close", session=session)
+
+
+async def run(host, port, sessions, connections, think, seed):
+    """Plays the sessions in this process. Returns the turn latencies."""
+    rng = random.Random(seed)
+    pool = []
+    for _ in range(connections):
+        reader, writer = await asyncio.open_connection(host, port, limit=1024 * 1024)
+        pool.append(Connection(reader, writer))
+
+    latencies = []
+    await asyncio.gather(*(play_session(pool[i % connections], latencies, rng, think)
+                           for i in range(sessions)))
+
+    for connection in pool:
+        await connection.close()
+    return latencies
+
+
+def run_process(args):
+    """Entry point of one client process."""
+    return asyncio.run(run(*args))
+
+
+def report(latencies, elapsed, sessions, connections):
+    latencies.sort()
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+    print(f"sessions: {sessions} over {connections} connections")
+    print(f"turns:    {len(latencies)} in {elapsed:.2f}s ({len(latencies) / elapsed:,.0f} turns/s)")
+    print(f"latency:  p50 {percentile(0.50):.2f} ms, p99 {percentile(0.99):.2f} ms, "
+          f"max {latencies[-1] * 1000:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load generator for the battle server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--sessions", type=int, default=10000)
+    parser.add_argument("--connections", type=int, default=100)
+    parser.add_argument("--think", type=float, default=1.0,
+                        help="Average seconds between a session's turns")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--processes", type=int, default=1)
+    args = parser.parse_args()
+
+    jobs = []
+    for i in range(args.processes):
+        seed = None if args.seed is None else args.seed + i
+        jobs.append((args.host, args.port,
+                     args.sessions // args.processes + (i < args.sessions % args.processes),
+                     max(1, args.connections // args.processes), args.think, seed))
+
+    start = time.perf_counter()
+    if args.processes == 1:
+        latencies = run_process(jobs[0])
+    else:
+        latencies = []
+        with ProcessPoolExecutor(args.processes) as executor:
+            for part in executor.map(run_process, jobs):
+                latencies.extend(part)
+    report(latencies, time.perf_counter() - start, args.sessions, args.connections)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+""" LOCAL STAND-IN FOR POKEAPI """
+# Replays recorded responses (the files fetch_pokemon.py writes to
+# data/.api_cache) over HTTP, so the fetcher can run offline:
+#
+#   python tools/replay_server.py --port 8000
+#   POKEAPI_URL=http://127.0.0.1:8000/pokeapi.co/api/v2/ python tools/fetch_pokemon.py
+#
+# Every recorded URL "https://host/path" is served at "/host/path", and the
+# URLs inside the JSON bodies are rewritten the same way. Responses carry an
+# ETag, and If-None-Match gets a 304, like the real API.
+#
+# tools/fixtures holds a small recorded set (2 species, their moves and
+# 1 sprite) that tools/check_fetch.py runs the fetcher against.
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_FIXTURES = os.path.join(SCRIPT_DIR, os.pardir, "data", ".api_cache")
+
+
+def local_path(url):
+    """'https://pokeapi.co/api/v2/move/1/' -> '/pokeapi.co/api/v2/move/1/'"""
+    parts = urlsplit(url)
+    return f"/{parts.netloc}{parts.path}"
+
+
+def load_fixtures(fixture_dir, base_url):
+    """Returns {local path: (body bytes, content type, etag)}."""
+    fixtures = {}
+    for name in glob.glob(os.path.join(fixture_dir, "*.json")):
+        with open(name, 'r', encoding='utf-8') as f:
+            entry = json.load(f)
+        url = entry["url"]
+        if "body" in entry:
+            text = json.dumps(entry["body"])
+            # Links to other resources must point back to this server
+            text = text.replace("https://", base_url)
+            body, content_type = text.encode('utf-8'), "application/json"
+        elif entry.get("path") and os.path.exists(os.path.join(fixture_dir, entry["path"])):
+            # (Relative paths are inside fixture_dir)
+            with open(os.path.join(fixture_dir, entry["path"]), 'rb') as f:
+                body, content_type = f.read(), "image/gif"
+        else:
+            continue
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        fixtures[local_path(url)] = (body, content_type, etag)
+    return fixtures
+
+
+def make_handler(fixtures, log=None):
+    """
+    The request handler class. If log is a list, every request is added
+    to it as (path, conditional, status).
+    """
+    class ReplayHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if log is not None:
+                conditional = bool(self.headers.get("If-None-Match")
+                                   or self.headers.get("If-Modified-Since"))
+            fixture = fixtures.get(self.path)
+            if fixture is None:
+                if log is not None:
+                    log.append((self.path, conditional, 404))
+                self.send_error(404)
+                return
+            body, content_type, etag = fixture
+            status = 304 if self.headers.get("If-None-Match") == etag else 200
+            if log is not None:
+                log.append((self.path, conditional, status))
+            if status == 304:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass # Quiet
+
+    return ReplayHandler
+
+
+def serve(fixture_dir=DEFAULT_FIXTURES, host="127.0.0.1", port=8000, log=None):
+    """
+    Creates the server (call serve_forever() on it, or use it from a thread).
+    port=0 picks a free one: see server.server_address.
+    """
+    server = ThreadingHTTPServer((host, port), BaseHTTPRequestHandler)
+    port = server.server_address[1]
+    fixtures = load_fixtures(fixture_dir, f"http://{host}:{port}/")
+    server.RequestHandlerClass = make_handler(fixtures, log)
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replays recorded PokeAPI responses")
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+    server = serve(args.fixtures, args.host, args.port)
+    print(f"Replaying {args.fixtures} on http://{args.host}:{args.port}/")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()